@@ -0,0 +1,157 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from flask import request, g, jsonify, Response
+from metrics import metrics
+from warmup import is_warmup_request
+
+
+class AdmissionController:
+    """Bounded in-flight limit with a short wait queue and fast load shedding.
+
+    At most ``max_in_flight`` requests run at once. Up to ``max_queue`` more
+    may wait ``queue_timeout`` seconds for a slot; anything beyond that is
+    rejected immediately with 503 + Retry-After, so admitted requests never
+    queue behind an unbounded backlog. Paths in ``priority_paths`` (e.g.
+    /health, or '/jobs/' for everything below it) bypass admission entirely.
+
+    In degrade mode recent successful responses are kept in a small LRU keyed
+    by path and request body, and a shed request whose answer is cached gets
+    that answer (marked with ``X-Degraded: cache``) instead of a 503.
+    """
+
+    def __init__(self, max_in_flight=8, max_queue=16, queue_timeout=0.5, retry_after=1,
+                 priority_paths=('/health', '/ready', '/metrics', '/jobs/'), degrade=False, degrade_cache_size=1024):
+        self.max_in_flight = int(max_in_flight)
+        self.max_queue = int(max_queue)
+        self.queue_timeout = float(queue_timeout)
+        self.retry_after = int(retry_after)
+        self.priority_paths = tuple(priority_paths)
+        self.degrade = bool(degrade)
+        self.degrade_cache_size = int(degrade_cache_size)
+
+        self._slots = threading.BoundedSemaphore(max(1, self.max_in_flight))
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._cache = OrderedDict()
+
+    @classmethod
+    def from_env(cls):
+        """Build a controller from ML_* admission environment variables"""
+        return cls(
+            max_in_flight=os.environ.get('ML_MAX_IN_FLIGHT', 8),
+            max_queue=os.environ.get('ML_MAX_QUEUE', 16),
+            queue_timeout=float(os.environ.get('ML_QUEUE_TIMEOUT_MS', 500)) / 1000,
+            retry_after=os.environ.get('ML_RETRY_AFTER', 1),
+            degrade=os.environ.get('ML_DEGRADE_MODE', '0').lower() in ('1', 'true', 'yes'),
+            degrade_cache_size=os.environ.get('ML_DEGRADE_CACHE_SIZE', 1024)
+        )
+
+    @property
+    def enabled(self):
+        return self.max_in_flight > 0
+
+    def init_app(self, app):
+        """Register admission hooks on the app (no-op when ML_MAX_IN_FLIGHT=0)"""
+        if not self.enabled:
+            return False
+
+        app.before_request(self._admit)
+        app.after_request(self._remember)
+        app.teardown_request(self._release)
+        return True
+
+    def try_acquire(self):
+        """Take an in-flight slot, waiting briefly if the bounded queue has room"""
+        if self._slots.acquire(blocking=False):
+            return True, None
+
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                return False, 'queue_full'
+            self._waiting += 1
+            metrics.set('admission_queue_depth', self._waiting)
+
+        try:
+            start = time.perf_counter()
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+            metrics.observe('admission_queue_wait_seconds', time.perf_counter() - start)
+            return acquired, None if acquired else 'timeout'
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                metrics.set('admission_queue_depth', self._waiting)
+
+    def release(self):
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'waiting': self._waiting,
+                'degrade_mode': self.degrade
+            }
+
+    def _cache_key(self):
+        return request.path, request.get_data(cache=True)
+
+    def _is_priority(self, path):
+        # Entries ending in '/' match every path below them
+        return any(path == p or (p.endswith('/') and path.startswith(p)) for p in self.priority_paths)
+
+    def _admit(self):
+        if self._is_priority(request.path) or request.method == 'OPTIONS':
+            return None
+
+        admitted, reason = self.try_acquire()
+        if admitted:
+            g.admitted = True
+            with self._lock:
+                self._in_flight += 1
+                metrics.set('admission_in_flight', self._in_flight)
+            metrics.inc('admission_admitted_total')
+            return None
+
+        metrics.inc('admission_shed_total', reason=reason)
+
+        if self.degrade:
+            with self._lock:
+                cached = self._cache.get(self._cache_key())
+            if cached is not None:
+                metrics.inc('admission_degraded_total')
+                return Response(cached, status=200, mimetype='application/json',
+                                headers={'X-Degraded': 'cache'})
+
+        response = jsonify({
+            'error': 'Service overloaded',
+            'message': 'Too many concurrent requests, please retry shortly',
+            'retry_after': self.retry_after
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response
+
+    def _remember(self, response):
+        if (self.degrade and g.get('admitted') and response.status_code == 200
+                and response.mimetype == 'application/json' and not response.direct_passthrough
+                and not is_warmup_request()):
+            key = self._cache_key()
+            body = response.get_data()
+            with self._lock:
+                self._cache[key] = body
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.degrade_cache_size:
+                    self._cache.popitem(last=False)
+        return response
+
+    def _release(self, exc=None):
+        if g.pop('admitted', False):
+            with self._lock:
+                self._in_flight -= 1
+                metrics.set('admission_in_flight', self._in_flight)
+            self.release()
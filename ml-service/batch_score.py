@@ -0,0 +1,236 @@
+"""
+Offline bulk scoring for soil-card exports.
+
+Loads the ./model artifacts once, streams the input file in chunks and scores
+each chunk with PunjabCropPredictor.predict_batch across a process pool. On
+platforms with fork() the workers inherit the already loaded models instead of
+re-loading them. Results are appended to the output as each chunk finishes.
+
+    python -m batch_score --input ../data/soil_data_punjab.csv --output scored.csv --workers 4
+
+Input rows need nitrogen/phosphorus/potassium and a district (or location)
+column; rainfall, temperature and soil_type fall back to the service defaults.
+District spellings are matched through the shared district index; the canonical
+name is written to resolved_district (empty for unknown districts). Numeric
+cells that do not parse are scored like empty ones (defaults, or the district
+climate for weather) and named in invalid_inputs, so one bad cell does not stop
+the run.
+CSV and Parquet (requires pyarrow) are supported for input and output; NDJSON
+is also accepted as input.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+import multiprocessing
+from collections import deque
+import numpy as np
+import pandas as pd
+from models import PunjabCropPredictor, FERTILIZERS, INPUT_DEFAULTS
+from model_bundle import BUNDLE_FILE
+from districts import district_index
+
+# Input columns that must be numbers; unparseable cells are scored like empty ones and flagged
+NUMERIC_INPUTS = [name for name, default in INPUT_DEFAULTS.items() if not isinstance(default, str)]
+
+# Loaded once in the parent; forked workers share it copy-on-write
+predictor = None
+_thread_limits = None
+
+
+def read_chunks(path, chunk_size):
+    """Yield DataFrame chunks from a CSV, NDJSON or Parquet file"""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif path.endswith(('.ndjson', '.jsonl')):
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """Incrementally append scored chunks to a CSV or Parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self._rows = 0
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(frame, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._rows == 0 else 'a', header=self._rows == 0, index=False)
+        self._rows += len(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_frame(model, chunk, top_k=4):
+    """Score a chunk of input rows; returns the inputs with prediction columns appended"""
+    result = chunk.reset_index(drop=True)
+    rows = len(result)
+
+    district_column = 'district' if 'district' in result else 'location'
+    if district_column in result:
+        districts = result[district_column].to_numpy(dtype=object)
+    else:
+        districts = np.full(rows, 'Amritsar', dtype=object)
+    resolved = district_index.resolve_many(districts)
+
+    # Cells that are not numbers fall back to the defaults (or district climate) and are listed per row
+    numeric, invalid = {}, np.zeros((rows, len(NUMERIC_INPUTS)), dtype=bool)
+    for j, column in enumerate(NUMERIC_INPUTS):
+        if column in result:
+            numeric[column] = pd.to_numeric(result[column], errors='coerce')
+            present = result[column].notna() & (result[column].astype(str).str.strip() != '')
+            invalid[:, j] = (numeric[column].isna() & present).to_numpy()
+    names = np.asarray(NUMERIC_INPUTS, dtype=object)
+    invalid_inputs = np.full(rows, '', dtype=object)
+    for i in np.flatnonzero(invalid.any(axis=1)):
+        invalid_inputs[i] = ','.join(names[invalid[i]])
+
+    # Unknown districts are still scored, with the models' neutral district encoding
+    batch = model.predict_batch(result.assign(district=districts, **numeric))
+    suitability = batch['suitability']
+    soil_cluster = batch['soil_cluster']
+
+    # Best top_k catalog crops by suitability (ties in catalog order, like get_crop_recommendations)
+    catalog = model.crop_catalog
+    order = catalog.rank(suitability, top_k)
+    crop_names = np.asarray(catalog.names, dtype=object)
+    for rank in range(order.shape[1]):
+        result[f'crop_rank_{rank + 1}'] = crop_names[order[:, rank]]
+    for i, crop in enumerate(catalog.names):
+        result[f'suitability_{crop}'] = suitability[:, i]
+
+    result['recommendation_confidence'] = batch['recommendation_prob']
+    result['predicted_yield'] = batch['predicted_yield']
+
+    labels = np.asarray(model.soil_health_labels, dtype=object)
+    result['soil_cluster'] = soil_cluster
+    result['soil_health'] = labels[soil_cluster]
+
+    # Fertilizer quantities for the top ranked crop, from the same defaulted NPK the rows were scored with
+    npk = np.column_stack([
+        numeric[nutrient].fillna(INPUT_DEFAULTS[nutrient]).to_numpy(dtype=float)
+        if nutrient in numeric else np.full(rows, float(INPUT_DEFAULTS[nutrient]))
+        for _, nutrient, _, _ in FERTILIZERS
+    ])
+    deficits, quantities = model.fertilizer_batch(npk, crop_names[order[:, 0]])
+    for j, (_, nutrient, fertilizer, _) in enumerate(FERTILIZERS):
+        column = fertilizer.lower().replace(' ', '_')
+        result[f'{nutrient}_deficit'] = deficits[:, j]
+        result[f'{column}_kg_ha'] = quantities[:, j]
+
+    # Least-cost product mix (straights, DAP, NPK complexes) for the same deficits
+    _, plan = model.fertilizer_plan(npk, crop_names[order[:, 0]])
+    for j, product in enumerate(model.fertilizer_planner.names):
+        result[f"plan_{product.lower().replace(' ', '_').replace(':', '_')}_kg_ha"] = plan['quantities'][:, j]
+    result['plan_cost'] = plan['cost']
+
+    result['resolved_district'] = resolved
+    result['invalid_inputs'] = invalid_inputs
+    return result
+
+
+def _score_chunk(chunk, top_k=4):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return score_frame(predictor, chunk, top_k)
+
+
+def _init_worker(model_dir):
+    global predictor, _thread_limits
+    # One BLAS/OpenMP thread per process; the pool provides the parallelism
+    from threadpoolctl import threadpool_limits
+    _thread_limits = threadpool_limits(1)
+    if predictor is None:
+        # Only reached with the spawn start method (no fork available)
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor = PunjabCropPredictor()
+            predictor.load_models(model_dir)
+
+
+def score_file(input_path, output_path, model_dir='./model', workers=None, chunk_size=50_000, top_k=4):
+    """Score input_path into output_path; returns (rows, seconds)"""
+    global predictor
+
+    workers = workers or os.cpu_count() or 1
+    print(f"📂 Loading models from {model_dir}...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = PunjabCropPredictor()
+        predictor.load_models(model_dir)
+
+    writer = ChunkWriter(output_path)
+    chunks = read_chunks(input_path, chunk_size)
+    start = time.perf_counter()
+    rows = 0
+
+    def report(scored):
+        nonlocal rows
+        writer.write(scored)
+        rows += len(scored)
+        elapsed = time.perf_counter() - start
+        print(f"  ⏱️ {rows:,} rows scored, {rows / elapsed:,.0f} rows/sec", flush=True)
+
+    try:
+        if workers <= 1:
+            _init_worker(model_dir)
+            for chunk in chunks:
+                report(_score_chunk(chunk, top_k))
+        else:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+            print(f"🚀 Scoring with {workers} worker processes ({context.get_start_method()})")
+            with context.Pool(workers, initializer=_init_worker, initargs=(model_dir,)) as pool:
+                # Bounded look-ahead keeps memory flat while preserving input order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.apply_async(_score_chunk, (chunk, top_k)))
+                    if len(pending) >= workers * 2:
+                        report(pending.popleft().get())
+                while pending:
+                    report(pending.popleft().get())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec) -> {output_path}")
+    return rows, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk-score soil cards with the trained Punjab models')
+    parser.add_argument('--input', required=True, help='CSV, NDJSON or Parquet input file')
+    parser.add_argument('--output', required=True, help='CSV or Parquet output file')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--top-k', type=int, default=4, help='ranked crop columns per row (0 = all catalog crops)')
+    args = parser.parse_args(argv)
+
+    # A NumPy bundle alone is enough to score, as in the service
+    if not any(os.path.exists(os.path.join(args.model_dir, name)) for name in (BUNDLE_FILE, 'crop_recommender.pkl')):
+        print(f"❌ No trained models found in {args.model_dir}")
+        sys.exit(1)
+
+    score_file(args.input, args.output, args.model_dir, args.workers, args.chunk_size, args.top_k)
+
+
+if __name__ == '__main__':
+    main()
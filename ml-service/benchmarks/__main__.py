@@ -0,0 +1,102 @@
+"""
+Benchmark suite for the Punjab ML microservice.
+
+Run from the ml-service directory:
+
+    python -m benchmarks --output bench.json
+    python -m benchmarks --baseline bench.json --threshold 0.2
+
+Results are written as JSON together with machine info. When a baseline is
+given, the run exits non-zero if any benchmark's median regressed by more than
+the threshold.
+"""
+
+import argparse
+import random
+import numpy as np
+from benchmarks import harness
+
+SUITES = ('predictor', 'backends', 'preprocessing', 'districts', 'catalog', 'fertilizer', 'http')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Punjab ML service benchmarks')
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f"comma separated subset of: {', '.join(SUITES)}")
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown before failing (0.2 = 20%%)')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--sizes', default='10000,1000000',
+                        help='row counts for the preprocessing suite')
+    parser.add_argument('--district-rows', type=int, default=1_000_000,
+                        help='region column length for the districts suite')
+    parser.add_argument('--ort-threads', type=int, default=1,
+                        help='onnxruntime intra-op threads for the backends suite')
+    parser.add_argument('--http-url', help='benchmark an already running service instead of a local one')
+    parser.add_argument('--http-requests', type=int, default=500)
+    parser.add_argument('--http-concurrency', type=int, default=8)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    suites = [s.strip() for s in args.suites.split(',') if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise SystemExit(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+    random.seed(0)
+    np.random.seed(0)
+
+    print("⏱️ Running Punjab ML benchmarks")
+    bench = harness.BenchmarkRun()
+
+    predictor = model_dir = None
+    if 'predictor' in suites or 'backends' in suites or ('http' in suites and not args.http_url):
+        from benchmarks.fixtures import load_or_train_predictor
+        with harness.quiet():
+            predictor, model_dir = load_or_train_predictor(args.model_dir)
+
+    if 'predictor' in suites:
+        from benchmarks import bench_predictor
+        bench_predictor.run(bench, predictor, model_dir, batch_size=args.batch_size, repeat=args.repeat)
+
+    if 'backends' in suites:
+        from benchmarks import bench_backends
+        bench_backends.run(bench, model_dir, threads=args.ort_threads, repeat=args.repeat)
+
+    if 'preprocessing' in suites:
+        from benchmarks import bench_preprocessing
+        sizes = [int(size) for size in args.sizes.split(',') if size]
+        bench_preprocessing.run(bench, sizes=sizes)
+
+    if 'districts' in suites:
+        from benchmarks import bench_districts
+        bench_districts.run(bench, rows=args.district_rows)
+
+    if 'catalog' in suites:
+        from benchmarks import bench_catalog
+        bench_catalog.run(bench)
+
+    if 'fertilizer' in suites:
+        from benchmarks import bench_fertilizer
+        bench_fertilizer.run(bench)
+
+    if 'http' in suites:
+        from benchmarks import bench_http
+        bench_http.run(bench, predictor, base_url=args.http_url,
+                       requests=args.http_requests, concurrency=args.http_concurrency)
+
+    bench.save(args.output)
+
+    if args.baseline:
+        regressions = harness.compare(bench.to_dict(), harness.load_results(args.baseline), args.threshold)
+        harness.exit_on_regressions(regressions)
+
+
+if __name__ == '__main__':
+    main()
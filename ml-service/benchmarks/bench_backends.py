@@ -0,0 +1,72 @@
+import os
+import pandas as pd
+from models import PunjabCropPredictor, FEATURES
+from benchmarks.harness import measure, quiet
+from benchmarks.fixtures import sample_inputs
+
+
+def load_backends(model_dir, threads=1):
+    """Predictors over the same artifacts for every available backend, sklearn first.
+
+    The NumPy bundles (full and compact float32) and ONNX graphs are written
+    from the pickles when the model directory has none; onnxruntime is skipped
+    when it is not installed.
+    """
+    from model_bundle import BUNDLE_FILE, COMPACT_BUNDLE_FILE, save_bundle
+
+    backends = {}
+    with quiet():
+        reference = PunjabCropPredictor()
+        reference.load_models(model_dir, backend='sklearn')
+        backends['sklearn'] = reference
+        if not os.path.exists(os.path.join(model_dir, BUNDLE_FILE)):
+            save_bundle(reference, model_dir)
+        backends['numpy'] = PunjabCropPredictor()
+        backends['numpy'].load_models(model_dir, backend='numpy', precision='float64')
+        if not os.path.exists(os.path.join(model_dir, COMPACT_BUNDLE_FILE)):
+            save_bundle(reference, model_dir, precision='float32')
+        backends['numpy-float32'] = PunjabCropPredictor()
+        backends['numpy-float32'].load_models(model_dir, backend='numpy', precision='float32')
+
+        try:
+            from onnx_backend import ONNX_DIR, export_onnx
+            if not os.path.isdir(os.path.join(model_dir, ONNX_DIR)):
+                export_onnx(reference, model_dir)
+            onnx = PunjabCropPredictor()
+            onnx.load_models(model_dir, backend='sklearn')
+            onnx.use_backend('onnxruntime', model_dir, threads)
+            backends['onnxruntime'] = onnx
+        except ImportError as e:
+            print(f"⚠️ Skipping onnxruntime: {e}")
+    return backends
+
+
+def run(bench, model_dir, sizes=(1, 100, 10_000), threads=1, repeat=20):
+    """Single-row and batch latency of each inference backend"""
+    print(f"\n⚙️ Inference backend benchmarks (onnxruntime intra-op threads: {threads})")
+    backends = load_backends(model_dir, threads)
+
+    for rows in sizes:
+        frame = pd.DataFrame(sample_inputs(rows, seed=3))
+        with quiet():
+            features = backends['sklearn'].prepare_features(frame.copy())
+        X = features[FEATURES].to_numpy(dtype=float)
+        npk = features[['nitrogen', 'phosphorus', 'potassium']].to_numpy(dtype=float)
+        runs = repeat if rows <= 100 else max(3, repeat // 4)
+
+        for name, predictor in backends.items():
+            def models_only():
+                if predictor.onnx_models is not None:
+                    predictor.onnx_models.recommendation_prob(X)
+                    predictor.onnx_models.predicted_yield(X)
+                else:
+                    X_scaled = predictor.scaler.transform(X)
+                    predictor.crop_recommender.predict_proba(X_scaled)
+                    predictor.yield_predictor.predict(X_scaled)
+                predictor.soil_clusters(npk)
+
+            stats = measure(models_only, repeat=runs)
+            bench.record(f'backend.{name}.models_{rows}', stats, rows=rows)
+            with quiet():
+                stats = measure(lambda: predictor.predict_batch(frame), repeat=runs)
+            bench.record(f'backend.{name}.predict_batch_{rows}', stats, rows=rows)
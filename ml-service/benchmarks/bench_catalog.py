@@ -0,0 +1,43 @@
+import numpy as np
+from crop_catalog import CropCatalog, NUTRIENTS, default_catalog
+from benchmarks.harness import measure
+
+
+def synthetic_catalog(crops, seed=0):
+    """Catalog of the given size: the real crops plus random requirement profiles"""
+    rng = np.random.default_rng(seed)
+    base = default_catalog().crops
+    entries = [dict(base[i % len(base)], name=f"crop_{i}") for i in range(crops)]
+    for entry in entries[len(base):]:
+        for nutrient in NUTRIENTS:
+            optimal = float(rng.uniform(30, 200))
+            entry[nutrient] = {'min': optimal * 0.8, 'max': optimal * 1.2, 'optimal': optimal}
+    return CropCatalog(entries)
+
+
+def run(bench, sizes=(4, 7, 50, 200), rows=10_000, top_k=5, repeat=20):
+    """Benchmark catalog scoring and ranking as the number of crops grows"""
+    print("\n🌱 Crop catalog benchmarks")
+    rng = np.random.default_rng(1)
+    single = rng.uniform(20, 250, (1, len(NUTRIENTS)))
+    batch = rng.uniform(20, 250, (rows, len(NUTRIENTS)))
+
+    for crops in sizes:
+        catalog = synthetic_catalog(crops)
+        crop_index = rng.integers(0, crops, rows)
+
+        stats = measure(lambda: catalog.rank(catalog.suitability(single)), repeat=repeat * 10)
+        bench.record(f'catalog.{crops}_crops.rank_single', stats, rows=1)
+
+        stats = measure(lambda: catalog.suitability(batch), repeat=repeat)
+        bench.record(f'catalog.{crops}_crops.suitability_{rows}', stats, rows=rows)
+
+        scores = catalog.suitability(batch)
+        stats = measure(lambda: catalog.rank(scores), repeat=repeat)
+        bench.record(f'catalog.{crops}_crops.rank_full_{rows}', stats, rows=rows)
+
+        stats = measure(lambda: catalog.rank(scores, top_k), repeat=repeat)
+        bench.record(f'catalog.{crops}_crops.rank_top{top_k}_{rows}', stats, rows=rows)
+
+        stats = measure(lambda: catalog.deficits(batch, crop_index), repeat=repeat)
+        bench.record(f'catalog.{crops}_crops.deficits_{rows}', stats, rows=rows)
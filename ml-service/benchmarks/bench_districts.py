@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from districts import DistrictIndex, PUNJAB_DISTRICTS, DISTRICT_ALIASES
+from benchmarks.harness import measure
+
+# The substring scan extract_district_name used before the index
+LEGACY_DISTRICTS = [
+    'Amritsar', 'Bathinda', 'Ludhiana', 'Gurdaspur', 'Moga', 'Jalandhar',
+    'Ferozepur', 'Mansa', 'Muktsar', 'Sangrur', 'Hoshiarpur', 'Rupnagar',
+    'Kapurthala', 'Patiala', 'Fatehgarh Sahib', 'Mohali', 'Barnala',
+    'Faridkot', 'Taran - Taran'
+]
+
+
+def legacy_scan(region):
+    for district in LEGACY_DISTRICTS:
+        if district.lower() in region.lower():
+            return district
+    return None
+
+
+def region_column(rows, seed=0):
+    """Region strings mixing canonical names, aliases, misspellings, free text and unknowns"""
+    rng = np.random.default_rng(seed)
+    vocabulary = list(PUNJAB_DISTRICTS)
+    vocabulary += [alias for aliases in DISTRICT_ALIASES.values() for alias in aliases]
+    vocabulary += [f"{district} district" for district in PUNJAB_DISTRICTS]
+    vocabulary += [district.upper() for district in PUNJAB_DISTRICTS]
+    vocabulary += ['Ludhiyana', 'Jalandar', 'Hoshiyarpur', 'Sangroor', 'Amritsr', 'Kapurthla']
+    vocabulary += ['Unknown', 'Shivalik (forest)', 'Sandy Soils', 'Chandigarh']
+    return pd.Series(np.asarray(vocabulary, dtype=object)[rng.integers(0, len(vocabulary), rows)])
+
+
+def run(bench, rows=1_000_000):
+    """Benchmark district resolution over a region column"""
+    print("\n🗺️ District resolution benchmarks")
+    regions = region_column(rows)
+    encoder_classes = sorted(PUNJAB_DISTRICTS)
+
+    stats = measure(lambda: DistrictIndex(), repeat=20)
+    bench.record('district_index.build', stats)
+
+    # Cold index each run so every tier (including fuzzy) is exercised once per distinct string
+    stats = measure(lambda: DistrictIndex().resolve_many(regions), repeat=3, warmup=1)
+    bench.record(f'district_index.resolve_many.{rows}', stats, rows=rows)
+
+    index = DistrictIndex()
+    stats = measure(lambda: index.encode(regions, encoder_classes), repeat=3, warmup=1)
+    bench.record(f'district_index.encode.{rows}', stats, rows=rows)
+
+    values = regions.tolist()
+    stats = measure(lambda: [index.resolve(region) for region in values], repeat=3, warmup=1)
+    bench.record(f'district_index.resolve_loop.{rows}', stats, rows=rows)
+
+    stats = measure(lambda: [legacy_scan(region) for region in values], repeat=1, warmup=0)
+    bench.record(f'legacy_substring_scan.{rows}', stats, rows=rows)
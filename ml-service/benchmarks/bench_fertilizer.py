@@ -0,0 +1,33 @@
+import numpy as np
+from fertilizer_plan import FertilizerPlanner
+from benchmarks.harness import measure
+
+
+def run(bench, sizes=(1, 1_000, 10_000, 100_000), repeat=10):
+    """Benchmark least-cost fertilizer planning across batches of farms"""
+    print("\n🧪 Fertilizer planning benchmarks")
+    rng = np.random.default_rng(2)
+
+    stats = measure(FertilizerPlanner.load, repeat=repeat)
+    bench.record('fertilizer_plan.load', stats)
+
+    planner = FertilizerPlanner.load()
+    for farms in sizes:
+        deficits = rng.uniform(0, 150, (farms, 3))
+        deficits[rng.random(deficits.shape) < 0.3] = 0
+        stats = measure(lambda: planner.plan(deficits), repeat=repeat if farms <= 10_000 else 3, warmup=1)
+        bench.record(f'fertilizer_plan.plan_{farms}', stats, rows=farms)
+
+    # Reference: one LP solve per farm, as a generic solver would be used
+    try:
+        from scipy.optimize import linprog
+    except ImportError:
+        return
+    deficits = rng.uniform(0, 150, (200, 3))
+
+    def solve_each():
+        for row in deficits:
+            linprog(planner.prices, A_ub=-planner.contents, b_ub=-row, bounds=(0, None), method='highs')
+
+    stats = measure(solve_each, repeat=3, warmup=1)
+    bench.record('fertilizer_plan.linprog_loop_200', stats, rows=200)
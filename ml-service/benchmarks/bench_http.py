@@ -0,0 +1,81 @@
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.harness import summarize, quiet
+from benchmarks.fixtures import sample_inputs
+
+
+def start_local_service(predictor):
+    """Serve app.py on an ephemeral localhost port in a background thread"""
+    import logging
+    from werkzeug.serving import make_server
+    import app as service
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    service.predictor = predictor
+    service.model_loaded = True
+
+    server = make_server('127.0.0.1', 0, service.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def post_json(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def run(bench, predictor=None, base_url=None, requests=500, concurrency=8):
+    """Measure end-to-end HTTP throughput and latency of /predict/crop-recommendation"""
+    print("\n🌐 HTTP benchmarks")
+
+    server = None
+    if base_url is None:
+        server, base_url = start_local_service(predictor)
+
+    payloads = [
+        {
+            'soil_data': {k: row[k] for k in ('nitrogen', 'phosphorus', 'potassium', 'soil_type')},
+            'weather_data': {'rainfall': row['rainfall'], 'temperature': row['temperature']},
+            'location': row['district']
+        }
+        for row in sample_inputs(requests, seed=2)
+    ]
+    url = f"{base_url}/predict/crop-recommendation"
+
+    try:
+        with quiet():
+            # Warm up connections and lazy model state
+            for payload in payloads[:min(10, requests)]:
+                post_json(url, payload)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(lambda payload: post_json(url, payload), payloads))
+            wall = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, status in results if status != 200)
+    bench.record(
+        f'http.crop_recommendation.c{concurrency}', summarize(latencies),
+        requests=requests, concurrency=concurrency, errors=errors,
+        requests_per_sec=requests / wall
+    )
+    print(f"  throughput: {requests / wall:,.1f} req/s with {concurrency} concurrent clients ({errors} errors)")
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+from models import PunjabCropPredictor
+from benchmarks.harness import measure, quiet
+from benchmarks.fixtures import sample_inputs
+
+
+def run(bench, predictor, model_dir, batch_size=100, repeat=20):
+    """Benchmark model loading, feature preparation and the predictor entry points"""
+    print("\n🌾 Predictor benchmarks")
+
+    with quiet():
+        stats = measure(lambda: PunjabCropPredictor().load_models(model_dir), repeat=5, warmup=1)
+    bench.record('model_loading', stats)
+
+    single = sample_inputs(1)[0]
+    batch = sample_inputs(batch_size, seed=1)
+
+    single_frame = pd.DataFrame([single])
+    batch_frame = pd.DataFrame(batch)
+    with quiet():
+        stats = measure(lambda: predictor.prepare_features(single_frame.copy()), repeat=repeat)
+    bench.record('prepare_features.single', stats, rows=1)
+    with quiet():
+        stats = measure(lambda: predictor.prepare_features(batch_frame.copy()), repeat=repeat)
+    bench.record(f'prepare_features.batch_{batch_size}', stats, rows=batch_size)
+
+    def recommend_batch():
+        for row in batch:
+            predictor.get_crop_recommendations(row, row['district'])
+
+    with quiet():
+        stats = measure(lambda: predictor.get_crop_recommendations(single, single['district']), repeat=repeat)
+    bench.record('get_crop_recommendations.single', stats, rows=1)
+    with quiet():
+        stats = measure(recommend_batch, repeat=max(3, repeat // 4), warmup=1)
+    bench.record(f'get_crop_recommendations.batch_{batch_size}', stats, rows=batch_size)
+
+    with quiet():
+        stats = measure(lambda: predictor.predict_batch(batch_frame), repeat=repeat)
+    bench.record(f'predict_batch.batch_{batch_size}', stats, rows=batch_size)
+
+    def soil_batch():
+        for row in batch:
+            predictor.analyze_soil_health(row)
+
+    with quiet():
+        stats = measure(lambda: predictor.analyze_soil_health(single), repeat=repeat)
+    bench.record('analyze_soil_health.single', stats, rows=1)
+    with quiet():
+        stats = measure(soil_batch, repeat=max(3, repeat // 4), warmup=1)
+    bench.record(f'analyze_soil_health.batch_{batch_size}', stats, rows=batch_size)
+
+    def fertilizer_batch():
+        for row in batch:
+            predictor.get_fertilizer_recommendations(row, row['crop'])
+
+    with quiet():
+        stats = measure(lambda: predictor.get_fertilizer_recommendations(single, single['crop']), repeat=repeat)
+    bench.record('get_fertilizer_recommendations.single', stats, rows=1)
+    with quiet():
+        stats = measure(fertilizer_batch, repeat=max(3, repeat // 4), warmup=1)
+    bench.record(f'get_fertilizer_recommendations.batch_{batch_size}', stats, rows=batch_size)
+
+    axes = [('nitrogen', np.linspace(50, 250, 50)), ('phosphorus', np.linspace(10, 150, 50))]
+    with quiet():
+        stats = measure(lambda: predictor.sweep(single, axes, single['district']), repeat=max(3, repeat // 2))
+    bench.record('sweep.50x50', stats, rows=2500)
+
+    if predictor.resolve_tier('fast') == 'fast':
+        with quiet():
+            stats = measure(lambda: predictor.get_crop_recommendations(single, single['district'], tier='fast'),
+                            repeat=repeat)
+        bench.record('get_crop_recommendations.fast.single', stats, rows=1)
+        with quiet():
+            stats = measure(lambda: predictor.predict_batch(batch_frame, tier='fast'), repeat=repeat)
+        bench.record(f'predict_batch.fast.batch_{batch_size}', stats, rows=batch_size)
@@ -0,0 +1,20 @@
+from crop_trainer import PunjabCropTrainer
+from benchmarks.harness import measure, quiet
+from benchmarks.fixtures import synthetic_frame
+
+
+def run(bench, sizes=(10_000, 1_000_000)):
+    """Benchmark synthetic data generation and feature preparation at increasing row counts"""
+    print("\n🧪 Preprocessing benchmarks")
+
+    for rows in sizes:
+        frames = []
+        with quiet():
+            stats = measure(lambda: frames.append(synthetic_frame(rows)), repeat=1, warmup=0)
+        bench.record(f'generate_synthetic_data.{rows}', stats, rows=rows)
+
+        frame = frames[-1]
+        repeat = 5 if rows <= 100_000 else 2
+        with quiet():
+            stats = measure(lambda: PunjabCropTrainer().prepare_features(frame.copy()), repeat=repeat, warmup=1)
+        bench.record(f'prepare_features.fit.{rows}', stats, rows=rows)
@@ -0,0 +1,70 @@
+"""
+Parity check of the NumPy bundles and onnxruntime backends against sklearn.
+
+    python -m benchmarks.check_backend_parity --rows 20000
+
+Scores the same inputs with every available backend (writing the bundle and
+ONNX graphs from the pickles first if the model directory has none) and exits
+non-zero when recommendation probabilities or yields differ beyond tolerance,
+or any soil cluster differs.
+"""
+
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from benchmarks.harness import quiet
+from benchmarks.fixtures import load_or_train_predictor, sample_inputs
+from benchmarks.bench_backends import load_backends
+
+# onnxruntime and the compact bundle sum the forest's votes in float32; everything else runs in float64
+PROB_TOLERANCE = 1e-5
+YIELD_TOLERANCE = 1e-6
+
+
+def run(rows=20000, model_dir='./model', threads=1):
+    """Largest differences of each backend's predict_batch outputs from sklearn's"""
+    with quiet():
+        _, model_dir = load_or_train_predictor(model_dir)
+    backends = load_backends(model_dir, threads)
+
+    # Random inputs plus a few rows at the edges of the training ranges
+    frame = pd.DataFrame(sample_inputs(rows, seed=4))
+    frame.loc[:2, ['nitrogen', 'phosphorus', 'potassium']] = [[0, 0, 0], [50, 20, 30], [250, 150, 200]]
+    with quiet():
+        expected = backends.pop('sklearn').predict_batch(frame)
+
+    results = {}
+    for name, predictor in backends.items():
+        with quiet():
+            actual = predictor.predict_batch(frame)
+        results[name] = {
+            'recommendation_prob': float(np.abs(actual['recommendation_prob'] - expected['recommendation_prob']).max()),
+            'predicted_yield': float(np.abs(actual['predicted_yield'] - expected['predicted_yield']).max()
+                                     / max(1.0, np.abs(expected['predicted_yield']).max())),
+            'soil_cluster_mismatches': int((actual['soil_cluster'] != expected['soil_cluster']).sum())
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare every inference backend with sklearn')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    ok = True
+    for name, result in run(args.rows, args.model_dir, args.threads).items():
+        agrees = (result['recommendation_prob'] <= PROB_TOLERANCE and result['predicted_yield'] <= YIELD_TOLERANCE
+                  and result['soil_cluster_mismatches'] == 0)
+        ok = ok and agrees
+        print(f"{'✅' if agrees else '❌'} {name} vs sklearn on {args.rows} rows: "
+              f"max |Δ probability| {result['recommendation_prob']:.2e}, "
+              f"max relative |Δ yield| {result['predicted_yield']:.2e}, "
+              f"soil cluster mismatches {result['soil_cluster_mismatches']}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
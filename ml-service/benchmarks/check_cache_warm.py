@@ -0,0 +1,72 @@
+"""
+Cache warm-up check: records warmed with `python -m prediction_cache` must be
+served from the shared cache by the matching HTTP requests.
+
+    python -m benchmarks.check_cache_warm --records 50
+
+Half the records omit rainfall and temperature, so the district climate
+defaults have to match as well. Exits non-zero if any request misses.
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+from benchmarks.harness import quiet
+from benchmarks.fixtures import load_or_train_predictor, sample_inputs
+
+OPERATIONS = ('crop_recommendations', 'fertilizer_recommendations', 'soil_health')
+
+
+def run(records=50, model_dir='./model'):
+    """Cache hits and misses per operation for requests matching warmed records"""
+    import app as service
+    from metrics import metrics
+    from prediction_cache import PredictionCache
+
+    with quiet():
+        predictor, _ = load_or_train_predictor(model_dir)
+    rows = sample_inputs(records, seed=11)
+    for i, row in enumerate(rows):
+        row['location'] = row.pop('district')
+        if i % 2:
+            del row['rainfall'], row['temperature']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PredictionCache(os.path.join(tmp, 'predictions.db'), predictor.model_version)
+        with quiet():
+            cache.warm(predictor, rows)
+        service.predictor, service.model_loaded, service.prediction_cache = predictor, True, cache
+
+        before = {(name, op): metrics.get(f'prediction_cache_{name}_total', operation=op) or 0
+                  for name in ('hits', 'misses') for op in OPERATIONS}
+        client = service.app.test_client()
+        for row in rows:
+            body = {'soil_data': {name: row[name] for name in ('nitrogen', 'phosphorus', 'potassium', 'soil_type')},
+                    'weather_data': {name: row[name] for name in ('rainfall', 'temperature') if name in row},
+                    'location': row['location']}
+            with quiet():
+                client.post('/predict/crop-recommendation', json=body)
+        service.prediction_cache = None
+    return {key: (metrics.get(f'prediction_cache_{key[0]}_total', operation=key[1]) or 0) - value
+            for key, value in before.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check that warmed cache entries are hit by live requests')
+    parser.add_argument('--records', type=int, default=50)
+    parser.add_argument('--model-dir', default='./model')
+    args = parser.parse_args(argv)
+
+    counts = run(args.records, args.model_dir)
+    ok = True
+    for operation in OPERATIONS:
+        hits, misses = counts[('hits', operation)], counts[('misses', operation)]
+        served = hits == args.records and misses == 0
+        ok = ok and served
+        print(f"{'✅' if served else '❌'} {operation}: {hits} hits, {misses} misses for {args.records} warmed inputs")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
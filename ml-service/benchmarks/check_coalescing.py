@@ -0,0 +1,89 @@
+"""
+Coalescing check: fire many concurrent identical requests and assert the model
+is evaluated once.
+
+    python -m benchmarks.check_coalescing --requests 500
+
+Admission control is disabled for this process so every request is in flight
+at the same time, and the model call is slowed down so they all overlap with
+the first evaluation. Exits non-zero if more than one evaluation happened.
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+
+os.environ['ML_MAX_IN_FLIGHT'] = '0'
+
+from benchmarks.harness import quiet
+from benchmarks.fixtures import load_or_train_predictor
+
+
+def run(requests=500, delay=0.5, model_dir='./model'):
+    """Return (evaluations, coalesced, status codes) for concurrent identical requests"""
+    import app as service
+    from metrics import metrics
+
+    with quiet():
+        predictor, _ = load_or_train_predictor(model_dir)
+    service.predictor = predictor
+    service.model_loaded = True
+    service.prediction_cache = None
+
+    evaluations = []
+    original = predictor.get_crop_recommendations
+
+    def counted(*args, **kwargs):
+        evaluations.append(1)
+        time.sleep(delay)
+        return original(*args, **kwargs)
+
+    predictor.get_crop_recommendations = counted
+
+    payload = {
+        'soil_data': {'nitrogen': 140, 'phosphorus': 60, 'potassium': 80, 'soil_type': 'loamy'},
+        'weather_data': {'rainfall': 800, 'temperature': 28},
+        'location': 'Ludhiana'
+    }
+    client = service.app.test_client()
+    barrier = threading.Barrier(requests)
+    statuses = []
+
+    def fire():
+        barrier.wait()
+        statuses.append(client.post('/predict/crop-recommendation', json=payload).status_code)
+
+    coalesced_before = metrics.get('singleflight_coalesced_total', operation='crop_recommendations') or 0
+    threads = [threading.Thread(target=fire) for _ in range(requests)]
+    with quiet():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    coalesced = (metrics.get('singleflight_coalesced_total', operation='crop_recommendations') or 0) - coalesced_before
+    return len(evaluations), coalesced, statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check in-flight coalescing of identical predictions')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--delay', type=float, default=0.5, help='seconds added to each model evaluation')
+    parser.add_argument('--model-dir', default='./model')
+    args = parser.parse_args(argv)
+
+    evaluations, coalesced, statuses = run(args.requests, args.delay, args.model_dir)
+    ok = sum(1 for status in statuses if status == 200)
+    print(f"🔁 {args.requests} concurrent identical requests: {evaluations} model evaluation(s), "
+          f"{coalesced} coalesced, {ok} x 200")
+
+    if evaluations != 1 or ok != args.requests:
+        print("❌ Coalescing check failed")
+        sys.exit(1)
+    print("✅ Coalescing check passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Compact (float32) bundle check: size, per-worker RSS, latency and deviation.
+
+    python -m benchmarks.check_compact --rows 20000
+
+Writes model_bundle_f32.npz next to the full bundle if it is missing, then
+loads each precision with the numpy backend in a fresh interpreter (one
+"worker") and reports the bundle file size, the bytes of model arrays, the
+worker's RSS after loading and after scoring, and single-row and batch
+latency. Both workers score the same inputs on both tiers; the check exits
+non-zero when the compact models deviate beyond tolerance or change any
+soil cluster.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+# The forest takes identical paths; only float32 leaf sums and MLP arithmetic differ
+PROB_TOLERANCE = 1e-5
+YIELD_TOLERANCE = 1e-5
+
+
+def probe(model_dir, precision, rows, output):
+    """Load, time and score in this process; predictions go to output (.npz), stats are returned"""
+    import pandas as pd
+    from benchmarks.harness import measure, quiet, current_rss, PeakRSS
+    from benchmarks.fixtures import sample_inputs
+    from models import PunjabCropPredictor, FEATURES
+    from warmup import model_arrays
+
+    frame = pd.DataFrame(sample_inputs(rows, seed=4))
+    frame.loc[:2, ['nitrogen', 'phosphorus', 'potassium']] = [[0, 0, 0], [50, 20, 30], [250, 150, 200]]
+    single = frame.iloc[:1].reset_index(drop=True)
+
+    rss_start = current_rss()
+    predictor = PunjabCropPredictor()
+    with quiet():
+        predictor.load_models(model_dir, backend='numpy', precision=precision)
+    rss_loaded = current_rss()
+
+    components = [predictor.scaler, predictor.soil_scaler, predictor.crop_recommender, predictor.yield_predictor,
+                  predictor.soil_classifier, predictor.student]
+    with quiet():
+        X = predictor.scaler.transform(predictor.prepare_features(frame.copy())[FEATURES].to_numpy(dtype=float))
+        with PeakRSS() as rss:
+            tiers = ['full', 'fast'] if predictor.student is not None else ['full']
+            outputs = {tier: predictor.predict_batch(frame, tier=tier) for tier in tiers}
+        single_ms = measure(lambda: predictor.predict_batch(single), repeat=200)['median'] * 1000
+        batch_ms = measure(lambda: predictor.predict_batch(frame), repeat=10)['median'] * 1000
+    models_ms = measure(lambda: (predictor.crop_recommender.predict_proba(X), predictor.yield_predictor.predict(X)),
+                        repeat=10)['median'] * 1000
+
+    np.savez(output, **{f"{tier}_{key}": np.asarray(values) for tier, result in outputs.items()
+                        for key, values in result.items() if key in ('recommendation_prob', 'predicted_yield',
+                                                                      'soil_cluster')})
+    return {
+        'precision': predictor.precision,
+        'model_bytes': sum(array.nbytes for array in model_arrays(components)),
+        'rss_start': rss_start, 'rss_loaded': rss_loaded, 'rss_scoring_peak': rss.peak,
+        'single_ms': single_ms, 'batch_ms': batch_ms, 'models_ms': models_ms
+    }
+
+
+def run_probe(model_dir, precision, rows, output):
+    command = [sys.executable, '-m', 'benchmarks.check_compact', '--probe', precision, '--model-dir', model_dir,
+               '--rows', str(rows), '--output', output]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def deviations(full, compact):
+    """Largest differences of the compact outputs from the full ones, per tier"""
+    results = {}
+    for tier in sorted({name.split('_', 1)[0] for name in full.files}):
+        prob, yields = f'{tier}_recommendation_prob', f'{tier}_predicted_yield'
+        results[tier] = {
+            'recommendation_prob': float(np.abs(compact[prob] - full[prob]).max()),
+            'predicted_yield': float(np.abs(compact[yields] - full[yields]).max()
+                                     / max(1.0, np.abs(full[yields]).max())),
+            'soil_cluster_mismatches': int((compact[f'{tier}_soil_cluster'] != full[f'{tier}_soil_cluster']).sum())
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the compact float32 bundle with the full one')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--probe', choices=['float64', 'float32'], help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        print(json.dumps(probe(args.model_dir, args.probe, args.rows, args.output)))
+        return
+
+    from benchmarks.harness import quiet
+    from benchmarks.fixtures import load_or_train_predictor
+    from model_bundle import BUNDLE_FILES, save_bundle
+
+    with quiet():
+        predictor, model_dir = load_or_train_predictor(args.model_dir)
+        for precision, name in BUNDLE_FILES.items():
+            if not os.path.exists(os.path.join(model_dir, name)):
+                save_bundle(predictor, model_dir, precision)
+
+    results, predictions = {}, {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for precision in BUNDLE_FILES:
+            output = os.path.join(scratch, f'{precision}.npz')
+            results[precision] = run_probe(model_dir, precision, args.rows, output)
+            predictions[precision] = np.load(output)
+        tiers = deviations(predictions['float64'], predictions['float32'])
+
+    print(f"📦 Compact bundle on {args.rows} rows ({model_dir})")
+    print(f"{'':<10}{'file MB':>9}{'arrays MB':>11}{'RSS loaded':>12}{'RSS scoring':>13}"
+          f"{'1 row ms':>10}{'batch ms':>10}{'models ms':>11}")
+    for precision, result in results.items():
+        size = os.path.getsize(os.path.join(model_dir, BUNDLE_FILES[precision]))
+        print(f"{precision:<10}{size / 1e6:>9.2f}{result['model_bytes'] / 1e6:>11.2f}"
+              f"{result['rss_loaded'] / 1e6:>12.1f}{result['rss_scoring_peak'] / 1e6:>13.1f}"
+              f"{result['single_ms']:>10.3f}{result['batch_ms']:>10.1f}{result['models_ms']:>11.1f}")
+
+    ok = True
+    for tier, result in tiers.items():
+        agrees = (result['recommendation_prob'] <= PROB_TOLERANCE and result['predicted_yield'] <= YIELD_TOLERANCE
+                  and result['soil_cluster_mismatches'] == 0)
+        ok = ok and agrees
+        print(f"{'✅' if agrees else '❌'} float32 vs float64 ({tier} tier): "
+              f"max |Δ probability| {result['recommendation_prob']:.2e}, "
+              f"max relative |Δ yield| {result['predicted_yield']:.2e}, "
+              f"soil cluster mismatches {result['soil_cluster_mismatches']}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
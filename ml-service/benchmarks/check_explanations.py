@@ -0,0 +1,131 @@
+"""
+Explanation check: tree-path contributions against a per-row reference, and cost per row.
+
+    python -m benchmarks.check_explanations --rows 10000
+
+1. Contributions from TreeEnsemble.contributions are compared with a
+   reference that walks each sklearn tree's decision path row by row.
+2. Bias plus contributions must give predict_batch's full-tier
+   recommendation_prob for both bundle precisions.
+3. The path table build and explain_batch at 1, 100, 1000 and --rows rows are
+   timed and reported per row, with the cost of serving a cached batch.
+
+Exits non-zero when the contributions differ from the reference or do not
+add up to the served probability.
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from benchmarks.harness import measure, quiet
+from benchmarks.fixtures import load_or_train_predictor, sample_inputs
+
+REFERENCE_TOLERANCE = 1e-9
+# float32 leaf values and path sums against the float32 forest's own probability
+ADDITIVITY_TOLERANCE = {'float64': 1e-9, 'float32': 1e-5}
+
+
+def reference_contributions(forest, X_scaled, column=1):
+    """Per-row, per-tree walk of sklearn decision paths (reference only)"""
+    X_scaled = X_scaled.astype(np.float32)
+    contributions = np.zeros(X_scaled.shape)
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        fractions = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+        paths = estimator.decision_path(X_scaled)
+        for row in range(len(X_scaled)):
+            nodes = paths.indices[paths.indptr[row]:paths.indptr[row + 1]]
+            for parent, child in zip(nodes[:-1], nodes[1:]):
+                contributions[row, tree.feature[parent]] += fractions[child, column] - fractions[parent, column]
+    return contributions / len(forest.estimators_)
+
+
+def check_reference(model_dir, rows):
+    """Largest difference of the vectorized contributions from the per-row reference"""
+    from models import PunjabCropPredictor
+
+    with quiet():
+        reference = PunjabCropPredictor()
+        reference.load_models(model_dir, backend='sklearn')
+        X_scaled = reference.scaler.transform(reference.input_matrix(pd.DataFrame(sample_inputs(rows, seed=7))))
+    expected = reference_contributions(reference.crop_recommender, X_scaled)
+    _, actual = reference.vote_ensemble.contributions(X_scaled)
+    return float(np.abs(actual - expected).max())
+
+
+def check_additivity(model_dir, rows):
+    """Largest |bias + contributions - recommendation_prob| per bundle precision"""
+    from models import PunjabCropPredictor
+
+    frame = pd.DataFrame(sample_inputs(rows, seed=8))
+    results = {}
+    for precision in ADDITIVITY_TOLERANCE:
+        with quiet():
+            predictor = PunjabCropPredictor()
+            predictor.load_models(model_dir, backend='numpy', precision=precision)
+            explained = predictor.explain_batch(frame)
+            served = predictor.predict_batch(frame, tier='full')['recommendation_prob']
+        results[predictor.precision] = float(np.abs(explained['recommendation_prob'] - served).max())
+    return results
+
+
+def time_explanations(predictor, sizes):
+    """Path table build (s) and per-row explain_batch / cached explain cost (µs) per batch size"""
+    from explanations import ExplanationCache, explain
+
+    ensemble = predictor.vote_ensemble
+    ensemble._path_tables.clear()
+    start = time.perf_counter()
+    ensemble.path_table(1, len(predictor.scaler.mean_))
+    build = time.perf_counter() - start
+
+    results = {}
+    for rows in sizes:
+        # Records shaped like the endpoint's processed inputs
+        frame = pd.DataFrame(sample_inputs(rows, seed=9)).drop(columns='crop').rename(columns={'district': 'location'})
+        records = frame.to_dict('records')
+        cache = ExplanationCache(max_entries=rows)
+        runs = 50 if rows <= 100 else 5
+        with quiet():
+            batch = measure(lambda: predictor.explain_batch(frame), repeat=runs)['median']
+            summaries = measure(lambda: explain(predictor, records), repeat=max(3, runs // 5))['median']
+            explain(predictor, records, cache)
+            cached = measure(lambda: explain(predictor, records, cache), repeat=runs)['median']
+        results[rows] = (batch * 1e6 / rows, summaries * 1e6 / rows, cached * 1e6 / rows)
+    return build, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check per-prediction explanations and their cost')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--model-dir', default='./model')
+    args = parser.parse_args(argv)
+
+    with quiet():
+        predictor, model_dir = load_or_train_predictor(args.model_dir)
+    ok = True
+
+    difference = check_reference(model_dir, min(args.rows, 500))
+    agrees = difference <= REFERENCE_TOLERANCE
+    ok = ok and agrees
+    print(f"{'✅' if agrees else '❌'} Contributions vs per-row decision-path reference: max |Δ| {difference:.1e}")
+
+    for precision, difference in check_additivity(model_dir, min(args.rows, 5000)).items():
+        adds_up = difference <= ADDITIVITY_TOLERANCE[precision]
+        ok = ok and adds_up
+        print(f"{'✅' if adds_up else '❌'} {precision}: bias + contributions vs served probability, "
+              f"max |Δ| {difference:.1e}")
+
+    build, results = time_explanations(predictor, sorted({1, 100, 1000, args.rows}))
+    print(f"⏱️ Path table for {predictor.vote_ensemble.n_estimators} trees "
+          f"({len(predictor.vote_ensemble.value)} nodes): {build * 1000:.1f} ms")
+    print(f"{'rows':>8}{'explain_batch µs/row':>22}{'with summaries µs/row':>23}{'cached µs/row':>15}")
+    for rows, (batch, summaries, cached) in results.items():
+        print(f"{rows:>8}{batch:>22.1f}{summaries:>23.1f}{cached:>15.1f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Yield forecast check: vectorized features against pandas, backtest error and timings.
+
+    python -m benchmarks.check_forecast --data-dir .. --replicas 100
+
+1. The panel features are compared with the same features computed per
+   district with pandas groupby shift/rolling.
+2. The out-of-sample backtest error of each model and of the per-district
+   choice is reported.
+3. Feature building, fitting and the all-district forecast are timed on the real panel and on --replicas noisy
+   copies of it, to show how the work scales with the number of districts.
+
+Exits non-zero when the features differ from the pandas reference.
+"""
+
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from benchmarks.harness import measure
+from yield_forecast import (YieldPanel, YieldForecaster, FEATURES, FORECAST_MODELS, HISTORY_YEARS,
+                            YIELD_FILE, AREA_FILE)
+
+FEATURE_TOLERANCE = 1e-9
+
+
+def reference_features(panel):
+    """The same features from a long frame with pandas groupby shift/rolling (reference only)"""
+    frame = pd.DataFrame({name: values.ravel() for name, values in panel.series.items()})
+    frame['district'] = np.repeat(np.arange(len(panel.districts)), len(panel.years))
+    # The season to forecast: one empty row per district
+    empty = pd.DataFrame({'district': np.arange(len(panel.districts))})
+    frame = pd.concat([frame, empty]).sort_values('district', kind='stable').reset_index(drop=True)
+    grouped = frame.groupby('district')
+
+    def lag(column, k):
+        return grouped[column].shift(k)
+
+    def before(column, window):
+        return lag(column, 1).groupby(frame['district']).rolling(window).mean().reset_index(level=0, drop=True)
+
+    offsets = np.arange(HISTORY_YEARS) - (HISTORY_YEARS - 1) / 2
+    trend = lag('yield', 1).groupby(frame['district']).rolling(HISTORY_YEARS).apply(
+        lambda window: window @ (offsets / (offsets ** 2).sum()), raw=True).reset_index(level=0, drop=True)
+    columns = {
+        'change_1': lag('yield', 1) - lag('yield', 2),
+        'change_2': lag('yield', 2) - lag('yield', 3),
+        'trend_5': trend,
+        'mean_gap': before('yield', 3) - before('yield', HISTORY_YEARS),
+        'rainfall_anomaly': lag('rainfall', 1) - before('rainfall', HISTORY_YEARS),
+        'temperature_anomaly': lag('temperature', 1) - before('temperature', HISTORY_YEARS),
+        'rice_area_change': np.log(lag('rice_area', 1) / lag('rice_area', 2)),
+        'wheat_area_change': np.log(lag('wheat_area', 1) / lag('wheat_area', 2))
+    }
+    shape = (len(panel.districts), len(panel.years) + 1)
+    return np.stack([columns[name].to_numpy().reshape(shape) for name in FEATURES], axis=-1)
+
+
+def replicate(panel, copies, seed=0):
+    """Panel of `copies` noisy copies of every district (yield and weather jittered by a few percent)"""
+    rng = np.random.default_rng(seed)
+    series = {name: np.concatenate([values * rng.normal(1, 0.03, values.shape) for _ in range(copies)])
+              for name, values in panel.series.items()}
+    districts = [f"{name}-{copy}" for copy in range(copies) for name in panel.districts]
+    return YieldPanel(districts, panel.years, series)
+
+
+def time_panel(panel):
+    """Median seconds for features, fit and the all-district forecast"""
+    forecaster = YieldForecaster.fit(panel)
+    return {
+        'features': measure(panel.features, repeat=10)['median'],
+        'fit': measure(lambda: YieldForecaster.fit(panel), repeat=3)['median'],
+        'forecast': measure(lambda: forecaster.forecast(panel), repeat=10)['median']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the district yield forecasters')
+    parser.add_argument('--data-dir', default='..')
+    parser.add_argument('--replicas', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    panel = YieldPanel.read(f"{args.data_dir}/{YIELD_FILE}", f"{args.data_dir}/{AREA_FILE}")
+    X, _, _, _ = panel.features()
+    expected = reference_features(panel)
+    both = ~np.isnan(expected) & ~np.isnan(X)
+    same_missing = bool((np.isnan(expected) == np.isnan(X)).all())
+    difference = float(np.abs(X[both] - expected[both]).max())
+    ok = same_missing and difference <= FEATURE_TOLERANCE
+    print(f"{'✅' if ok else '❌'} Features vs pandas groupby reference: max |Δ| {difference:.1e}, "
+          f"missing cells {'match' if same_missing else 'differ'}")
+
+    forecaster = YieldForecaster.fit(panel)
+    mae = np.nanmean(forecaster.backtest_mae, axis=1)
+    print(f"📈 Out-of-sample backtest MAE ({len(panel.districts)} districts): "
+          + ', '.join(f"{name} {value:.0f}" for name, value in zip(FORECAST_MODELS, mae))
+          + f", per-district choice {np.nanmean(forecaster.selection_mae):.0f} kg/ha")
+
+    print(f"{'districts':>10}{'features ms':>13}{'fit ms':>10}{'forecast ms':>13}")
+    for scaled in [panel, replicate(panel, args.replicas)]:
+        timings = time_panel(scaled)
+        print(f"{len(scaled.districts):>10}{timings['features'] * 1000:>13.2f}{timings['fit'] * 1000:>10.1f}"
+              f"{timings['forecast'] * 1000:>13.2f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Shadow scoring check: agreement with itself, disagreements with a candidate,
+and what shadowing costs the request path.
+
+    python -m benchmarks.check_shadow --model-dir ./model --candidate-dir ./model-candidate
+
+1. The live model shadowing itself must record no disagreements.
+2. The candidate (--candidate-dir, or the float32 bundle of the live model
+   when omitted) is compared on --rows inputs and its summary printed.
+3. submit() is timed against a stalled scorer (no workers, small queue):
+   overflow must be dropped and counted, never waited on.
+4. /predict/crop-recommendation latency through the Flask test client with
+   shadowing off and at each --rates sample rate.
+
+Exits non-zero when the self-comparison disagrees or overflow is not dropped.
+"""
+
+import sys
+import time
+import argparse
+from benchmarks.harness import quiet, summarize
+from benchmarks.fixtures import load_or_train_predictor, sample_inputs
+
+
+def primary_answers(predictor, rows):
+    """(inputs, tier, recommendations, soil_health) per row, as the endpoint submits them"""
+    tier = predictor.resolve_tier()
+    items = []
+    for row in rows:
+        inputs = {name: value for name, value in row.items() if name != 'crop'}
+        soil = {name: value for name, value in inputs.items() if name != 'district'}
+        items.append((inputs, tier, predictor.get_crop_recommendations(soil, inputs['district'], tier=tier),
+                      predictor.analyze_soil_health(soil)))
+    return items
+
+
+def shadow_summary(candidate, items):
+    """Summary after every item went through a started scorer (sample rate 1)"""
+    from shadow import ShadowScorer
+
+    scorer = ShadowScorer(candidate, sample_rate=1, queue_size=len(items)).start()
+    for item in items:
+        scorer.submit(*item)
+    scorer.drain()
+    return scorer.summary()
+
+
+def check_overflow(candidate, item, queue_size=8, submits=10000):
+    """Per-call submit cost (µs) and counts against a scorer whose workers never run"""
+    from shadow import ShadowScorer
+
+    scorer = ShadowScorer(candidate, sample_rate=1, queue_size=queue_size)
+    start = time.perf_counter()
+    for _ in range(submits):
+        scorer.submit(*item)
+    elapsed = time.perf_counter() - start
+    return elapsed * 1e6 / submits, scorer.summary()
+
+
+def request_latency(predictor, candidate, rate, requests):
+    """Crop recommendation latency stats (s) with shadowing off (rate None) or at rate"""
+    import app as service
+    from shadow import ShadowScorer
+
+    service.predictor, service.model_loaded = predictor, True
+    service.shadow = ShadowScorer(candidate, sample_rate=rate).start() if rate is not None else None
+    client = service.app.test_client()
+    bodies = [{'soil_data': {name: row[name] for name in ('nitrogen', 'phosphorus', 'potassium', 'soil_type')},
+               'weather_data': {'rainfall': row['rainfall'], 'temperature': row['temperature']},
+               'location': row['district']} for row in sample_inputs(requests, seed=3)]
+    times = []
+    for body in bodies:
+        start = time.perf_counter()
+        client.post('/predict/crop-recommendation', json=body)
+        times.append(time.perf_counter() - start)
+    compared = 0
+    if service.shadow:
+        service.shadow.drain()
+        compared = service.shadow.summary()['compared']
+    return summarize(times), compared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check shadow scoring of a candidate model')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--candidate-dir', default=None)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.05, 1.0])
+    args = parser.parse_args(argv)
+
+    from models import PunjabCropPredictor
+
+    with quiet():
+        predictor, model_dir = load_or_train_predictor(args.model_dir)
+        candidate = PunjabCropPredictor()
+        if args.candidate_dir:
+            candidate.load_models(args.candidate_dir)
+        else:
+            candidate.load_models(model_dir, backend='numpy', precision='float32')
+        items = primary_answers(predictor, sample_inputs(args.rows, seed=5))
+    ok = True
+
+    with quiet():
+        itself = shadow_summary(predictor, items)
+        summary = shadow_summary(candidate, items)
+    agrees = itself['compared'] == len(items) and itself['disagreement_rate'] == 0
+    ok = ok and agrees
+    print(f"{'✅' if agrees else '❌'} Live model vs itself: {itself['compared']} compared, "
+          f"disagreement rate {itself['disagreement_rate']:.3f}")
+
+    print(f"👥 Candidate {candidate.model_version} ({args.candidate_dir or 'float32 bundle'}) vs "
+          f"{predictor.model_version} on {summary['compared']} inputs: disagreement rate "
+          f"{summary['disagreement_rate']:.3f}, rank changes {summary['rank_change_rate']:.3f}, top crop "
+          f"{summary['top_crop_change_rate']:.3f}, soil health changes {summary['soil_health_change_rate']:.3f}, "
+          f"mean |Δ yield| {summary['mean_abs_yield_delta']:.1f} kg/ha, "
+          f"mean |Δ confidence| {summary['mean_abs_confidence_delta']:.3f}")
+
+    cost, stalled = check_overflow(candidate, items[0])
+    drops = stalled['sampled'] == 8 and stalled['dropped'] == 10000 - 8
+    ok = ok and drops
+    print(f"{'✅' if drops else '❌'} Stalled scorer: {stalled['sampled']} queued, {stalled['dropped']} dropped, "
+          f"submit {cost:.2f} µs per call")
+
+    with quiet():
+        request_latency(predictor, candidate, None, min(args.requests, 100))
+    print(f"{'shadow':>10}{'p50 ms':>10}{'p99 ms':>10}{'compared':>10}")
+    for rate in [None] + args.rates:
+        with quiet():
+            stats, compared = request_latency(predictor, candidate, rate, args.requests)
+        label = 'off' if rate is None else f"{rate:.0%}"
+        print(f"{label:>10}{stats['median'] * 1000:>10.2f}{stats['p99'] * 1000:>10.2f}{compared:>10}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
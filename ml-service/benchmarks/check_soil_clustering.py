@@ -0,0 +1,136 @@
+"""
+Soil classifier check: MiniBatchKMeans streamed from disk against full KMeans.
+
+    python -m benchmarks.check_soil_clustering --rows 10000000
+
+Writes synthetic soil-card NPK rows, drawn around a few fertility profiles,
+to an .npy file (reused across runs), then fits the soil classifier both ways, each in a fresh process so peak RSS
+is comparable:
+
+    kmeans      load everything, StandardScaler + KMeans(n_init=10)   (build_soil_classifier)
+    minibatch   two streamed passes, parallel init + MiniBatchKMeans  (build_soil_classifier_streaming)
+
+Both models then label every row. Inertia is measured in the full KMeans
+model's scaled space, and label agreement is computed after matching
+cluster ids. (Uniformly spread NPK, as in train_models' generator, has several
+mirror-image optima of equal inertia, so agreement would be meaningless there.) The check exits non-zero when agreement or inertia fall outside
+the given tolerances.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+
+# Soil-card NPK profiles (kg/ha): depleted, low-P, average, high-K, well-fertilized
+SOIL_PROFILES = np.array([[80, 20, 60], [130, 25, 150], [160, 60, 110], [120, 70, 190], [220, 110, 170]], dtype=float)
+PROFILE_SPREAD = np.array([18, 9, 16])
+
+
+def write_npk(path, rows, chunk_rows=1_000_000, seed=42):
+    """Synthetic soil-card NPK rows drawn around SOIL_PROFILES, written to an .npy file chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    npk = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(rows, 3))
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        profile = rng.integers(0, len(SOIL_PROFILES), n)
+        npk[start:start + n] = np.maximum(SOIL_PROFILES[profile] + rng.normal(0, 1, (n, 3)) * PROFILE_SPREAD, 0)
+    npk.flush()
+    del npk
+
+
+def fit(method, path, chunk_rows, workers):
+    """Fit one way in this process; returns timings, RSS and the fitted scaler/centres"""
+    from crop_trainer import PunjabCropTrainer
+    from training_data import TrainingData
+    from benchmarks.harness import quiet
+
+    from benchmarks.harness import PeakRSS
+
+    trainer = PunjabCropTrainer()
+    start = time.perf_counter()
+    with quiet(), PeakRSS() as rss:
+        if method == 'kmeans':
+            npk = np.load(path)
+            trainer.build_soil_classifier(TrainingData(npk, {}, npk, len(npk)))
+        else:
+            trainer.build_soil_classifier_streaming(path, chunk_rows, workers)
+    return {
+        'seconds': time.perf_counter() - start,
+        'rss_before': rss.start,
+        'peak_rss': rss.peak,
+        'mean': trainer.soil_scaler.mean_.tolist(),
+        'scale': trainer.soil_scaler.scale_.tolist(),
+        'centers': trainer.soil_classifier.cluster_centers_.tolist(),
+        'labels': trainer.soil_health_labels
+    }
+
+
+def run_fit(method, path, chunk_rows, workers):
+    command = [sys.executable, '-m', 'benchmarks.check_soil_clustering', '--fit', method, '--data', path,
+               '--chunk-rows', str(chunk_rows)] + (['--workers', str(workers)] if workers else [])
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(path, kmeans, minibatch, chunk_rows):
+    """Inertia of both models in KMeans' scaled space and their matched label agreement"""
+    from model_bundle import Standardizer
+    from soil_clustering import assign_chunks, label_agreement, iter_npk_chunks
+
+    scaler = Standardizer(kmeans['mean'], kmeans['scale'])
+    # MiniBatch centres back to raw NPK, then into the KMeans scaled space
+    raw_centers = np.asarray(minibatch['centers']) * minibatch['scale'] + minibatch['mean']
+    minibatch_centers = scaler.transform(raw_centers)
+
+    labels_kmeans, inertia_kmeans = assign_chunks(scaler, np.asarray(kmeans['centers']),
+                                                  iter_npk_chunks(path, chunk_rows))
+    labels_minibatch, inertia_minibatch = assign_chunks(scaler, minibatch_centers, iter_npk_chunks(path, chunk_rows))
+    return inertia_kmeans, inertia_minibatch, label_agreement(labels_kmeans, labels_minibatch)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare streamed MiniBatchKMeans with full KMeans')
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--data', default=None, help='NPK .npy file (written if missing)')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=None, help='threads for the parallel initialization')
+    parser.add_argument('--min-agreement', type=float, default=0.95)
+    parser.add_argument('--max-inertia-ratio', type=float, default=1.02)
+    parser.add_argument('--fit', choices=['kmeans', 'minibatch'], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.fit:
+        print(json.dumps(fit(args.fit, args.data, args.chunk_rows, args.workers)))
+        return
+
+    path = args.data or os.path.join(tempfile.gettempdir(), f'soil_cards_npk_{args.rows}.npy')
+    if not os.path.exists(path) or len(np.load(path, mmap_mode='r')) != args.rows:
+        print(f"🧪 Writing {args.rows} synthetic NPK rows to {path}...")
+        write_npk(path, args.rows, args.chunk_rows)
+
+    results = {method: run_fit(method, path, args.chunk_rows, args.workers) for method in ('kmeans', 'minibatch')}
+    for method, result in results.items():
+        print(f"🌍 {method:<10} {result['seconds']:8.1f} s   peak RSS {result['peak_rss'] / 1e6:7.0f} MB "
+              f"({(result['peak_rss'] - result['rss_before']) / 1e6:+.0f} MB over imports)   "
+              f"categories {result['labels']}")
+
+    inertia_kmeans, inertia_minibatch, agreement = compare(path, results['kmeans'], results['minibatch'],
+                                                           args.chunk_rows)
+    ratio = inertia_minibatch / inertia_kmeans
+    print(f"📊 Inertia (KMeans scaled space): kmeans {inertia_kmeans:.4e}, minibatch {inertia_minibatch:.4e} "
+          f"(ratio {ratio:.4f}); label agreement {agreement:.2%}")
+
+    if agreement < args.min_agreement or ratio > args.max_inertia_ratio:
+        print("❌ MiniBatchKMeans differs from full KMeans beyond tolerance")
+        sys.exit(1)
+    print("✅ Soil clustering check passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Startup check: how long the service takes to import and load its models, how
+much memory that costs, and which heavy libraries it pulls in.
+
+    python -m benchmarks.check_startup --model-dir ./model
+
+Each measurement runs in a fresh interpreter so nothing is already imported.
+Exits non-zero if importing app or loading the default (numpy) backend imports
+pandas, sklearn or joblib, which only training, batch scoring and the sklearn
+backend should need.
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+
+HEAVY_MODULES = ('pandas', 'sklearn', 'joblib', 'scipy', 'matplotlib', 'onnxruntime')
+FORBIDDEN_MODULES = ('pandas', 'sklearn', 'joblib')
+
+PROBE = """
+import sys, json, time, resource
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+imported_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy_after_import = [name for name in {heavy!r} if name in sys.modules]
+from models import PunjabCropPredictor
+predictor = PunjabCropPredictor()
+predictor.load_models({model_dir!r}, backend={backend!r})
+predictor.get_crop_recommendations({{'nitrogen': 150, 'phosphorus': 40, 'potassium': 100}}, 'Ludhiana')
+loaded = time.perf_counter()
+print(json.dumps({{
+    'import_seconds': imported - start,
+    'load_and_first_prediction_seconds': loaded - imported,
+    'import_rss_mb': imported_rss / 1024,
+    'loaded_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy_after_import': heavy_after_import,
+    'heavy_after_load': [name for name in {heavy!r} if name in sys.modules],
+    'backend': predictor.backend
+}}))
+"""
+
+
+def probe(model_dir='./model', backend='numpy'):
+    """Startup measurements of a fresh interpreter serving with the given backend"""
+    code = PROBE.format(heavy=HEAVY_MODULES, model_dir=model_dir, backend=backend)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(limit=10):
+    """Top-level packages that take longest to import with app, from -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            capture_output=True, text=True, check=True)
+    packages = {}
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        # Only the outermost import of each package carries its full cumulative time
+        if not name.startswith(' ') and '.' not in name:
+            packages[name] = max(packages.get(name, 0), int(parts[1]) / 1e6)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure service import and model load cost')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--backends', default='numpy,sklearn', help='comma separated backends to measure')
+    args = parser.parse_args(argv)
+
+    ok = True
+    for backend in args.backends.split(','):
+        result = probe(args.model_dir, backend)
+        print(f"🚀 {backend}: import app {result['import_seconds']:.2f}s ({result['import_rss_mb']:.0f} MB), "
+              f"load + first prediction {result['load_and_first_prediction_seconds']:.2f}s "
+              f"({result['loaded_rss_mb']:.0f} MB peak RSS), served by {result['backend']}")
+        print(f"   heavy modules after import: {', '.join(result['heavy_after_import']) or 'none'}; "
+              f"after load: {', '.join(result['heavy_after_load']) or 'none'}")
+        if backend == 'numpy':
+            forbidden = [name for name in result['heavy_after_load'] if name in FORBIDDEN_MODULES]
+            if forbidden or result['backend'] != 'numpy':
+                print(f"❌ The numpy serving path imported {', '.join(forbidden) or 'nothing heavy'} "
+                      f"and is served by {result['backend']}")
+                ok = False
+
+    print("🐢 Slowest top-level imports of app:")
+    for name, seconds in slowest_imports():
+        print(f"   {name:<20} {seconds * 1000:8.1f} ms")
+
+    if not ok:
+        sys.exit(1)
+    print("✅ Startup check passed")
+
+
+if __name__ == '__main__':
+    main()
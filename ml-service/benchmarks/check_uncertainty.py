@@ -0,0 +1,120 @@
+"""
+Uncertainty check: vote statistics, interval coverage and overhead.
+
+    python -m benchmarks.check_uncertainty --rows 10000
+
+1. The forest's vote statistics (std, quantiles and agreement across trees)
+   are compared with a per-tree reference computed tree by tree with sklearn.
+2. The yield intervals' coverage is measured on fresh labelled synthetic rows
+   (or --data, a CSV with expected_yield the models were not trained on).
+3. predict_batch is timed with and without uncertainty at 1, 100 and --rows
+   rows.
+
+Exits non-zero when the statistics differ from the reference, coverage is
+more than --coverage-slack below the interval level, or the overhead at
+--rows rows exceeds --max-overhead.
+"""
+
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from benchmarks.harness import measure, quiet
+from benchmarks.fixtures import load_or_train_predictor, sample_inputs
+
+STATISTICS_TOLERANCE = 1e-6
+
+
+def reference_spread(forest, X_scaled, quantiles):
+    """Vote statistics from each sklearn tree's own predict_proba (a per-tree loop; reference only)"""
+    votes = np.stack([tree.predict_proba(X_scaled.astype(np.float32)) for tree in forest.estimators_], axis=1)
+    mean = votes.mean(axis=1)
+    return {
+        'std': votes.std(axis=1),
+        'quantiles': np.quantile(votes, quantiles, axis=1),
+        'agreement': (votes.argmax(axis=2) == mean.argmax(axis=1)[:, None]).mean(axis=1)
+    }
+
+
+def check_statistics(model_dir, rows):
+    """Largest difference of each vote statistic from the per-tree reference"""
+    from models import PunjabCropPredictor, FEATURES, VOTE_QUANTILES
+
+    with quiet():
+        reference = PunjabCropPredictor()
+        reference.load_models(model_dir, backend='sklearn')
+        frame = reference.prepare_features(pd.DataFrame(sample_inputs(rows, seed=5)))
+    X_scaled = reference.scaler.transform(frame[FEATURES].to_numpy(dtype=float))
+    expected = reference_spread(reference.crop_recommender, X_scaled, VOTE_QUANTILES)
+    actual = reference.vote_ensemble.vote_spread(X_scaled, VOTE_QUANTILES)
+    return {name: float(np.abs(actual[name] - expected[name]).max()) for name in expected}
+
+
+def check_coverage(predictor, data=None, rows=10000):
+    """Share of actual yields inside the served intervals, on rows the models were not trained on"""
+    if data is not None:
+        frame = pd.read_csv(data)
+    else:
+        from train_models import generate_synthetic_data
+        with quiet():
+            frame = generate_synthetic_data(samples=rows, seed=2024)
+    with quiet():
+        batch = predictor.predict_batch(frame, tier='full', uncertainty=True)
+    actual = frame['expected_yield'].to_numpy(dtype=float)
+    inside = (actual >= batch['yield_low']) & (actual <= batch['yield_high'])
+    return float(inside.mean()), float(np.median(batch['yield_high'] - batch['yield_low']))
+
+
+def time_overhead(predictor, sizes, repeat=20):
+    """Median predict_batch latency (ms) without and with uncertainty, per batch size"""
+    results = {}
+    for rows in sizes:
+        frame = pd.DataFrame(sample_inputs(rows, seed=6))
+        runs = repeat if rows <= 100 else max(5, repeat // 4)
+        with quiet():
+            plain = measure(lambda: predictor.predict_batch(frame, tier='full'), repeat=runs)['median']
+            spread = measure(lambda: predictor.predict_batch(frame, tier='full', uncertainty=True),
+                             repeat=runs)['median']
+        results[rows] = (plain * 1000, spread * 1000)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check prediction uncertainty against references')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--data', help='labelled CSV (expected_yield) for coverage; fresh synthetic rows otherwise')
+    parser.add_argument('--max-overhead', type=float, default=1.6,
+                        help='largest allowed latency ratio with/without uncertainty at --rows rows')
+    parser.add_argument('--coverage-slack', type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    with quiet():
+        predictor, model_dir = load_or_train_predictor(args.model_dir)
+    ok = True
+
+    differences = check_statistics(model_dir, min(args.rows, 2000))
+    agrees = max(differences.values()) <= STATISTICS_TOLERANCE
+    ok = ok and agrees
+    print(f"{'✅' if agrees else '❌'} Vote statistics vs per-tree sklearn reference: "
+          + ', '.join(f"max |Δ {name}| {value:.1e}" for name, value in differences.items()))
+
+    if predictor.yield_intervals is None:
+        print("⚠️ No yield intervals in the model directory (run python -m yield_intervals); coverage skipped")
+    else:
+        coverage, width = check_coverage(predictor, args.data, args.rows)
+        covers = coverage >= predictor.yield_intervals.level - args.coverage_slack
+        ok = ok and covers
+        print(f"{'✅' if covers else '❌'} Yield interval coverage {coverage:.1%} "
+              f"(level {predictor.yield_intervals.level:.0%}), median width {width:.0f} kg/ha")
+
+    for rows, (plain, spread) in time_overhead(predictor, [1, 100, args.rows]).items():
+        bounded = rows != args.rows or spread / plain <= args.max_overhead
+        ok = ok and bounded
+        print(f"{'✅' if bounded else '❌'} predict_batch {rows:>6} rows: {plain:8.2f} ms -> {spread:8.2f} ms "
+              f"with uncertainty ({spread / plain:.2f}x)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
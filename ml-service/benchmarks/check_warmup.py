@@ -0,0 +1,68 @@
+"""
+Warm-up check: latency of the first real request to each endpoint with and
+without the startup warm-up.
+
+    python -m benchmarks.check_warmup --model-dir ./model --backend sklearn
+
+Every measurement starts a fresh interpreter that loads the models like the
+service does (synchronous warm-up, ML_WARMUP_ROUNDS rounds or none) and then
+sends one request to each prediction endpoint. Exits non-zero if the warmed
+service does not report ready or a warm-up request failed.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+PROBE = """
+import json, time
+import app as service
+from warmup import warmup_requests
+import numpy as np
+service.load_models()
+client = service.app.test_client()
+latencies = {{}}
+for path, body in warmup_requests(service.predictor, np.random.default_rng(1)):
+    if path in latencies:
+        continue
+    start = time.perf_counter()
+    status = client.post(path, json=body).status_code
+    latencies[path] = (time.perf_counter() - start, status)
+print(json.dumps({{'ready': service.readiness.status(), 'first': latencies}}))
+"""
+
+
+def probe(model_dir, backend, rounds):
+    """Readiness and first-request latency per endpoint of a fresh service process"""
+    env = dict(os.environ, ML_INFERENCE_BACKEND=backend, ML_WARMUP_ROUNDS=str(rounds), ML_WARMUP_BACKGROUND='0',
+               ML_MODEL_TIER='full')
+    result = subprocess.run([sys.executable, '-c', PROBE.format()], capture_output=True, text=True, check=True,
+                            env=env, cwd=os.path.dirname(os.path.abspath(model_dir)))
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare first-request latency with and without warm-up')
+    parser.add_argument('--model-dir', default='./model', help='the service loads ./model next to this directory')
+    parser.add_argument('--backend', default='numpy')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cold = probe(args.model_dir, args.backend, 0)
+    warm = probe(args.model_dir, args.backend, args.rounds)
+    print(f"🔥 First request per endpoint ({args.backend} backend), cold vs after "
+          f"{args.rounds} warm-up round(s) taking {warm['ready']['warmup_seconds']:.2f}s:")
+    for path, (seconds, status) in cold['first'].items():
+        warm_seconds, warm_status = warm['first'][path]
+        print(f"   {path:<36} {seconds * 1000:8.2f} ms -> {warm_seconds * 1000:8.2f} ms  ({status}/{warm_status})")
+
+    if not warm['ready']['ready']:
+        print(f"❌ Service not ready after warm-up: {warm['ready']['error']}")
+        sys.exit(1)
+    print("✅ Warm-up check passed")
+
+
+if __name__ == '__main__':
+    main()
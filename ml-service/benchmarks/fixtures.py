@@ -0,0 +1,56 @@
+import os
+import tempfile
+import numpy as np
+
+DISTRICTS = [
+    'Amritsar', 'Bathinda', 'Ludhiana', 'Gurdaspur', 'Moga', 'Jalandhar',
+    'Ferozepur', 'Mansa', 'Patiala', 'Sangrur'
+]
+SOIL_TYPES = ['loamy', 'clayey', 'sandy', 'alluvial']
+CROPS = ['rice', 'wheat', 'potato', 'bajra']
+
+
+def sample_inputs(n, seed=0):
+    """Deterministic soil/weather inputs shaped like the service payloads"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            'nitrogen': float(rng.uniform(50, 250)),
+            'phosphorus': float(rng.uniform(20, 150)),
+            'potassium': float(rng.uniform(30, 200)),
+            'rainfall': float(rng.uniform(500, 1500)),
+            'temperature': float(rng.uniform(20, 35)),
+            'soil_type': SOIL_TYPES[i % len(SOIL_TYPES)],
+            'district': DISTRICTS[i % len(DISTRICTS)],
+            'crop': CROPS[i % len(CROPS)]
+        })
+    return rows
+
+
+def synthetic_frame(rows):
+    """Synthetic training frame of the given size built with generate_synthetic_data"""
+    from train_models import generate_synthetic_data
+    return generate_synthetic_data(samples=rows)
+
+
+def load_or_train_predictor(model_dir='./model'):
+    """Load model artifacts from model_dir, training throwaway models if they are missing"""
+    from models import PunjabCropPredictor
+
+    if os.path.exists(os.path.join(model_dir, 'crop_recommender.pkl')):
+        predictor = PunjabCropPredictor()
+        predictor.load_models(model_dir)
+        return predictor, os.path.abspath(model_dir)
+
+    print(f"⚠️ No models in {model_dir}, training benchmark models on synthetic data...")
+    from crop_trainer import PunjabCropTrainer
+    from training_data import TrainingData
+    model_dir = tempfile.mkdtemp(prefix='bench-model-')
+    predictor = PunjabCropTrainer()
+    training_data = TrainingData.from_frame(predictor.prepare_features(synthetic_frame(1000)))
+    predictor.build_crop_recommender(training_data)
+    predictor.build_yield_predictor(training_data)
+    predictor.build_soil_classifier(training_data)
+    predictor.save_models(model_dir)
+    return predictor, model_dir
@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import platform
+import contextlib
+import io
+import statistics
+import subprocess
+from datetime import datetime
+
+
+def measure(fn, repeat=20, warmup=2, number=1):
+    """Time fn() and return per-call latency statistics in seconds"""
+    for _ in range(warmup):
+        fn()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+
+    return summarize(times)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the progress prints emitted by the code under benchmark"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def current_rss():
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakRSS:
+    """Context manager sampling RSS in a background thread; .peak and .start are in bytes"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start = self.peak = self.end = 0
+        self._done = None
+
+    def _sample(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        import threading
+        self.start = self.peak = current_rss()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        self.end = current_rss()
+        self.peak = max(self.peak, self.end)
+        return False
+
+
+def summarize(times):
+    """Summarize a list of timings (seconds)"""
+    ordered = sorted(times)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    p99_index = min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))
+    return {
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[p95_index],
+        'p99': ordered[p99_index],
+        'stdev': statistics.pstdev(ordered),
+        'repeat': len(ordered)
+    }
+
+
+def machine_info():
+    """Collect interpreter, library and hardware details for a run"""
+    info = {
+        'timestamp': datetime.now().isoformat(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'libraries': {}
+    }
+
+    for name in ('numpy', 'pandas', 'sklearn', 'flask'):
+        try:
+            module = __import__(name)
+            info['libraries'][name] = getattr(module, '__version__', 'unknown')
+        except ImportError:
+            info['libraries'][name] = None
+
+    try:
+        info['git_commit'] = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        info['git_commit'] = None
+
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        if var in os.environ:
+            info.setdefault('thread_env', {})[var] = os.environ[var]
+
+    return info
+
+
+class BenchmarkRun:
+    """Collects benchmark results for one run and serializes them as JSON"""
+
+    def __init__(self):
+        self.results = {}
+
+    def record(self, name, stats, rows=None, **extra):
+        """Store a result; rows adds a derived rows_per_sec throughput"""
+        entry = dict(stats)
+        if rows:
+            entry['rows'] = rows
+            entry['rows_per_sec'] = rows / stats['median'] if stats['median'] else None
+        entry.update(extra)
+        self.results[name] = entry
+
+        throughput = f", {entry['rows_per_sec']:,.0f} rows/s" if entry.get('rows_per_sec') else ''
+        print(f"  {name:<50} median {stats['median'] * 1000:10.3f} ms  p95 {stats['p95'] * 1000:10.3f} ms{throughput}")
+
+    def to_dict(self):
+        return {'machine': machine_info(), 'results': self.results}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"💾 Benchmark results saved to {path}")
+
+
+def compare(current, baseline, threshold=0.2, metric='median'):
+    """Return benchmarks whose metric regressed by more than threshold vs baseline"""
+    regressions = []
+    print(f"\n📊 Comparison against baseline ({metric}, threshold +{threshold:.0%}):")
+
+    for name, result in sorted(current['results'].items()):
+        base = baseline.get('results', {}).get(name)
+        if not base or not base.get(metric) or result.get(metric) is None:
+            continue
+
+        ratio = result[metric] / base[metric]
+        status = '❌' if ratio > 1 + threshold else '✅'
+        print(f"  {status} {name:<50} {ratio:6.2f}x")
+        if ratio > 1 + threshold:
+            regressions.append({'name': name, 'ratio': ratio, 'baseline': base[metric], 'current': result[metric]})
+
+    return regressions
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def exit_on_regressions(regressions):
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed beyond threshold")
+        sys.exit(1)
@@ -0,0 +1,62 @@
+"""
+Memory profile of the training pipeline: peak and retained RSS per stage.
+
+    python -m benchmarks.profile_training_memory --rows 1000000
+
+Runs the stages train_models.py runs on synthetic data: preparing
+features, building the TrainingData context, then the three model builders.
+For each stage it prints the wall time, the peak RSS sampled while the stage
+ran and the RSS left afterwards. The forest and MLP fits dominate the time
+for large inputs; use --models to profile only some of them.
+"""
+
+import gc
+import time
+import argparse
+from benchmarks.harness import PeakRSS, quiet
+
+MODELS = ('crop_recommender', 'yield_predictor', 'soil_classifier')
+
+
+def run(rows=1_000_000, models=MODELS):
+    """Per-stage (name, seconds, peak bytes, bytes after) for one training run"""
+    from crop_trainer import PunjabCropTrainer
+    from train_models import generate_synthetic_data
+    from training_data import TrainingData
+
+    stages = []
+
+    def stage(name, fn):
+        gc.collect()
+        start = time.perf_counter()
+        with PeakRSS() as rss, quiet():
+            result = fn()
+        stages.append((name, time.perf_counter() - start, rss.peak, rss.end))
+        return result
+
+    trainer = PunjabCropTrainer()
+    frame = stage('generate', lambda: generate_synthetic_data(rows))
+    frame = stage('prepare_features', lambda: trainer.prepare_features(frame))
+    data = stage('training_data', lambda: TrainingData.from_frame(frame))
+    del frame
+    for model in models:
+        stage(model, lambda: getattr(trainer, f'build_{model}')(data))
+    return stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Peak RSS of each training stage')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--models', default=','.join(MODELS), help='comma separated builders to run')
+    args = parser.parse_args(argv)
+
+    print(f"🧠 Training memory profile, {args.rows} synthetic rows")
+    overall = 0
+    for name, seconds, peak, after in run(args.rows, [m for m in args.models.split(',') if m]):
+        overall = max(overall, peak)
+        print(f"  {name:<20} {seconds:8.1f} s   peak {peak / 1e6:8.0f} MB   after {after / 1e6:8.0f} MB")
+    print(f"📈 Peak training RSS: {overall / 1e6:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
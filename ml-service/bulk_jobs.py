@@ -0,0 +1,274 @@
+"""
+Asynchronous bulk scoring jobs for the ML service.
+
+A CSV or NDJSON upload becomes a job directory under ML_JOBS_DIR:
+
+    <job id>/input.csv|input.ndjson   the uploaded records
+    <job id>/results.ndjson           scored records, appended chunk by chunk
+    <job id>/state.json               status and progress, replaced atomically
+
+A local thread pool scores jobs chunk by chunk with batch_score.score_frame
+against the already loaded PunjabCropPredictor. After every chunk the results
+are fsynced and state.json records how many chunks and result bytes are
+committed. On restart queued and interrupted jobs are resumed from the last
+committed chunk. A job is only scored while its process holds an flock on
+<job id>/lock, so when several worker processes (or the debug reloader's
+parent) resume the same jobs, each is scored by exactly one of them. Result
+streams only ever read committed bytes, so clients can consume a job while it
+is still running.
+
+Finished jobs are not kept forever: when the manager starts and whenever a
+job is submitted, done and failed jobs older than ML_JOB_RETENTION_HOURS, and
+those beyond the newest ML_JOB_MAX_KEPT, are deleted with their input and
+results. Queued and running jobs are never pruned.
+"""
+
+import os
+import json
+import fcntl
+import time
+import uuid
+import shutil
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+FORMATS = ('csv', 'ndjson')
+ACTIVE = ('queued', 'running')
+
+
+class JobStore:
+    """Job directories and their persisted state"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, job_id, name):
+        return os.path.join(self.root, job_id, name)
+
+    def input_path(self, state):
+        return self.path(state['id'], f"input.{state['format']}")
+
+    def create(self, fmt):
+        """Create an empty queued job for an input of the given format"""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}', use one of {', '.join(FORMATS)}")
+        job_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.root, job_id))
+        now = datetime.now().isoformat()
+        state = {
+            'id': job_id, 'format': fmt, 'status': 'queued', 'created': now, 'updated': now,
+            'rows_total': None, 'rows_done': 0, 'chunks_done': 0, 'bytes_committed': 0, 'error': None
+        }
+        self.save(state)
+        return state
+
+    def load(self, job_id):
+        # Job ids are hex; anything else cannot name a job directory
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        try:
+            with open(self.path(job_id, 'state.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state):
+        state['updated'] = datetime.now().isoformat()
+        target = self.path(state['id'], 'state.json')
+        with open(target + '.tmp', 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(target + '.tmp', target)
+
+    def all(self):
+        states = (self.load(name) for name in sorted(os.listdir(self.root)))
+        return [state for state in states if state is not None]
+
+    def claim(self, job_id):
+        """Exclusive lock on a job across processes, held while the returned file stays open; None if taken"""
+        try:
+            lock = open(self.path(job_id, 'lock'), 'a')
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return None
+        return lock
+
+    def remove(self, job_id):
+        # state.json goes first, so a half-deleted directory is never listed as a job
+        try:
+            os.remove(self.path(job_id, 'state.json'))
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(os.path.join(self.root, job_id), ignore_errors=True)
+
+    def prune(self, max_age=None, max_jobs=None):
+        """Delete finished jobs older than max_age seconds or beyond the newest max_jobs; returns their ids"""
+        finished = sorted((state for state in self.all() if state['status'] not in ACTIVE),
+                          key=lambda state: state['updated'], reverse=True)
+        cutoff = time.time() - max_age if max_age else None
+        expired = []
+        for rank, state in enumerate(finished):
+            too_many = max_jobs is not None and rank >= max_jobs
+            too_old = cutoff is not None and datetime.fromisoformat(state['updated']).timestamp() < cutoff
+            if too_many or too_old:
+                self.remove(state['id'])
+                expired.append(state['id'])
+        return expired
+
+
+def count_records(path, fmt):
+    """Number of records in an uploaded file (lines, minus the CSV header)"""
+    lines = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                lines += 1
+    return max(0, lines - 1) if fmt == 'csv' else lines
+
+
+class JobManager:
+    """Runs bulk scoring jobs on a local worker pool"""
+
+    def __init__(self, store, get_predictor, workers=1, chunk_size=5000, top_k=4, poll_interval=0.2,
+                 retention_hours=168, max_kept=1000):
+        self.store = store
+        # Finished jobs are pruned past this age (hours) or count; 0 disables either limit
+        self.retention_hours = float(retention_hours)
+        self.max_kept = int(max_kept)
+        self.get_predictor = get_predictor
+        self.chunk_size = int(chunk_size)
+        self.top_k = top_k
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix='bulk-job')
+        self._lock = threading.Lock()
+        self._scheduled = set()
+
+    @classmethod
+    def from_env(cls, get_predictor):
+        return cls(
+            JobStore(os.environ.get('ML_JOBS_DIR', './jobs')),
+            get_predictor,
+            workers=int(os.environ.get('ML_JOB_WORKERS', '1')),
+            chunk_size=int(os.environ.get('ML_JOB_CHUNK_SIZE', '5000')),
+            retention_hours=os.environ.get('ML_JOB_RETENTION_HOURS', 168),
+            max_kept=os.environ.get('ML_JOB_MAX_KEPT', 1000)
+        )
+
+    def prune(self):
+        """Delete finished jobs past the retention limits; returns their ids"""
+        return self.store.prune(self.retention_hours * 3600 or None, self.max_kept or None)
+
+    def submit(self, stream, fmt):
+        """Persist an uploaded file object as a new job and queue it"""
+        self.prune()
+        state = self.store.create(fmt)
+        path = self.store.input_path(state)
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(stream, f, 1 << 20)
+        state['rows_total'] = count_records(path, fmt)
+        self.store.save(state)
+        self._schedule(state['id'])
+        return state
+
+    def resume(self):
+        """Prune expired jobs, then queue those waiting or interrupted by a restart; returns their ids"""
+        self.prune()
+        resumed = [state['id'] for state in self.store.all() if state['status'] in ACTIVE]
+        for job_id in resumed:
+            self._schedule(job_id)
+        return resumed
+
+    def _schedule(self, job_id):
+        with self._lock:
+            if job_id in self._scheduled:
+                return
+            self._scheduled.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        # batch_score brings in pandas; only pay for it once a job actually runs
+        from batch_score import read_chunks, score_frame
+
+        claim = self.store.claim(job_id)
+        try:
+            # Unclaimed: another process (a second worker, the reloader parent) is running it
+            state = self.store.load(job_id) if claim else None
+            if state is not None and state['status'] in ACTIVE:
+                self._score(state, read_chunks, score_frame)
+        finally:
+            if claim:
+                claim.close()
+            with self._lock:
+                self._scheduled.discard(job_id)
+
+    def _score(self, state, read_chunks, score_frame):
+        job_id = state['id']
+        try:
+            state['status'] = 'running'
+            state['error'] = None
+            self.store.save(state)
+            predictor = self.get_predictor()
+
+            results = self.store.path(job_id, 'results.ndjson')
+            with open(results, 'ab') as out:
+                # Drop anything written after the last committed chunk
+                out.truncate(state['bytes_committed'])
+                out.seek(state['bytes_committed'])
+
+                chunks = read_chunks(self.store.input_path(state), self.chunk_size)
+                for index, chunk in enumerate(chunks):
+                    if index < state['chunks_done']:
+                        continue
+                    scored = score_frame(predictor, chunk, self.top_k)
+                    lines = scored.to_json(orient='records', lines=True)
+                    if lines and not lines.endswith('\n'):
+                        lines += '\n'
+                    out.write(lines.encode())
+                    out.flush()
+                    os.fsync(out.fileno())
+
+                    state['rows_done'] += len(chunk)
+                    state['chunks_done'] = index + 1
+                    state['bytes_committed'] = out.tell()
+                    self.store.save(state)
+
+            state['status'] = 'done'
+        except Exception as e:
+            state['status'] = 'failed'
+            state['error'] = str(e)
+        finally:
+            self.store.save(state)
+
+    def stream(self, job_id, block_size=1 << 16):
+        """Yield committed NDJSON result bytes, following the job until it finishes"""
+        offset = 0
+        path = self.store.path(job_id, 'results.ndjson')
+        while True:
+            state = self.store.load(job_id)
+            if state is None:
+                # Pruned while it was being read
+                return
+            committed = state['bytes_committed']
+            if committed > offset:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    while offset < committed:
+                        block = f.read(min(block_size, committed - offset))
+                        if not block:
+                            break
+                        offset += len(block)
+                        yield block
+            elif state['status'] not in ACTIVE:
+                return
+            else:
+                time.sleep(self.poll_interval)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,126 @@
+"""
+Per-district climate feature store.
+
+Built once from the historical yield data (Punjab_Data.csv) and saved next to
+the models as climate_store.npz. Aggregates are held in one dense array
+indexed by [district row, season, stat]; row 0 is the state-wide aggregate
+used for districts the store does not know. Serving fills missing weather
+inputs with an O(1) lookup and preprocessing reuses the same aggregates
+instead of recomputing group means on every training run.
+"""
+
+import os
+import hashlib
+import numpy as np
+from districts import district_index
+
+STORE_FILE = 'climate_store.npz'
+FORMAT_VERSION = 1
+
+# Punjab_Data.csv covers the kharif (rice) season; IMD_RF is Jun-Nov rainfall
+SEASONS = ('kharif',)
+STATS = ('rainfall', 'temperature', 'rainfall_sd', 'yield', 'years')
+SOURCE_COLUMNS = {
+    'rainfall': 'IMD_RF',
+    'temperature': 'IMD_Tmax',
+    'rainfall_sd': 'SD_RF_jun_nov',
+    'yield': 'RICE.YIELD..Kg.per.ha.'
+}
+STATE_WIDE = 'punjab'
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class ClimateStore:
+    """Dense per-district, per-season climate aggregates with O(1) lookups"""
+
+    def __init__(self, values, districts, codes, version, source_hash=''):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.districts = list(districts)
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.version = str(version)
+        self.source_hash = str(source_hash)
+
+        # Keyed by canonical district, so any spelling the index resolves hits the same row
+        self._index = {}
+        for row, name in enumerate(self.districts[1:], start=1):
+            district = district_index.resolve(name)
+            if district is not None:
+                self._index.setdefault(district, row)
+        self._code_index = {int(code): row for row, code in enumerate(self.codes) if code >= 0}
+        self._stat_index = {stat: i for i, stat in enumerate(STATS)}
+        self._season_index = {season: i for i, season in enumerate(SEASONS)}
+
+    @classmethod
+    def build(cls, yield_file):
+        """Aggregate the yield data CSV into a store"""
+        import pandas as pd
+
+        source_hash = file_hash(yield_file)
+        data = pd.read_csv(yield_file)
+        grouped = data.groupby('Dist.Code', sort=True)
+        names = grouped['District'].first()
+
+        values = np.full((len(names) + 1, len(SEASONS), len(STATS)), np.nan)
+        for stat, column in SOURCE_COLUMNS.items():
+            i = STATS.index(stat)
+            values[1:, 0, i] = grouped[column].mean().to_numpy()
+            values[0, 0, i] = data[column].mean()
+        values[1:, 0, STATS.index('years')] = grouped['Year'].nunique().to_numpy()
+        values[0, 0, STATS.index('years')] = data['Year'].nunique()
+
+        version = f"{FORMAT_VERSION}-{source_hash}"
+        return cls(values, [STATE_WIDE] + list(names), [-1] + list(names.index), version, source_hash)
+
+    def save(self, model_dir="./"):
+        np.savez(
+            f"{model_dir}/{STORE_FILE}",
+            values=self.values, districts=np.asarray(self.districts), codes=self.codes,
+            seasons=np.asarray(SEASONS), stats=np.asarray(STATS),
+            version=np.asarray(self.version), source_hash=np.asarray(self.source_hash)
+        )
+
+    @classmethod
+    def load(cls, model_dir="./"):
+        with np.load(f"{model_dir}/{STORE_FILE}", allow_pickle=False) as data:
+            if tuple(data['stats']) != STATS or tuple(data['seasons']) != SEASONS:
+                raise ValueError(f"Climate store layout mismatch in {model_dir}/{STORE_FILE}")
+            return cls(data['values'], data['districts'].tolist(), data['codes'],
+                       data['version'].item(), data['source_hash'].item())
+
+    @classmethod
+    def load_or_build(cls, yield_file, model_dir="./model"):
+        """Reuse the saved store when it was built from the same yield data, else rebuild and save it"""
+        path = os.path.join(model_dir, STORE_FILE)
+        if os.path.exists(path):
+            store = cls.load(model_dir)
+            if store.source_hash == file_hash(yield_file):
+                return store
+
+        store = cls.build(yield_file)
+        if os.path.isdir(model_dir):
+            store.save(model_dir)
+        return store
+
+    def row(self, district):
+        """Store row for a district name or Dist.Code (0 = state-wide)"""
+        if isinstance(district, (int, np.integer)):
+            return self._code_index.get(int(district), 0)
+        return self._index.get(district_index.resolve(district), 0)
+
+    def has(self, district):
+        return self.row(district) != 0
+
+    def lookup(self, district, season='kharif'):
+        """Dict of climate aggregates for a district"""
+        vector = self.values[self.row(district), self._season_index[season]]
+        return {stat: float(vector[i]) for i, stat in enumerate(STATS)}
+
+    def lookup_many(self, districts, stat, season='kharif'):
+        """Vector of one aggregate for a sequence of districts"""
+        names, inverse = np.unique(np.asarray(districts, dtype=str), return_inverse=True)
+        rows = np.array([self.row(name) for name in names], dtype=np.intp)[inverse.reshape(-1)]
+        return self.values[rows, self._season_index[season], self._stat_index[stat]]
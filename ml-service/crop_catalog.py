@@ -0,0 +1,115 @@
+"""
+Crop catalog loaded from crop_catalog.json.
+
+Per-crop nutrient requirements are held in dense (crops x nutrients) arrays so
+suitability, deficits and rankings for every catalog crop are single array
+operations over a batch of NPK rows. Adding crops means editing the data file,
+no code changes; point ML_CROP_CATALOG at another file to swap catalogs.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crop_catalog.json')
+NUTRIENTS = ('nitrogen', 'phosphorus', 'potassium')
+DEFAULT_CROP = 'wheat'
+
+
+class CropCatalog:
+    """Dense requirement matrices for the crops in a catalog file"""
+
+    def __init__(self, crops, version='', default_crop=DEFAULT_CROP):
+        self.crops = [dict(crop) for crop in crops]
+        self.names = [crop['name'] for crop in self.crops]
+        self.version = version
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self.default_index = self._index.get(default_crop, 0)
+
+        def matrix(bound):
+            values = [[crop[nutrient][bound] for nutrient in NUTRIENTS] for crop in self.crops]
+            return np.array(values, dtype=float).reshape(-1, len(NUTRIENTS))
+
+        self.optimal = matrix('optimal')
+        self.minimum = matrix('min')
+        self.maximum = matrix('max')
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or os.environ.get('ML_CROP_CATALOG') or CATALOG_FILE
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        if tuple(data.get('nutrients', NUTRIENTS)) != NUTRIENTS:
+            raise ValueError(f"Crop catalog {path} must list nutrients {NUTRIENTS}")
+        return cls(data['crops'], version=hashlib.sha256(raw).hexdigest()[:12])
+
+    def __len__(self):
+        return len(self.names)
+
+    def index_of(self, crops):
+        """Catalog row for each crop name; unknown crops map to the default crop"""
+        return np.array([self._index.get(crop, self.default_index) for crop in crops], dtype=np.intp)
+
+    def requirements(self, crop):
+        """Optimal NPK (kg/ha) for a crop as a dict"""
+        row = self.optimal[self._index.get(crop, self.default_index)]
+        return dict(zip(NUTRIENTS, row.tolist()))
+
+    def requirement_ranges(self):
+        """{crop: {field: value}} with min/max/optimal ranges, like the research table it came from"""
+        return {crop['name']: {k: v for k, v in crop.items() if k != 'name'} for crop in self.crops}
+
+    def suitability(self, npk):
+        """Mean capped nutrient satisfaction of every crop for each NPK row (rows x crops)"""
+        npk = np.asarray(npk, dtype=float).reshape(-1, len(NUTRIENTS))
+        # One (rows x crops) pass per nutrient; same arithmetic as mean over a rows x crops x 3 cube
+        total = np.minimum(1.0, npk[:, 0:1] / self.optimal[:, 0])
+        for j in range(1, len(NUTRIENTS)):
+            total += np.minimum(1.0, npk[:, j:j + 1] / self.optimal[:, j])
+        return total / len(NUTRIENTS)
+
+    def nutrient_satisfaction(self, npk, crop_index):
+        """Capped satisfaction of each nutrient for each row's crop (rows x nutrients); suitability is the row mean"""
+        npk = np.asarray(npk, dtype=float).reshape(-1, len(NUTRIENTS))
+        return np.minimum(1.0, npk / self.optimal[crop_index])
+
+    def deficits(self, npk, crop_index):
+        """Nutrient shortfall (kg/ha) of each NPK row against its crop's optimal levels"""
+        npk = np.asarray(npk, dtype=float).reshape(-1, len(NUTRIENTS))
+        return np.maximum(0, self.optimal[crop_index] - npk)
+
+    def rank(self, scores, top_k=None):
+        """Crop indices per row ordered by descending score, ties in catalog order.
+
+        With top_k the best k are picked with a linear-time partition and only
+        those k are sorted, instead of sorting every catalog crop.
+        """
+        scores = np.asarray(scores, dtype=float)
+        rows, crops = scores.shape
+        if not top_k or top_k <= 0 or top_k >= crops:
+            return np.argsort(-scores, axis=1, kind='stable')
+
+        negated = -scores
+        kth = np.partition(negated, top_k - 1, axis=1)[:, top_k - 1:top_k]
+        better = negated < kth
+        tied = negated == kth
+        # Keep the earliest tied crops so the result matches the stable full sort
+        needed = top_k - better.sum(axis=1, keepdims=True)
+        selected = better | (tied & (np.cumsum(tied, axis=1) <= needed))
+        chosen = np.nonzero(selected)[1].reshape(rows, top_k)
+
+        order = np.argsort(np.take_along_axis(negated, chosen, axis=1), axis=1, kind='stable')
+        return np.take_along_axis(chosen, order, axis=1)
+
+
+_default_catalog = None
+
+
+def default_catalog():
+    """Process-wide catalog loaded on first use"""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = CropCatalog.load()
+    return _default_catalog
@@ -0,0 +1,210 @@
+"""
+Training side of the Punjab crop predictor.
+
+PunjabCropTrainer extends the serving PunjabCropPredictor with the sklearn
+model builders, label encoder fitting and model saving. Serving processes
+import models.py only and never load this module or sklearn's estimators;
+train_models.py and the benchmark fixtures train through this class; the
+builders take a training_data.TrainingData holding the split feature matrix.
+"""
+
+import pandas as pd
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neural_network import MLPRegressor
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.model_selection import cross_val_score
+from sklearn.metrics import accuracy_score, mean_squared_error, r2_score
+from models import PunjabCropPredictor, FEATURES
+from districts import district_index
+from model_bundle import save_bundle
+from yield_intervals import YieldIntervals
+from soil_clustering import SOIL_CLUSTERS, CHUNK_ROWS, fit_streaming, iter_npk_chunks, iter_array_chunks
+import joblib
+
+
+class PunjabCropTrainer(PunjabCropPredictor):
+    def prepare_features(self, data):
+        """Prepare features, fitting the label encoders on the first (training) frame"""
+        if self.label_encoders:
+            return super().prepare_features(data)
+        
+        print("🔧 Preparing features...")
+        
+        # Encode categorical variables
+        self.label_encoders['soil_type'] = LabelEncoder()
+        data['soil_type_encoded'] = self.label_encoders['soil_type'].fit_transform(data['soil_type'])
+        
+        # Districts are matched through the shared index before fitting
+        resolved = district_index.resolve_many(data['district'])
+        names = np.where(pd.isna(resolved), data['district'].to_numpy(dtype=object), resolved)
+        self.label_encoders['district'] = LabelEncoder()
+        data['district_encoded'] = self.label_encoders['district'].fit_transform(names)
+        
+        return self.derive_features(data)
+    
+    def build_crop_recommender(self, data):
+        """Build crop recommendation model using Random Forest (data is a TrainingData)"""
+        print("🌾 Building crop recommendation model...")
+        
+        # Prepare features
+        features = FEATURES
+        
+        # Scale features in place; train and test are views of the one matrix
+        self.scaler = data.scaler or data.standardize(StandardScaler())
+        X_train_scaled, X_test_scaled = data.X_train, data.X_test
+        y_train, y_test = data.y_train('recommended'), data.y_test('recommended')
+        
+        # Train Random Forest
+        self.crop_recommender = RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            random_state=42,
+            class_weight='balanced'
+        )
+        
+        self.crop_recommender.fit(X_train_scaled, y_train)
+        
+        # Evaluate model
+        y_pred = self.crop_recommender.predict(X_test_scaled)
+        accuracy = accuracy_score(y_test, y_pred)
+        
+        # Cross-validation
+        cv_scores = cross_val_score(
+            self.crop_recommender, X_train_scaled, y_train, cv=5
+        )
+        
+        print(f"✅ Crop Recommender - Accuracy: {accuracy:.3f}")
+        print(f"✅ Cross-validation score: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
+        
+        # Feature importance
+        feature_importance = pd.DataFrame({
+            'feature': features,
+            'importance': self.crop_recommender.feature_importances_
+        }).sort_values('importance', ascending=False)
+        
+        print("📊 Top 5 Important Features:")
+        print(feature_importance.head())
+        
+        return accuracy
+    
+    def build_yield_predictor(self, data):
+        """Build yield prediction model using Neural Network (data is a TrainingData)"""
+        print("📈 Building yield prediction model...")
+        
+        # Same split and scaled features as the crop recommender
+        self.scaler = data.scaler or data.standardize(StandardScaler())
+        X_train_scaled, X_test_scaled = data.X_train, data.X_test
+        y_train, y_test = data.y_train('expected_yield'), data.y_test('expected_yield')
+        
+        # Train Neural Network
+        self.yield_predictor = MLPRegressor(
+            hidden_layer_sizes=(100, 50, 25),
+            activation='relu',
+            solver='adam',
+            alpha=0.001,
+            learning_rate='adaptive',
+            max_iter=500,
+            random_state=42
+        )
+        
+        self.yield_predictor.fit(X_train_scaled, y_train)
+        
+        # Evaluate model
+        y_pred = self.yield_predictor.predict(X_test_scaled)
+        mse = mean_squared_error(y_test, y_pred)
+        rmse = np.sqrt(mse)
+        r2 = r2_score(y_test, y_pred)
+        
+        print(f"✅ Yield Predictor - RMSE: {rmse:.0f} kg/ha")
+        print(f"✅ R² Score: {r2:.3f}")
+        
+        # Interval calibration on the same held-out rows (the network never saw them)
+        self.yield_intervals = YieldIntervals.calibrate(y_test, y_pred)
+        low, high = self.yield_intervals.interval(y_pred)
+        print(f"✅ Yield intervals ({self.yield_intervals.level:.0%}): median width {np.median(high - low):.0f} kg/ha "
+              f"over {len(self.yield_intervals.low)} yield bins")
+        
+        return rmse, r2
+    
+    def build_soil_classifier(self, data):
+        """Build soil health classification model using K-Means clustering (data is a TrainingData)"""
+        print("🌍 Building soil classification model...")
+        
+        # Clusters only use the raw NPK columns the training data kept aside
+        self.soil_scaler = StandardScaler()
+        X_soil_scaled = self.soil_scaler.fit_transform(data.npk)
+        
+        # K-means clustering for soil health categories
+        self.soil_classifier = KMeans(n_clusters=SOIL_CLUSTERS, random_state=42, n_init=10)
+        self.soil_classifier.fit(X_soil_scaled)
+        
+        return self.label_soil_clusters()
+    
+    def build_soil_classifier_streaming(self, source, chunk_rows=CHUNK_ROWS, workers=None):
+        """Build the soil classifier with MiniBatchKMeans over NPK chunks of a soil-card file (or an NPK array)"""
+        print(f"🌍 Building soil classification model from {source if isinstance(source, str) else 'NPK array'} "
+              f"(MiniBatchKMeans, {chunk_rows} row chunks)...")
+        
+        if isinstance(source, str):
+            chunks = lambda: iter_npk_chunks(source, chunk_rows)
+        else:
+            chunks = lambda: iter_array_chunks(source, chunk_rows)
+        self.soil_scaler, self.soil_classifier = fit_streaming(chunks, workers=workers)
+        
+        return self.label_soil_clusters()
+    
+    def label_soil_clusters(self):
+        """Name the fitted clusters by their mean scaled nutrient level"""
+        # Assign meaningful labels based on cluster centers
+        cluster_centers = self.soil_classifier.cluster_centers_
+        cluster_labels = []
+        
+        for center in cluster_centers:
+            avg_nutrients = np.mean(center)
+            if avg_nutrients < -1:
+                cluster_labels.append('Poor')
+            elif avg_nutrients < -0.5:
+                cluster_labels.append('Below Average')
+            elif avg_nutrients < 0.5:
+                cluster_labels.append('Average')
+            elif avg_nutrients < 1:
+                cluster_labels.append('Good')
+            else:
+                cluster_labels.append('Excellent')
+        
+        self.soil_health_labels = cluster_labels
+        
+        print(f"✅ Soil Classifier - Created {len(cluster_labels)} health categories")
+        print(f"📊 Categories: {cluster_labels}")
+        
+        return cluster_labels
+    
+    def save_models(self, model_dir="./"):
+        """Save trained models"""
+        print("💾 Saving models...")
+        
+        joblib.dump(self.crop_recommender, f"{model_dir}/crop_recommender.pkl")
+        joblib.dump(self.yield_predictor, f"{model_dir}/yield_predictor.pkl")
+        joblib.dump(self.soil_classifier, f"{model_dir}/soil_classifier.pkl")
+        joblib.dump(self.scaler, f"{model_dir}/scaler.pkl")
+        joblib.dump(self.soil_scaler, f"{model_dir}/soil_scaler.pkl")
+        joblib.dump(self.label_encoders, f"{model_dir}/label_encoders.pkl")
+        joblib.dump(self.soil_health_labels, f"{model_dir}/soil_health_labels.pkl")
+        if self.climate_store is not None:
+            self.climate_store.save(model_dir)
+        if self.student is not None:
+            self.student.save(model_dir)
+        if self.yield_intervals is not None:
+            self.yield_intervals.save(model_dir)
+        if self.yield_forecaster is not None:
+            self.yield_forecaster.save(model_dir)
+        
+        # NumPy copies of the same models for sklearn-free serving, full and compact (float32)
+        save_bundle(self, model_dir)
+        save_bundle(self, model_dir, precision='float32')
+        
+        print("✅ All models saved successfully!")
@@ -3,6 +3,9 @@ import numpy as np
 import re
 import json
 from pathlib import Path
+from climate_store import ClimateStore
+from districts import district_index
+from crop_catalog import default_catalog
 
 class PunjabDataPreprocessor:
     def __init__(self, data_dir="../"):
@@ -86,19 +89,8 @@ class PunjabDataPreprocessor:
         return None
     
     def extract_district_name(self, region):
-        """Extract district name from region description"""
-        district_names = [
-            'Amritsar', 'Bathinda', 'Ludhiana', 'Gurdaspur', 'Moga', 'Jalandhar',
-            'Ferozepur', 'Mansa', 'Muktsar', 'Sangrur', 'Hoshiarpur', 'Rupnagar',
-            'Kapurthala', 'Patiala', 'Fatehgarh Sahib', 'Mohali', 'Barnala',
-            'Faridkot', 'Taran - Taran'
-        ]
-        
-        for district in district_names:
-            if district.lower() in region.lower():
-                return district
-        
-        return None
+        """Extract the canonical district name from a region description"""
+        return district_index.find_in_text(region)
     
     def classify_soil_type(self, region):
         """Classify soil type based on region description"""
@@ -176,48 +168,16 @@ class PunjabDataPreprocessor:
         
         return pd.DataFrame(processed_data)
     
+    def build_climate_store(self, model_dir="./model"):
+        """Load or build the per-district climate store for the yield data"""
+        print("🌦️ Loading climate store...")
+        return ClimateStore.load_or_build(self.yield_file, model_dir)
+    
     def create_crop_suitability_db(self):
         """Create crop suitability database based on agricultural research"""
         print("📚 Creating crop suitability database...")
         
-        crop_requirements = {
-            'rice': {
-                'nitrogen': {'min': 120, 'max': 150, 'optimal': 135},
-                'phosphorus': {'min': 60, 'max': 80, 'optimal': 70},
-                'potassium': {'min': 40, 'max': 60, 'optimal': 50},
-                'ph': {'min': 5.5, 'max': 6.5, 'optimal': 6.0},
-                'climate': 'humid_subtropical',
-                'water_requirement': 'high',
-                'soil_types': ['alluvial', 'loamy', 'clay']
-            },
-            'wheat': {
-                'nitrogen': {'min': 120, 'max': 150, 'optimal': 135},
-                'phosphorus': {'min': 60, 'max': 80, 'optimal': 70},
-                'potassium': {'min': 40, 'max': 60, 'optimal': 50},
-                'ph': {'min': 6.0, 'max': 7.5, 'optimal': 6.8},
-                'climate': 'temperate',
-                'water_requirement': 'medium',
-                'soil_types': ['alluvial', 'loamy', 'mixed']
-            },
-            'potato': {
-                'nitrogen': {'min': 150, 'max': 200, 'optimal': 175},
-                'phosphorus': {'min': 80, 'max': 120, 'optimal': 100},
-                'potassium': {'min': 150, 'max': 200, 'optimal': 175},
-                'ph': {'min': 5.5, 'max': 6.5, 'optimal': 6.0},
-                'climate': 'cool_humid',
-                'water_requirement': 'high',
-                'soil_types': ['loamy', 'sandy', 'alluvial']
-            },
-            'bajra': {
-                'nitrogen': {'min': 40, 'max': 80, 'optimal': 60},
-                'phosphorus': {'min': 20, 'max': 40, 'optimal': 30},
-                'potassium': {'min': 20, 'max': 40, 'optimal': 30},
-                'ph': {'min': 6.5, 'max': 8.0, 'optimal': 7.2},
-                'climate': 'arid_semi_arid',
-                'water_requirement': 'low',
-                'soil_types': ['sandy', 'loamy', 'mixed']
-            }
-        }
+        crop_requirements = default_catalog().requirement_ranges()
         
         return crop_requirements
     
@@ -230,6 +190,9 @@ class PunjabDataPreprocessor:
         bajra_wheat_data = self.clean_bajra_wheat_data()
         crop_requirements = self.create_crop_suitability_db()
         
+        # Per-district yield/climate aggregates (shared with serving)
+        climate_store = self.build_climate_store()
+        
         training_data = []
         
         # Create training examples by combining NPK data with yield data
@@ -238,12 +201,11 @@ class PunjabDataPreprocessor:
                 district = npk_row['district']
                 
                 # Find yield data for this district
-                district_yield = yield_data[yield_data['district'] == district]
-                
-                if not district_yield.empty:
-                    avg_yield = district_yield['yield'].mean()
-                    avg_rainfall = district_yield['rainfall'].mean()
-                    avg_temperature = district_yield['temperature'].mean()
+                if climate_store.has(district):
+                    climate = climate_store.lookup(district)
+                    avg_yield = climate['yield']
+                    avg_rainfall = climate['rainfall']
+                    avg_temperature = climate['temperature']
                     
                     # Calculate suitability scores for each crop
                     for crop, requirements in crop_requirements.items():
@@ -329,14 +291,8 @@ class PunjabDataPreprocessor:
     
     def estimate_yield(self, crop, suitability_score):
         """Estimate yield based on crop type and suitability score"""
-        base_yields = {
-            'rice': 4000,
-            'wheat': 4500,
-            'potato': 25000,
-            'bajra': 2000
-        }
-        
-        base_yield = base_yields.get(crop, 3000)
+        crops = default_catalog().requirement_ranges()
+        base_yield = crops.get(crop, {}).get('base_yield', 3000)
         return base_yield * suitability_score
 
 if __name__ == "__main__":
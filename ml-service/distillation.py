@@ -0,0 +1,186 @@
+"""
+Distillation of the serving models into a compact "fast" tier.
+
+The teacher is the full PunjabCropPredictor: a 100-tree random forest for the
+recommendation probability and a (100, 50, 25) MLP for yield. The student is
+a single small MLP with both outputs, trained on the teacher's predictions
+over dense samples of the input space (labels are the teacher's outputs, not
+the training targets, so it learns to reproduce the served models).
+
+The student is saved as student.npz next to the models and evaluated with a
+few NumPy matmuls. The service serves it when the fast tier is selected per
+deployment (ML_MODEL_TIER=fast) or per request ("tier": "fast"). Suitability,
+ranking, fertilizer plans and soil clusters are catalog or KMeans based and
+identical in both tiers.
+
+    python -m distillation --model-dir ./model --samples 200000
+"""
+
+import io
+import os
+import time
+import pickle
+import hashlib
+import numpy as np
+
+STUDENT_FILE = 'student.npz'
+TIERS = ('full', 'fast')
+STUDENT_LAYERS = (64, 32)
+DISTILL_SAMPLES = 200_000
+
+
+class StudentModel:
+    """Two-output ReLU network: recommendation probability and yield (kg/ha) from scaled features"""
+
+    def __init__(self, weights, biases, target_mean, target_scale, version=''):
+        # float32 weights stay float32 (compact serving); anything else is float64
+        dtype = np.float32 if np.asarray(weights[0]).dtype == np.float32 else np.float64
+        self.weights = [np.ascontiguousarray(w, dtype=dtype) for w in weights]
+        self.biases = [np.asarray(b, dtype=dtype) for b in biases]
+        self.target_mean = np.asarray(target_mean, dtype=dtype)
+        self.target_scale = np.asarray(target_scale, dtype=dtype)
+        self.version = version
+
+    @classmethod
+    def from_mlp(cls, mlp, target_mean, target_scale):
+        return cls(mlp.coefs_, mlp.intercepts_, target_mean, target_scale)
+
+    def compact(self):
+        """float32 copy, served when ML_MODEL_PRECISION=float32"""
+        return StudentModel([w.astype(np.float32) for w in self.weights], [b.astype(np.float32) for b in self.biases],
+                            self.target_mean.astype(np.float32), self.target_scale.astype(np.float32), self.version)
+
+    @property
+    def nbytes(self):
+        return sum(w.nbytes for w in self.weights) + sum(b.nbytes for b in self.biases)
+
+    def predict(self, X_scaled):
+        """(recommendation probability, predicted yield) for each scaled FEATURES row"""
+        hidden = np.asarray(X_scaled, dtype=self.weights[0].dtype)
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            hidden = np.maximum(hidden @ w + b, 0)
+        out = (hidden @ self.weights[-1] + self.biases[-1]) * self.target_scale + self.target_mean
+        out = out.astype(np.float64, copy=False)
+        return np.clip(out[:, 0], 0, 1), out[:, 1]
+
+    def save(self, model_dir="./"):
+        arrays = {f"w{i}": w for i, w in enumerate(self.weights)}
+        arrays.update({f"b{i}": b for i, b in enumerate(self.biases)})
+        np.savez(f"{model_dir}/{STUDENT_FILE}", target_mean=self.target_mean,
+                 target_scale=self.target_scale, **arrays)
+
+    @classmethod
+    def load(cls, model_dir="./"):
+        path = f"{model_dir}/{STUDENT_FILE}"
+        with open(path, 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:12]
+        with np.load(path, allow_pickle=False) as data:
+            layers = sum(1 for name in data.files if name.startswith('w'))
+            return cls([data[f"w{i}"] for i in range(layers)], [data[f"b{i}"] for i in range(layers)],
+                       data['target_mean'], data['target_scale'], version)
+
+
+def teacher_outputs(predictor, X_scaled):
+    """The full tier's recommendation probability and yield for scaled features"""
+    return (predictor.crop_recommender.predict_proba(X_scaled)[:, 1],
+            predictor.yield_predictor.predict(X_scaled))
+
+
+def distill(predictor, inputs, layers=STUDENT_LAYERS, holdout=0.2, seed=42):
+    """Fit a student on the teacher's outputs for a frame of raw inputs; returns (student, report)"""
+    from sklearn.neural_network import MLPRegressor
+    from models import FEATURES
+
+    print(f"🎓 Distilling a {layers} student from {len(inputs)} teacher samples...")
+    frame = predictor.prepare_features(inputs.copy())
+    X_scaled = predictor.scaler.transform(frame[FEATURES].to_numpy(dtype=float))
+    targets = np.column_stack(teacher_outputs(predictor, X_scaled))
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(X_scaled))
+    test, train = order[:int(len(order) * holdout)], order[int(len(order) * holdout):]
+
+    # Both outputs standardized so neither dominates the squared loss
+    target_mean, target_scale = targets[train].mean(axis=0), targets[train].std(axis=0) + 1e-12
+    mlp = MLPRegressor(hidden_layer_sizes=layers, activation='relu', solver='adam', alpha=1e-5,
+                       batch_size=512, learning_rate_init=2e-3, max_iter=200, early_stopping=True,
+                       n_iter_no_change=10, random_state=seed)
+    start = time.perf_counter()
+    mlp.fit(X_scaled[train], (targets[train] - target_mean) / target_scale)
+    student = StudentModel.from_mlp(mlp, target_mean, target_scale)
+
+    report = fidelity_report(predictor, student, X_scaled[test], targets[test])
+    report['fit_seconds'] = time.perf_counter() - start
+    report['epochs'] = mlp.n_iter_
+    return student, report
+
+
+def _pickled_size(obj):
+    buffer = io.BytesIO()
+    pickle.dump(obj, buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    return buffer.tell()
+
+
+def _latency(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def fidelity_report(predictor, student, X_scaled, teacher):
+    """Student vs teacher agreement on held-out samples, plus model size and latency of both"""
+    prob, predicted_yield = student.predict(X_scaled)
+    prob_error = np.abs(prob - teacher[:, 0])
+    yield_error = predicted_yield - teacher[:, 1]
+
+    single, batch = X_scaled[:1], X_scaled[:1000]
+    return {
+        'samples': len(X_scaled),
+        'prob_mae': float(prob_error.mean()),
+        'prob_p99_error': float(np.percentile(prob_error, 99)),
+        'decision_agreement': float(((prob >= 0.5) == (teacher[:, 0] >= 0.5)).mean()),
+        'yield_mae': float(np.abs(yield_error).mean()),
+        'yield_r2': float(1 - (yield_error ** 2).sum() / ((teacher[:, 1] - teacher[:, 1].mean()) ** 2).sum()),
+        'teacher_bytes': _pickled_size(predictor.crop_recommender) + _pickled_size(predictor.yield_predictor),
+        'student_bytes': student.nbytes,
+        'teacher_single_ms': 1000 * _latency(lambda: teacher_outputs(predictor, single), 20),
+        'student_single_ms': 1000 * _latency(lambda: student.predict(single), 200),
+        'teacher_batch_1000_ms': 1000 * _latency(lambda: teacher_outputs(predictor, batch), 5),
+        'student_batch_1000_ms': 1000 * _latency(lambda: student.predict(batch), 50)
+    }
+
+
+def print_report(report):
+    print(f"✅ Student fidelity on {report['samples']} held-out samples: "
+          f"probability MAE {report['prob_mae']:.4f} (p99 {report['prob_p99_error']:.4f}), "
+          f"recommended agreement {report['decision_agreement']:.2%}, "
+          f"yield MAE {report['yield_mae']:.1f} kg/ha, yield R² vs teacher {report['yield_r2']:.4f}")
+    print(f"📦 Size: {report['teacher_bytes'] / 1e6:.2f} MB -> {report['student_bytes'] / 1e3:.1f} kB "
+          f"({report['teacher_bytes'] / report['student_bytes']:.0f}x smaller)")
+    print(f"⚡ Latency: single row {report['teacher_single_ms']:.2f} -> {report['student_single_ms']:.3f} ms, "
+          f"1000 rows {report['teacher_batch_1000_ms']:.1f} -> {report['student_batch_1000_ms']:.2f} ms")
+
+
+def main(argv=None):
+    import argparse
+    from models import PunjabCropPredictor
+    from train_models import synthetic_chunk
+
+    parser = argparse.ArgumentParser(description='Distill the trained Punjab models into the fast tier')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--samples', type=int, default=DISTILL_SAMPLES)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    predictor = PunjabCropPredictor()
+    predictor.load_models(args.model_dir, backend='sklearn')
+    student, report = distill(predictor, synthetic_chunk(args.seed, args.samples))
+    print_report(report)
+    student.save(args.model_dir)
+    print(f"💾 Student saved to {os.path.join(args.model_dir, STUDENT_FILE)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+District name resolution shared by preprocessing and serving.
+
+The data files and clients spell Punjab districts in many ways ('Bhatinda',
+'Firozpur', 'Rupnagar (Ropar)', 'Taran - Taran', 'Mohali'). DistrictIndex maps
+any of them to one canonical name in three tiers:
+
+1. exact: a dict of every string resolved so far (pre-seeded with the
+   canonical names and aliases), so repeated lookups are a single hash hit
+2. normalized alias: case, punctuation, bracketed notes and the word
+   'district' are stripped before looking the compact key up
+3. fuzzy: character trigram overlap (Dice coefficient) against all known
+   keys through an inverted trigram index, for misspellings like 'Ludhiyana'
+
+Names that resolve to nothing are unknown; models encode them with
+DistrictIndex.encode's unknown code instead of failing.
+"""
+
+import re
+import numpy as np
+
+PUNJAB_DISTRICTS = [
+    'Amritsar', 'Barnala', 'Bathinda', 'Faridkot', 'Fatehgarh Sahib',
+    'Fazilka', 'Ferozepur', 'Gurdaspur', 'Hoshiarpur', 'Jalandhar',
+    'Kapurthala', 'Ludhiana', 'Mansa', 'Moga', 'Muktsar', 'Pathankot',
+    'Patiala', 'Rupnagar', 'SAS Nagar', 'Sangrur', 'Shahid Bhagat Singh Nagar',
+    'Tarn Taran'
+]
+
+# Alternate spellings and former names seen in the data files and client input
+DISTRICT_ALIASES = {
+    'Bathinda': ['Bhatinda'],
+    'Ferozepur': ['Firozpur', 'Ferozpur', 'Firozepur'],
+    'Muktsar': ['Sri Muktsar Sahib', 'Mukatsar'],
+    'Rupnagar': ['Ropar', 'Roopnagar'],
+    'SAS Nagar': ['Mohali', 'Sahibzada Ajit Singh Nagar', 'SAS Nagar (Mohali)'],
+    'Shahid Bhagat Singh Nagar': ['Sahid Bhagat Singh Nagar', 'SBS Nagar', 'Nawanshahr', 'Nawanshahar'],
+    'Tarn Taran': ['Taran - Taran', 'Taran Taran', 'Tarn Taran Sahib'],
+    'Fatehgarh Sahib': ['Fatehgarh'],
+    'Jalandhar': ['Jullundur']
+}
+
+FUZZY_THRESHOLD = 0.5
+MAX_WORDS = 4
+# Columns at least this long are factorized with pandas' hash table
+PANDAS_FACTORIZE_ROWS = 10_000
+
+
+def normalize_key(name):
+    """Compact lookup key: lower-case letters and digits only, without notes in brackets or 'district'"""
+    name = re.sub(r'\(.*?\)', ' ', str(name).lower())
+    name = re.sub(r'\bdistrict\b', ' ', name)
+    return re.sub(r'[^a-z0-9]', '', name)
+
+
+def factorize(names):
+    """(codes, uniques) for a column of names; missing values get code -1 on the pandas path.
+
+    Short columns (every serving request) use a dict so serving never imports
+    pandas; long ones go through pd.factorize, which is much faster per row.
+    """
+    if len(names) >= PANDAS_FACTORIZE_ROWS:
+        import pandas as pd
+        return pd.factorize(names if isinstance(names, pd.Series) else np.asarray(names, dtype=object))
+    uniques = {}
+    codes = np.array([uniques.setdefault(name, len(uniques)) for name in names], dtype=np.intp)
+    return codes, list(uniques)
+
+
+def trigrams(key):
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class DistrictIndex:
+    """Precomputed exact / alias / fuzzy district name resolution"""
+
+    def __init__(self, districts=PUNJAB_DISTRICTS, aliases=DISTRICT_ALIASES,
+                 threshold=FUZZY_THRESHOLD, max_cache=100_000):
+        self.districts = list(districts)
+        self.threshold = threshold
+        self.max_cache = max_cache
+
+        self._keys = {}
+        for district in self.districts:
+            self._keys[normalize_key(district)] = district
+        for district, names in aliases.items():
+            for name in names:
+                self._keys.setdefault(normalize_key(name), district)
+
+        # Inverted trigram index over the normalized keys
+        self._key_list = list(self._keys)
+        self._key_sizes = [len(trigrams(key)) for key in self._key_list]
+        self._grams = {}
+        for i, key in enumerate(self._key_list):
+            for gram in trigrams(key):
+                self._grams.setdefault(gram, []).append(i)
+
+        self._seed = {district: district for district in self.districts}
+        for district, names in aliases.items():
+            for name in names:
+                self._seed[name] = district
+        self._exact = dict(self._seed)
+
+    def _fuzzy(self, key):
+        grams = trigrams(key)
+        overlap = {}
+        for gram in grams:
+            for i in self._grams.get(gram, ()):
+                overlap[i] = overlap.get(i, 0) + 1
+
+        best, best_score = None, self.threshold
+        for i, shared in overlap.items():
+            score = 2 * shared / (len(grams) + self._key_sizes[i])
+            if score >= best_score:
+                best, best_score = i, score
+        return self._keys[self._key_list[best]] if best is not None else None
+
+    def resolve(self, name):
+        """Canonical district for a name, or None when it cannot be matched"""
+        try:
+            return self._exact[name]
+        except (KeyError, TypeError):
+            pass
+        if not isinstance(name, str):
+            return None
+
+        key = normalize_key(name)
+        district = self._keys.get(key)
+        if district is None and key:
+            district = self._fuzzy(key)
+
+        if len(self._exact) >= self.max_cache:
+            self._exact = dict(self._seed)
+        self._exact[name] = district
+        return district
+
+    def resolve_many(self, names):
+        """Object array of canonical districts (None if unknown); each distinct name is resolved once"""
+        codes, uniques = factorize(names)
+        resolved = np.array([self.resolve(name) for name in uniques] + [None], dtype=object)
+        return resolved[codes]
+
+    def find_in_text(self, text):
+        """First district named in a free-text region description, or None"""
+        words = [normalize_key(word) for word in re.split(r'[^A-Za-z0-9]+', str(text))]
+        words = [word for word in words if word]
+        # Longest word n-grams first so 'Fatehgarh Sahib' wins over 'Fatehgarh'
+        for start in range(len(words)):
+            for size in range(min(MAX_WORDS, len(words) - start), 0, -1):
+                district = self._keys.get(''.join(words[start:start + size]))
+                if district is not None:
+                    return district
+        return None
+
+    def encode(self, names, classes):
+        """Label codes for names against sorted encoder classes.
+
+        Unknown districts get the centre of the code range, which is also the
+        scaler mean for uniformly sampled training districts, so they carry no
+        district signal instead of raising like LabelEncoder.transform.
+        """
+        codes, uniques = factorize(names)
+        class_codes = {name: code for code, name in enumerate(classes)}
+        unknown = (len(classes) - 1) / 2
+        mapped = np.array([class_codes.get(self.resolve(name), unknown) for name in uniques] + [unknown], dtype=float)
+        return mapped[codes]
+
+
+district_index = DistrictIndex()
+
+
+def resolve_district(name):
+    return district_index.resolve(name)
@@ -0,0 +1,232 @@
+"""
+Evaluation stage of the training pipeline: streaming metrics and headless plots.
+
+Metrics are accumulated chunk by chunk over the held-out rows of the
+TrainingData the model builders already split and scaled, so a test set of
+any size is evaluated with bounded temporaries: a confusion matrix for the
+crop recommender, and error sums, a fixed-bin error histogram and a bounded
+random sample of points for the yield predictor.
+
+Plots only receive those small summaries. Each one is rendered by
+a separate worker process with matplotlib's non-interactive Agg backend.
+Matplotlib is only imported inside the workers.
+"""
+
+import os
+import numpy as np
+
+EVAL_CHUNK_ROWS = 100_000
+SCATTER_POINTS = 20_000
+ERROR_BINS = np.linspace(-3000, 3000, 121)
+
+
+class ClassificationMetrics:
+    """Confusion matrix accumulated over chunks of (true, predicted) class indices"""
+
+    def __init__(self, classes):
+        self.classes = list(classes)
+        self.confusion = np.zeros((len(self.classes), len(self.classes)), dtype=np.int64)
+
+    def update(self, y_true, y_pred):
+        k = len(self.classes)
+        codes = np.searchsorted(self.classes, y_true) * k + np.searchsorted(self.classes, y_pred)
+        self.confusion += np.bincount(codes, minlength=k * k).reshape(k, k)
+
+    def report(self):
+        """Accuracy plus per-class precision, recall, F1 and support"""
+        tp = np.diag(self.confusion).astype(float)
+        support = self.confusion.sum(axis=1)
+        predicted = self.confusion.sum(axis=0)
+        precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+        recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+        f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(tp),
+                       where=precision + recall > 0)
+        return {
+            'accuracy': float(tp.sum() / max(1, support.sum())),
+            'classes': {str(c): {'precision': float(p), 'recall': float(r), 'f1': float(f), 'support': int(s)}
+                        for c, p, r, f, s in zip(self.classes, precision, recall, f1, support)}
+        }
+
+    def format_report(self):
+        report = self.report()
+        lines = [f"{'':>12}{'precision':>10}{'recall':>10}{'f1-score':>10}{'support':>10}"]
+        for name, row in report['classes'].items():
+            lines.append(f"{name:>12}{row['precision']:>10.2f}{row['recall']:>10.2f}{row['f1']:>10.2f}"
+                         f"{row['support']:>10}")
+        lines.append(f"{'accuracy':>12}{'':>20}{report['accuracy']:>10.2f}{self.confusion.sum():>10}")
+        return '\n'.join(lines)
+
+
+class RegressionMetrics:
+    """RMSE, MAE, R², an error histogram and a bounded point sample accumulated over chunks"""
+
+    def __init__(self, bins=ERROR_BINS, sample_size=SCATTER_POINTS, seed=42):
+        self.bins = np.asarray(bins, dtype=float)
+        self.histogram = np.zeros(len(self.bins) - 1, dtype=np.int64)
+        self.sample_size = int(sample_size)
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.sums = np.zeros(4)  # error, squared error, target, squared target
+        self.abs_error = 0.0
+        self.low, self.high = np.inf, -np.inf
+        self._keys = np.empty(0)
+        self._points = np.empty((0, 2))
+
+    def update(self, y_true, y_pred):
+        y_true = np.asarray(y_true, dtype=float)
+        error = np.asarray(y_pred, dtype=float) - y_true
+        self.count += len(y_true)
+        self.sums += [error.sum(), np.dot(error, error), y_true.sum(), np.dot(y_true, y_true)]
+        self.abs_error += np.abs(error).sum()
+        self.low, self.high = min(self.low, y_true.min(initial=np.inf)), max(self.high, y_true.max(initial=-np.inf))
+        # Out-of-range errors land in the outermost bins
+        self.histogram += np.histogram(np.clip(error, self.bins[0], self.bins[-1]), self.bins)[0]
+
+        # Keep the points with the smallest random keys: a uniform sample of everything seen
+        keys = np.concatenate([self._keys, self.rng.random(len(y_true))])
+        points = np.concatenate([self._points, np.column_stack([y_true, y_true + error])])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, points = keys[keep], points[keep]
+        self._keys, self._points = keys, points
+
+    def report(self):
+        n = max(1, self.count)
+        total_variance = self.sums[3] - self.sums[2] ** 2 / n
+        return {
+            'rows': self.count,
+            'rmse': float(np.sqrt(self.sums[1] / n)),
+            'mae': float(self.abs_error / n),
+            'bias': float(self.sums[0] / n),
+            'r2': float(1 - self.sums[1] / total_variance) if total_variance > 0 else 0.0
+        }
+
+    @property
+    def sample(self):
+        return self._points
+
+
+def evaluate_classifier(model, X, y, chunk_rows=EVAL_CHUNK_ROWS):
+    metrics = ClassificationMetrics(model.classes_)
+    for start in range(0, len(X), chunk_rows):
+        metrics.update(y[start:start + chunk_rows], model.predict(X[start:start + chunk_rows]))
+    return metrics
+
+
+def evaluate_regressor(model, X, y, chunk_rows=EVAL_CHUNK_ROWS):
+    metrics = RegressionMetrics()
+    for start in range(0, len(X), chunk_rows):
+        metrics.update(y[start:start + chunk_rows], model.predict(X[start:start + chunk_rows]))
+    return metrics
+
+
+def plot_feature_importance(path, features, importances):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    order = np.argsort(importances)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.barh(np.asarray(features)[order], np.asarray(importances)[order])
+    ax.set_xlabel('importance')
+    ax.set_title('Feature Importance for Crop Recommendation')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def plot_confusion_matrix(path, confusion, classes):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    image = ax.imshow(confusion, cmap='Blues')
+    fig.colorbar(image)
+    for (i, j), count in np.ndenumerate(confusion):
+        ax.text(j, i, str(count), ha='center', va='center',
+                color='white' if count > confusion.max() / 2 else 'black')
+    ax.set_xticks(range(len(classes)), [str(c) for c in classes])
+    ax.set_yticks(range(len(classes)), [str(c) for c in classes])
+    ax.set_title('Confusion Matrix')
+    ax.set_ylabel('True Label')
+    ax.set_xlabel('Predicted Label')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def plot_yield_predictions(path, points, low, high):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.scatter(points[:, 0], points[:, 1], alpha=0.5, s=8)
+    ax.plot([low, high], [low, high], 'k--', lw=2)
+    ax.set_xlabel('Actual Yield (kg/ha)')
+    ax.set_ylabel('Predicted Yield (kg/ha)')
+    ax.set_title(f'Actual vs Predicted Crop Yields ({len(points)} sampled rows)')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def plot_error_distribution(path, histogram, bins):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.stairs(histogram, bins, fill=True)
+    ax.set_xlabel('Prediction Error (kg/ha)')
+    ax.set_ylabel('Frequency')
+    ax.set_title('Yield Prediction Error Distribution')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def render_plots(jobs, workers=None):
+    """Render (function, path, *args) jobs, in worker processes when workers > 1; returns the paths"""
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [fn(*args) for fn, *args in jobs]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fn, *args) for fn, *args in jobs]
+        return [future.result() for future in futures]
+
+
+def evaluate_models(predictor, data, features, save_dir='./plots', workers=None, chunk_rows=EVAL_CHUNK_ROWS):
+    """Streaming metrics on the held-out rows of a TrainingData, then all plots in parallel; returns the reports"""
+    os.makedirs(save_dir, exist_ok=True)
+
+    classification = evaluate_classifier(predictor.crop_recommender, data.X_test, data.y_test('recommended'),
+                                         chunk_rows)
+    print("\n📊 Crop Recommender Classification Report:")
+    print(classification.format_report())
+
+    regression = evaluate_regressor(predictor.yield_predictor, data.X_test, data.y_test('expected_yield'), chunk_rows)
+    report = regression.report()
+    print(f"\n📊 Yield Predictor on {report['rows']} held-out rows: RMSE {report['rmse']:.0f} kg/ha, "
+          f"MAE {report['mae']:.0f} kg/ha, R² {report['r2']:.3f}")
+
+    jobs = [
+        (plot_feature_importance, f'{save_dir}/feature_importance.png', list(features),
+         predictor.crop_recommender.feature_importances_),
+        (plot_confusion_matrix, f'{save_dir}/confusion_matrix.png', classification.confusion,
+         classification.classes),
+        (plot_yield_predictions, f'{save_dir}/yield_predictions.png', regression.sample,
+         regression.low, regression.high),
+        (plot_error_distribution, f'{save_dir}/yield_error_distribution.png', regression.histogram,
+         regression.bins)
+    ]
+    for path in render_plots(jobs, workers):
+        print(f"📊 Plot saved to {path}")
+
+    return {'crop_recommender': classification.report(), 'yield_predictor': report}
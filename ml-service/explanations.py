@@ -0,0 +1,106 @@
+"""
+Cached per-prediction explanations for the /predict/explanation endpoint.
+
+PunjabCropPredictor.explain_batch says why a row's top crop ranks first (the
+per-nutrient satisfaction behind its catalog suitability, against the
+runner-up) and splits the forest's recommendation confidence into tree-path
+contributions per model feature. A batch is explained with one leaf lookup
+for every row and tree. The cost per row is small but not free. On a single
+core, with a 100-tree forest of 128k nodes (python -m benchmarks.check_explanations):
+
+- explain_batch takes about 25 µs per row in batches of 1000 or more and
+  about 1 ms for a single row;
+- building the JSON-ready explanations and cache keys adds about 50 µs per
+  row, and a batch served entirely from the cache costs about 30 µs per row;
+- the forest's path table (nodes x features, 13 MB here, half that with the
+  float32 bundle) is built on the first explanation, during warm-up, in
+  about 50 ms.
+
+Explanations are cached by input key: a bounded in-process LRU first, then
+the shared prediction cache tier when ML_PREDICTION_CACHE is set. Only the
+rows missed by both are explained, all in one explain_batch call.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from prediction_cache import prediction_key
+
+# Largest batch the endpoint explains in one request
+MAX_EXPLANATION_ROWS = 1000
+
+
+class ExplanationCache:
+    """Bounded LRU of JSON-ready explanations, keyed on normalized inputs and the model version"""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = int(max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Cache sized by ML_EXPLANATION_CACHE_SIZE (0 disables it)"""
+        return cls(os.environ.get('ML_EXPLANATION_CACHE_SIZE', 4096))
+
+    def get_many(self, keys):
+        """Cached explanation for each key, or None"""
+        with self._lock:
+            found = []
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                found.append(value)
+            return found
+
+    def put_many(self, items):
+        """Store (key, explanation) pairs, evicting the least recently used beyond max_entries"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries}
+
+
+def explain(predictor, records, cache=None, shared_cache=None):
+    """Explanations for processed input records (INPUT_DEFAULTS fields plus location), in order.
+
+    Returns (explanations, cached): cached counts the rows not explained
+    here. Distinct misses are explained together and stored in both caches.
+    """
+    keys = [prediction_key('explanation', record, predictor.model_version, precision=6) for record in records]
+    explanations = cache.get_many(keys) if cache is not None else [None] * len(records)
+    if shared_cache is not None:
+        shared = []
+        for i, explanation in enumerate(explanations):
+            if explanation is None:
+                explanations[i] = shared_cache.get('explanation', records[i])
+                if explanations[i] is not None:
+                    shared.append((keys[i], explanations[i]))
+        if cache is not None:
+            cache.put_many(shared)
+
+    # Repeated inputs within the batch are explained once
+    first = {}
+    for i, explanation in enumerate(explanations):
+        if explanation is None:
+            first.setdefault(keys[i], i)
+    missing = list(first.values())
+    if missing:
+        columns = {name: [records[i][name] for i in missing] for name in records[missing[0]]}
+        computed = dict(zip(first, predictor.explanation_summaries(predictor.explain_batch(columns))))
+        if cache is not None:
+            cache.put_many(computed.items())
+        if shared_cache is not None:
+            shared_cache.put_many([('explanation', records[i], computed[keys[i]]) for i in missing])
+        explanations = [computed[key] if explanation is None else explanation
+                        for key, explanation in zip(keys, explanations)]
+    return explanations, len(records) - len(missing)
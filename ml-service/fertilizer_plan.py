@@ -0,0 +1,142 @@
+"""
+Least-cost fertilizer planning.
+
+Given N/P/K deficits (kg/ha) for many farms, find the cheapest mix of products
+from fertilizer_products.json that covers every deficit:
+
+    minimize price . x   subject to   contents . x >= deficit,  x >= 0
+
+With three nutrient constraints an optimal mix uses at most three products, so
+the planner enumerates every basis of the LP (3 columns out of the products
+plus surplus slacks) once at load time and keeps their inverses. Planning a
+batch is then a few array operations: solve every basis for every farm, drop
+the infeasible ones and take the cheapest. No per-farm Python loop and no
+solver dependency. Point ML_FERTILIZER_PRODUCTS at another table to change
+products or prices.
+"""
+
+import os
+import json
+import hashlib
+from itertools import combinations
+import numpy as np
+
+PRODUCTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fertilizer_products.json')
+NUTRIENTS = ('nitrogen', 'phosphorus', 'potassium')
+TOLERANCE = 1e-9
+
+
+class FertilizerPlanner:
+    """Vectorized least-cost product mix for N/P/K deficits"""
+
+    def __init__(self, products, version='', currency='INR', chunk_size=4096):
+        self.products = [dict(product) for product in products]
+        self.names = [product['name'] for product in self.products]
+        self.version = version
+        self.currency = currency
+        self.chunk_size = chunk_size
+
+        # contents[nutrient, product]: kg of nutrient per kg of product
+        self.contents = np.array(
+            [[product[nutrient] for product in self.products] for nutrient in NUTRIENTS], dtype=float
+        ).reshape(len(NUTRIENTS), -1)
+        self.prices = np.array([product['price_per_kg'] for product in self.products], dtype=float)
+        self._build_bases()
+
+    def _build_bases(self):
+        nutrients, products = self.contents.shape
+        # Standard form: contents . x - surplus = deficit, surplus columns cost nothing
+        columns = np.hstack([self.contents, -np.eye(nutrients)])
+        costs = np.concatenate([self.prices, np.zeros(nutrients)])
+
+        members, inverses = [], []
+        for basis in combinations(range(products + nutrients), nutrients):
+            matrix = columns[:, basis]
+            if abs(np.linalg.det(matrix)) > TOLERANCE:
+                members.append(basis)
+                inverses.append(np.linalg.inv(matrix))
+
+        self._basis_columns = np.array(members, dtype=np.intp).reshape(-1, nutrients)
+        self._basis_inverses = np.array(inverses).reshape(-1, nutrients, nutrients)
+        self._basis_costs = costs[self._basis_columns]
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or os.environ.get('ML_FERTILIZER_PRODUCTS') or PRODUCTS_FILE
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        if tuple(data.get('nutrients', NUTRIENTS)) != NUTRIENTS:
+            raise ValueError(f"Fertilizer table {path} must list nutrients {NUTRIENTS}")
+        return cls(data['products'], version=hashlib.sha256(raw).hexdigest()[:12],
+                   currency=data.get('currency', 'INR'))
+
+    def plan(self, deficits):
+        """Least-cost plan for each row of deficits (rows x N/P/K, kg/ha).
+
+        Returns quantities (rows x products, kg/ha), cost per row, supplied
+        nutrients (rows x N/P/K) and a feasible flag; rows whose deficits no
+        product can cover get NaN quantities and cost.
+        """
+        deficits = np.maximum(0, np.asarray(deficits, dtype=float).reshape(-1, len(NUTRIENTS)))
+        rows = len(deficits)
+        quantities = np.full((rows, len(self.names)), np.nan)
+        cost = np.full(rows, np.nan)
+
+        for start in range(0, rows, self.chunk_size):
+            chunk = deficits[start:start + self.chunk_size]
+            # Basic solution of every basis for every farm: (bases x rows x 3)
+            solutions = np.matmul(chunk, self._basis_inverses.transpose(0, 2, 1))
+            costs = np.matmul(solutions, self._basis_costs[:, :, None])[:, :, 0]
+            costs[(solutions < -TOLERANCE).any(axis=2)] = np.inf
+
+            best = np.argmin(costs, axis=0)
+            index = np.arange(len(chunk))
+            chosen = np.maximum(solutions[best, index], 0)
+            columns = self._basis_columns[best]
+
+            # Scatter product columns of the chosen basis (slack columns are dropped)
+            mix = np.zeros((len(chunk), len(self.names) + len(NUTRIENTS)))
+            np.put_along_axis(mix, columns, chosen, axis=1)
+            ok = np.isfinite(costs[best, index])
+            quantities[start:start + len(chunk)][ok] = mix[ok, :len(self.names)]
+            cost[start:start + len(chunk)][ok] = costs[best, index][ok]
+
+        feasible = np.isfinite(cost)
+        supplied = np.where(feasible[:, None], np.nan_to_num(quantities) @ self.contents.T, np.nan)
+        return {'quantities': quantities, 'cost': cost, 'supplied': supplied, 'feasible': feasible}
+
+    def describe(self, plan, row=0):
+        """JSON-friendly plan for one row: products with non-zero quantities"""
+        if not plan['feasible'][row]:
+            return {'feasible': False, 'products': [], 'total_cost': None, 'currency': self.currency}
+
+        products = []
+        for j, name in enumerate(self.names):
+            quantity = plan['quantities'][row, j]
+            if quantity > 1e-6:
+                products.append({
+                    'fertilizer': name,
+                    'grade': self.products[j].get('grade'),
+                    'quantity': float(quantity),
+                    'unit': 'kg/ha',
+                    'cost': float(quantity * self.prices[j])
+                })
+        return {
+            'feasible': True,
+            'products': products,
+            'supplied': dict(zip(NUTRIENTS, plan['supplied'][row].tolist())),
+            'total_cost': float(plan['cost'][row]),
+            'currency': self.currency
+        }
+
+
+_default_planner = None
+
+
+def default_planner():
+    """Process-wide planner loaded on first use"""
+    global _default_planner
+    if _default_planner is None:
+        _default_planner = FertilizerPlanner.load()
+    return _default_planner
@@ -0,0 +1,91 @@
+import threading
+
+
+class Metrics:
+    """Minimal thread-safe counters, gauges and timing summaries for the service.
+
+    Values are kept per process and rendered in the Prometheus text format by
+    the /metrics endpoint.
+    """
+
+    def __init__(self, prefix='punjab_ml'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            count, total, maximum = self._summaries.get(key, (0, 0.0, 0.0))
+            self._summaries[key] = (count + 1, total + value, max(maximum, value))
+
+    def get(self, name, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            return self._gauges.get(key)
+
+    def snapshot(self):
+        """Plain dict of all current values (for JSON responses)"""
+        with self._lock:
+            data = {}
+            for (name, labels), value in list(self._counters.items()) + list(self._gauges.items()):
+                data[name + self._format_labels(labels)] = value
+            for (name, labels), (count, total, maximum) in self._summaries.items():
+                suffix = self._format_labels(labels)
+                data[f'{name}_count{suffix}'] = count
+                data[f'{name}_sum{suffix}'] = total
+                data[f'{name}_max{suffix}'] = maximum
+            return data
+
+    @staticmethod
+    def _format_labels(labels):
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for kind, store in (('counter', self._counters), ('gauge', self._gauges)):
+                seen = set()
+                for (name, labels), value in sorted(store.items()):
+                    full_name = f'{self.prefix}_{name}'
+                    if full_name not in seen:
+                        lines.append(f'# TYPE {full_name} {kind}')
+                        seen.add(full_name)
+                    lines.append(f'{full_name}{self._format_labels(labels)} {value}')
+
+            seen = set()
+            for (name, labels), (count, total, maximum) in sorted(self._summaries.items()):
+                full_name = f'{self.prefix}_{name}'
+                if full_name not in seen:
+                    lines.append(f'# TYPE {full_name} summary')
+                    seen.add(full_name)
+                suffix = self._format_labels(labels)
+                lines.append(f'{full_name}_count{suffix} {count}')
+                lines.append(f'{full_name}_sum{suffix} {total}')
+                lines.append(f'{full_name}_max{suffix} {maximum}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Shared registry for the service process
+metrics = Metrics()
@@ -0,0 +1,384 @@
+"""
+NumPy serving bundle of the trained models.
+
+save_bundle copies what serving needs out of the fitted sklearn objects into a
+single model_bundle.npz: scaler statistics, the random forest as flat node
+arrays, the MLP weights, the KMeans centres, label encoder classes and the
+soil health labels. load_bundle returns drop-in replacements exposing the
+methods serving calls (transform, predict_proba, predict), evaluated with
+NumPy alone, so a serving process never imports sklearn, joblib or pandas
+and never unpickles anything.
+
+The forest is walked level by level for every row and tree at once: each
+step gathers the split feature and threshold of the current nodes and moves
+all of them to a child; leaves point at themselves, so after max-depth steps
+every row sits on its leaf in every tree. Features are compared as float32
+against the thresholds, exactly like sklearn, so probabilities match.
+
+The compact bundle (model_bundle_f32.npz, ML_MODEL_PRECISION=float32) holds
+the same components in float32, with node and feature indices in the
+smallest unsigned integer type that fits. The scalers keep their float64
+statistics and round only their output, and thresholds are rounded down to
+float32, so the forest takes exactly the same path in either bundle; the
+remaining differences come from float32 leaf values and MLP arithmetic.
+
+The same leaf lookup serves per-prediction explanations: TreeEnsemble keeps,
+per class, a table of each node's summed class-fraction changes along its
+root path by split feature, so the tree-path contributions of a batch are a
+gather of the leaves' rows and one average over the trees.
+
+    python -m model_bundle --model-dir ./model                       # bundle models saved as pickles
+    python -m model_bundle --model-dir ./model --precision float32   # write the compact bundle
+"""
+
+import os
+import numpy as np
+
+BUNDLE_FILE = 'model_bundle.npz'
+COMPACT_BUNDLE_FILE = 'model_bundle_f32.npz'
+PRECISIONS = ('float64', 'float32')
+BUNDLE_FILES = {'float64': BUNDLE_FILE, 'float32': COMPACT_BUNDLE_FILE}
+FORMAT_VERSION = 1
+FOREST_CHUNK_ROWS = 1024
+
+
+def _floats(values):
+    """Float arrays keep their precision (float32 in the compact bundle); anything else becomes float64"""
+    values = np.asarray(values)
+    return values if values.dtype in (np.float32, np.float64) else values.astype(np.float64)
+
+
+def _indices(values):
+    """Integer arrays keep their (possibly compact) type; anything else becomes intp"""
+    values = np.asarray(values)
+    return values if values.dtype.kind in 'ui' else values.astype(np.intp)
+
+
+class Standardizer:
+    """StandardScaler.transform from the fitted mean and scale"""
+
+    def __init__(self, mean, scale, dtype=np.float64):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.dtype = np.dtype(dtype)
+        self.n_features_in_ = len(self.mean_)
+
+    def transform(self, X):
+        # Scaled in float64 either way, so compact output is the full output rounded to float32
+        return ((np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_).astype(self.dtype, copy=False)
+
+    def compact(self):
+        return Standardizer(self.mean_, self.scale_, np.float32)
+
+
+class ClassEncoder:
+    """LabelEncoder.transform from the fitted (sorted) classes"""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self._codes = {name: code for code, name in enumerate(self.classes_.tolist())}
+
+    def transform(self, values):
+        try:
+            return np.array([self._codes[value] for value in np.asarray(values, dtype=object).ravel()],
+                            dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e.args[0]!r}") from None
+
+
+class TreeEnsemble:
+    """Random forest classifier as flat node arrays, evaluated for all rows and trees at once"""
+
+    def __init__(self, roots, feature, threshold, children, value, depth, classes):
+        self.feature = _indices(feature)
+        self.threshold = _floats(threshold)
+        # children[2 * node + go_right]; leaves are their own children
+        self.children = _indices(children)
+        self.roots = np.asarray(roots, dtype=self.children.dtype)
+        self.value = _floats(value)
+        self.depth = int(depth)
+        self.classes_ = np.asarray(classes)
+        self._path_tables = {}
+
+    @classmethod
+    def from_forest(cls, forest):
+        roots, feature, threshold, children, value = [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left < 0
+            left = np.where(leaf, nodes, tree.children_left) + offset
+            right = np.where(leaf, nodes, tree.children_right) + offset
+
+            roots.append(offset)
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            children.append(np.column_stack([left, right]).ravel())
+            # Per-node class fractions, as predict_proba normalizes them
+            counts = tree.value[:, 0, :]
+            value.append(counts / counts.sum(axis=1, keepdims=True))
+            offset += tree.node_count
+
+        depth = max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        return cls(roots, np.concatenate(feature), np.concatenate(threshold), np.concatenate(children),
+                   np.concatenate(value), depth, forest.classes_)
+
+    def compact(self):
+        """float32 thresholds and leaf values, smallest unsigned types for feature and node indices"""
+        threshold = self.threshold.astype(np.float32)
+        # Largest float32 <= the threshold: x > t and x > t32 agree for every float32 x
+        threshold = np.where(threshold > self.threshold, np.nextafter(threshold, np.float32(-np.inf)), threshold)
+        nodes = np.min_scalar_type(len(self.children))
+        return TreeEnsemble(self.roots.astype(nodes), self.feature.astype(np.min_scalar_type(self.feature.max())),
+                            threshold, self.children.astype(nodes), self.value.astype(np.float32), self.depth,
+                            self.classes_)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """Leaf node (global index) reached in every tree for each row (rows x trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        rows, width = X.shape
+        leaves = np.empty((rows, len(self.roots)), dtype=self.children.dtype)
+
+        for start in range(0, rows, FOREST_CHUNK_ROWS):
+            block = X[start:start + FOREST_CHUNK_ROWS]
+            flat = block.ravel()
+            row_offsets = (np.arange(len(block)) * width)[:, None]
+            # Working arrays use the stored types: node * 2 + 1 always fits the children's index type
+            node = np.tile(self.roots, (len(block), 1))
+            feature = np.empty(node.shape, dtype=self.feature.dtype)
+            column = np.empty(node.shape, dtype=np.intp)
+            feature_value = np.empty(node.shape, dtype=np.float32)
+            threshold = np.empty(node.shape, dtype=self.threshold.dtype)
+
+            # take(mode='clip') skips bounds checks; every index is valid by construction
+            for _ in range(self.depth):
+                np.take(self.feature, node, out=feature, mode='clip')
+                np.add(feature, row_offsets, out=column)
+                np.take(flat, column, out=feature_value, mode='clip')
+                np.take(self.threshold, node, out=threshold, mode='clip')
+                node *= 2
+                node += feature_value > threshold
+                np.take(self.children, node, out=node, mode='clip')
+            leaves[start:start + len(block)] = node
+        return leaves
+
+    def predict_proba(self, X):
+        # Mean of the trees' leaf fractions: take() gathers rows x trees x classes, one matmul averages the trees
+        votes = np.take(self.value, self.apply(X), axis=0)
+        weights = np.full(self.n_estimators, 1 / self.n_estimators, dtype=self.value.dtype)
+        return np.matmul(weights, votes).astype(np.float64, copy=False)
+
+    def vote_spread(self, X, quantiles=(0.1, 0.9)):
+        """Per-tree dispersion of the class probabilities, from one pass over the trees.
+
+        Returns the mean (predict_proba), the standard deviation across trees,
+        the given quantiles across trees (quantiles x rows x classes) and the
+        share of trees whose own top class is the forest's.
+        """
+        # Votes gathered class-major (classes x rows x trees) so each row's trees are contiguous
+        votes = np.take(self.value.T, self.apply(X), axis=1)
+        weights = np.full(self.n_estimators, 1 / self.n_estimators, dtype=self.value.dtype)
+        mean = np.matmul(votes, weights)
+        deviation = votes - mean[:, :, None]
+        variance = np.matmul(deviation * deviation, weights).T.astype(np.float64)
+        mean = mean.T.astype(np.float64)
+
+        # Linear interpolation between order statistics, as np.quantile does, on one sort
+        ordered = np.sort(votes, axis=2)
+        position = np.asarray(quantiles, dtype=np.float64) * (self.n_estimators - 1)
+        below = np.floor(position).astype(int)
+        above = np.minimum(below + 1, self.n_estimators - 1)
+        fraction = (position - below)[:, None, None]
+        spread = ordered[:, :, below] * (1 - fraction.T) + ordered[:, :, above] * fraction.T
+        return {
+            'mean': mean,
+            'std': np.sqrt(variance),
+            'quantiles': spread.transpose(2, 1, 0).astype(np.float64, copy=False),
+            'agreement': (votes.argmax(axis=0) == mean.argmax(axis=1)[:, None]).mean(axis=1)
+        }
+
+    def path_table(self, column, width):
+        """Per-node sums of the class fraction changes along the path from the root (nodes x features).
+
+        Each split moves a row from a node to a child; the change in the
+        class fraction is credited to the split feature. Built once per class
+        column, one tree level at a time for all trees.
+        """
+        key = (column, width)
+        if key not in self._path_tables:
+            value = self.value[:, column].astype(np.float64)
+            table = np.zeros((len(self.value), width))
+            node = self.roots.astype(np.intp)
+            for _ in range(self.depth):
+                children = self.children[2 * node[:, None] + np.arange(2)].astype(np.intp)
+                split = children[:, 0] != node  # leaves are their own children
+                node, children = node[split], children[split]
+                feature = self.feature[node]
+                for child in children.T:
+                    table[child] = table[node]
+                    table[child, feature] += value[child] - value[node]
+                node = children.ravel()
+            self._path_tables[key] = table.astype(self.value.dtype, copy=False)
+        return self._path_tables[key]
+
+    def contributions(self, X, column=1):
+        """Tree-path attribution of one class's probability for each row.
+
+        Returns (bias, contributions): bias is the forest's mean root fraction
+        and contributions is rows x features, with bias plus a row's sum equal
+        to predict_proba(X)[:, column]. Leaves index the path table, so a batch
+        costs one apply(), then a gather and a matmul per row chunk.
+        """
+        X = np.asarray(X)
+        table = self.path_table(column, X.shape[1])
+        leaves = self.apply(X)
+        weights = np.full(self.n_estimators, 1 / self.n_estimators, dtype=table.dtype)
+        contributions = np.empty((len(X), X.shape[1]))
+        for start in range(0, len(X), FOREST_CHUNK_ROWS):
+            block = leaves[start:start + FOREST_CHUNK_ROWS]
+            contributions[start:start + len(block)] = np.matmul(weights, np.take(table, block, axis=0))
+        bias = float(self.value[self.roots, column].astype(np.float64).mean())
+        return bias, contributions
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class DenseNetwork:
+    """MLPRegressor.predict from the fitted weights (ReLU hidden layers, identity output)"""
+
+    def __init__(self, weights, biases):
+        self.coefs_ = [np.ascontiguousarray(_floats(w)) for w in weights]
+        self.intercepts_ = [_floats(b) for b in biases]
+
+    def predict(self, X):
+        hidden = np.asarray(X, dtype=self.coefs_[0].dtype)
+        for w, b in zip(self.coefs_[:-1], self.intercepts_[:-1]):
+            hidden = np.maximum(hidden @ w + b, 0)
+        out = (hidden @ self.coefs_[-1] + self.intercepts_[-1]).astype(np.float64, copy=False)
+        return out.ravel() if out.shape[1] == 1 else out
+
+    def compact(self):
+        return DenseNetwork([w.astype(np.float32) for w in self.coefs_],
+                            [b.astype(np.float32) for b in self.intercepts_])
+
+
+class NearestCentroid:
+    """KMeans.predict from the fitted cluster centres"""
+
+    def __init__(self, centers):
+        self.cluster_centers_ = _floats(centers)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=self.cluster_centers_.dtype)
+        distances = ((X[:, None, :] - self.cluster_centers_[None, :, :]) ** 2).sum(axis=2)
+        return np.argmin(distances, axis=1)
+
+    def compact(self):
+        return NearestCentroid(self.cluster_centers_.astype(np.float32))
+
+
+def bundle_components(predictor):
+    """Bundle components for a predictor holding fitted sklearn models or already loaded components"""
+    mlp = predictor.yield_predictor
+    if getattr(mlp, 'activation', 'relu') != 'relu' or getattr(mlp, 'out_activation_', 'identity') != 'identity':
+        raise ValueError(f"Only ReLU regressors can be bundled, got {mlp.activation}/{mlp.out_activation_}")
+
+    forest = predictor.crop_recommender
+    return {
+        'scaler': Standardizer(predictor.scaler.mean_, predictor.scaler.scale_),
+        'soil_scaler': Standardizer(predictor.soil_scaler.mean_, predictor.soil_scaler.scale_),
+        'crop_recommender': TreeEnsemble.from_forest(forest) if hasattr(forest, 'estimators_') else forest,
+        'yield_predictor': DenseNetwork(mlp.coefs_, mlp.intercepts_),
+        'soil_classifier': NearestCentroid(predictor.soil_classifier.cluster_centers_),
+        'label_encoders': {name: ClassEncoder(encoder.classes_) for name, encoder in predictor.label_encoders.items()},
+        'soil_health_labels': list(predictor.soil_health_labels)
+    }
+
+
+def compact_components(components):
+    """float32 copies of every component holding floats; encoders and labels are shared"""
+    return {name: component.compact() if hasattr(component, 'compact') else component
+            for name, component in components.items()}
+
+
+def save_bundle(predictor, model_dir="./", precision='float64'):
+    """Write the predictor's models to <model_dir>/model_bundle.npz (model_bundle_f32.npz for float32)"""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', choose from {', '.join(PRECISIONS)}")
+    components = bundle_components(predictor)
+    if precision == 'float32':
+        components = compact_components(components)
+
+    forest, mlp = components['crop_recommender'], components['yield_predictor']
+    arrays = {
+        'format_version': np.asarray(FORMAT_VERSION), 'precision': np.asarray(precision),
+        'scaler_mean': components['scaler'].mean_, 'scaler_scale': components['scaler'].scale_,
+        'soil_scaler_mean': components['soil_scaler'].mean_, 'soil_scaler_scale': components['soil_scaler'].scale_,
+        'forest_roots': forest.roots, 'forest_feature': forest.feature, 'forest_threshold': forest.threshold,
+        'forest_children': forest.children, 'forest_value': forest.value,
+        'forest_depth': np.asarray(forest.depth), 'forest_classes': forest.classes_,
+        'kmeans_centers': components['soil_classifier'].cluster_centers_,
+        'soil_health_labels': np.asarray(components['soil_health_labels'], dtype=str),
+        'mlp_layers': np.asarray(len(mlp.coefs_))
+    }
+    for i, (w, b) in enumerate(zip(mlp.coefs_, mlp.intercepts_)):
+        arrays[f"mlp_w{i}"] = w
+        arrays[f"mlp_b{i}"] = b
+    for name, encoder in components['label_encoders'].items():
+        arrays[f"classes_{name}"] = np.asarray(encoder.classes_, dtype=str)
+
+    path = os.path.join(model_dir, BUNDLE_FILES[precision])
+    np.savez(path, **arrays)
+    return path
+
+
+def load_bundle(model_dir="./", precision='float64'):
+    """Serving components from the bundle of the given precision, keyed like the predictor's attributes"""
+    name = BUNDLE_FILES[precision]
+    with np.load(os.path.join(model_dir, name), allow_pickle=False) as data:
+        if int(data['format_version']) != FORMAT_VERSION:
+            raise ValueError(f"{name} format {int(data['format_version'])} is not {FORMAT_VERSION}, rebuild it")
+        layers = int(data['mlp_layers'])
+        dtype = str(data['precision']) if 'precision' in data.files else 'float64'
+        return {
+            'scaler': Standardizer(data['scaler_mean'], data['scaler_scale'], dtype),
+            'soil_scaler': Standardizer(data['soil_scaler_mean'], data['soil_scaler_scale'], dtype),
+            'crop_recommender': TreeEnsemble(
+                data['forest_roots'], data['forest_feature'], data['forest_threshold'],
+                data['forest_children'], data['forest_value'], data['forest_depth'], data['forest_classes']
+            ),
+            'yield_predictor': DenseNetwork([data[f"mlp_w{i}"] for i in range(layers)],
+                                            [data[f"mlp_b{i}"] for i in range(layers)]),
+            'soil_classifier': NearestCentroid(data['kmeans_centers']),
+            'label_encoders': {name[len('classes_'):]: ClassEncoder(data[name].tolist())
+                               for name in data.files if name.startswith('classes_')},
+            'soil_health_labels': data['soil_health_labels'].tolist()
+        }
+
+
+def main(argv=None):
+    import argparse
+    from models import PunjabCropPredictor
+
+    parser = argparse.ArgumentParser(description='Write the NumPy serving bundle for pickled models')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float64',
+                        help='float32 writes the compact bundle (from the float64 bundle when there is one)')
+    args = parser.parse_args(argv)
+
+    predictor = PunjabCropPredictor()
+    has_bundle = os.path.exists(os.path.join(args.model_dir, BUNDLE_FILE))
+    backend = 'numpy' if args.precision == 'float32' and has_bundle else 'sklearn'
+    predictor.load_models(args.model_dir, backend=backend, precision='float64')
+    path = save_bundle(predictor, args.model_dir, args.precision)
+    print(f"💾 Serving bundle ({args.precision}) saved to {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
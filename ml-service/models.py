@@ -1,42 +1,111 @@
-import pandas as pd
+"""
+Serving-side Punjab crop predictor.
+
+Only NumPy and the project's own modules are imported here. Models are read
+from the NumPy serving bundle (model_bundle.py), so loading and predicting
+never import sklearn, joblib or pandas; the pickled sklearn models are only
+unpickled for the 'sklearn' backend. Training lives in crop_trainer.py.
+"""
+
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.neural_network import MLPRegressor
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import accuracy_score, classification_report, mean_squared_error, r2_score
-import joblib
+from climate_store import ClimateStore, STORE_FILE
+from districts import district_index
+from crop_catalog import default_catalog, NUTRIENTS
+from fertilizer_plan import default_planner
+from distillation import StudentModel, STUDENT_FILE, TIERS
+from model_bundle import BUNDLE_FILE, BUNDLE_FILES, PRECISIONS, TreeEnsemble, load_bundle
+from yield_intervals import YieldIntervals, INTERVAL_FILE
+from yield_forecast import YieldForecaster, FORECAST_FILE, FORECAST_CROP, FORECAST_MODELS, history_panel
+import hashlib
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
+# Model input features (order matters for the scaler and models)
+FEATURES = [
+    'nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature',
+    'soil_type_encoded', 'district_encoded', 'npk_ratio', 'pk_ratio',
+    'total_nutrients', 'nutrient_balance', 'rainfall_nitrogen', 'temp_phosphorus'
+]
+
+# Nutrient content of the straight fertilizers used for deficits
+FERTILIZERS = [
+    ('Nitrogen', 'nitrogen', 'Urea', 0.46),
+    ('Phosphorus', 'phosphorus', 'Single Super Phosphate', 0.16),
+    ('Potassium', 'potassium', 'Muriate of Potash', 0.6)
+]
+
+# Defaults applied to missing soil/weather inputs
+INPUT_DEFAULTS = {
+    'nitrogen': 150, 'phosphorus': 40, 'potassium': 100,
+    'rainfall': 700, 'temperature': 25, 'soil_type': 'loamy'
+}
+
+# Inputs a what-if sweep may vary, and the largest grid evaluated in one call
+SWEEP_VARIABLES = ('nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature')
+MAX_SWEEP_POINTS = 10_000
+
+# Per-tree probability quantiles reported as a recommendation's confidence range
+VOTE_QUANTILES = (0.1, 0.9)
+
+# Inference backends: the NumPy bundle, the pickled sklearn objects, or the exported ONNX graphs on onnxruntime
+BACKENDS = ('numpy', 'sklearn', 'onnxruntime')
+
+MODEL_FILES = [
+    'crop_recommender.pkl', 'yield_predictor.pkl', 'soil_classifier.pkl', 'scaler.pkl',
+    'soil_scaler.pkl', 'label_encoders.pkl', 'soil_health_labels.pkl'
+]
+
+def model_fingerprint(model_dir="./"):
+    """Content hash of the saved model artifacts, stable across copies and deploys"""
+    names = [name for name in MODEL_FILES + list(BUNDLE_FILES.values()) if os.path.exists(f"{model_dir}/{name}")]
+    if not names:
+        raise FileNotFoundError(f"No model files in {model_dir}")
+    digest = hashlib.sha256()
+    for name in names:
+        digest.update(name.encode())
+        with open(f"{model_dir}/{name}", 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
 class PunjabCropPredictor:
     def __init__(self):
         self.crop_recommender = None
         self.yield_predictor = None
         self.soil_classifier = None
-        self.scaler = StandardScaler()
-        self.soil_scaler = StandardScaler()
+        self.scaler = None
+        self.soil_scaler = None
         self.label_encoders = {}
-        self.crop_encoder = LabelEncoder()
+        self.soil_health_labels = []
+        self.model_version = None
+        self.climate_store = None
+        self.crop_catalog = default_catalog()
+        self.fertilizer_planner = default_planner()
+        self.backend = 'numpy'
+        self.precision = 'float64'
+        self.onnx_models = None
+        self.student = None
+        self.yield_intervals = None
+        self.yield_forecaster = None
+        self.district_forecasts = None
+        self._vote_ensemble = None
+        self.tier = 'full'
         
     def prepare_features(self, data):
-        """Prepare features for ML models"""
+        """Prepare features for ML models (data is a DataFrame or a dict of columns)"""
         print("🔧 Preparing features...")
         
         # Encode categorical variables
-        if 'soil_type' not in self.label_encoders:
-            self.label_encoders['soil_type'] = LabelEncoder()
-            data['soil_type_encoded'] = self.label_encoders['soil_type'].fit_transform(data['soil_type'])
-        else:
-            data['soil_type_encoded'] = self.label_encoders['soil_type'].transform(data['soil_type'])
-            
-        if 'district' not in self.label_encoders:
-            self.label_encoders['district'] = LabelEncoder()
-            data['district_encoded'] = self.label_encoders['district'].fit_transform(data['district'])
-        else:
-            data['district_encoded'] = self.label_encoders['district'].transform(data['district'])
+        data['soil_type_encoded'] = self.label_encoders['soil_type'].transform(data['soil_type'])
         
+        # Districts are matched through the shared index; unknown ones get a neutral code
+        data['district_encoded'] = district_index.encode(data['district'], self.label_encoders['district'].classes_)
+        
+        return self.derive_features(data)
+    
+    def derive_features(self, data):
+        """Add the ratio and interaction features computed from the raw inputs"""
         # Create derived features
         data['npk_ratio'] = data['nitrogen'] / (data['phosphorus'] + data['potassium'] + 1)
         data['pk_ratio'] = data['phosphorus'] / (data['potassium'] + 1)
@@ -49,275 +118,87 @@ class PunjabCropPredictor:
         
         return data
     
-    def build_crop_recommender(self, training_data):
-        """Build crop recommendation model using Random Forest"""
-        print("🌾 Building crop recommendation model...")
-        
-        # Prepare features
-        features = [
-            'nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature',
-            'soil_type_encoded', 'district_encoded', 'npk_ratio', 'pk_ratio',
-            'total_nutrients', 'nutrient_balance', 'rainfall_nitrogen', 'temp_phosphorus'
-        ]
-        
-        X = training_data[features]
-        y = training_data['recommended']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
-        
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Train Random Forest
-        self.crop_recommender = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=42,
-            class_weight='balanced'
-        )
-        
-        self.crop_recommender.fit(X_train_scaled, y_train)
-        
-        # Evaluate model
-        y_pred = self.crop_recommender.predict(X_test_scaled)
-        accuracy = accuracy_score(y_test, y_pred)
-        
-        # Cross-validation
-        cv_scores = cross_val_score(
-            self.crop_recommender, X_train_scaled, y_train, cv=5
-        )
-        
-        print(f"✅ Crop Recommender - Accuracy: {accuracy:.3f}")
-        print(f"✅ Cross-validation score: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
-        
-        # Feature importance
-        feature_importance = pd.DataFrame({
-            'feature': features,
-            'importance': self.crop_recommender.feature_importances_
-        }).sort_values('importance', ascending=False)
-        
-        print("📊 Top 5 Important Features:")
-        print(feature_importance.head())
-        
-        return accuracy
-    
-    def build_yield_predictor(self, training_data):
-        """Build yield prediction model using Neural Network"""
-        print("📈 Building yield prediction model...")
-        
-        # Use same features as crop recommender for consistency
-        features = [
-            'nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature',
-            'soil_type_encoded', 'district_encoded', 'npk_ratio', 'pk_ratio',
-            'total_nutrients', 'nutrient_balance', 'rainfall_nitrogen', 'temp_phosphorus'
-        ]
-        
-        X = training_data[features]
-        y = training_data['expected_yield']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        
-        # Scale features (using same scaler)
-        X_train_scaled = self.scaler.transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Train Neural Network
-        self.yield_predictor = MLPRegressor(
-            hidden_layer_sizes=(100, 50, 25),
-            activation='relu',
-            solver='adam',
-            alpha=0.001,
-            learning_rate='adaptive',
-            max_iter=500,
-            random_state=42
-        )
-        
-        self.yield_predictor.fit(X_train_scaled, y_train)
-        
-        # Evaluate model
-        y_pred = self.yield_predictor.predict(X_test_scaled)
-        mse = mean_squared_error(y_test, y_pred)
-        rmse = np.sqrt(mse)
-        r2 = r2_score(y_test, y_pred)
-        
-        print(f"✅ Yield Predictor - RMSE: {rmse:.0f} kg/ha")
-        print(f"✅ R² Score: {r2:.3f}")
-        
-        return rmse, r2
-    
-    def build_soil_classifier(self, training_data):
-        """Build soil health classification model using K-Means clustering"""
-        print("🌍 Building soil classification model...")
-        
-        # Features for soil classification
-        soil_features = [
-            'nitrogen', 'phosphorus', 'potassium', 'total_nutrients',
-            'nutrient_balance', 'npk_ratio', 'pk_ratio'
-        ]
-        
-        X_soil = training_data[soil_features]
-        X_soil_npk = X_soil[['nitrogen', 'phosphorus', 'potassium']]
-        X_soil_scaled = self.soil_scaler.fit_transform(X_soil_npk)
-        
-        # K-means clustering for soil health categories
-        self.soil_classifier = KMeans(n_clusters=5, random_state=42, n_init=10)
-        clusters = self.soil_classifier.fit_predict(X_soil_scaled)
-        
-        # Assign meaningful labels based on cluster centers
-        cluster_centers = self.soil_classifier.cluster_centers_
-        cluster_labels = []
-        
-        for center in cluster_centers:
-            avg_nutrients = np.mean(center)
-            if avg_nutrients < -1:
-                cluster_labels.append('Poor')
-            elif avg_nutrients < -0.5:
-                cluster_labels.append('Below Average')
-            elif avg_nutrients < 0.5:
-                cluster_labels.append('Average')
-            elif avg_nutrients < 1:
-                cluster_labels.append('Good')
-            else:
-                cluster_labels.append('Excellent')
-        
-        self.soil_health_labels = cluster_labels
-        
-        print(f"✅ Soil Classifier - Created {len(cluster_labels)} health categories")
-        print(f"📊 Categories: {cluster_labels}")
+    def get_crop_recommendations(self, soil_data, location=None, top_k=None, tier=None, uncertainty=False):
+        """Get crop recommendations for given soil conditions (best top_k only if given).
         
-        return cluster_labels
-    
-    def get_crop_recommendations(self, soil_data, location=None):
-        """Get crop recommendations for given soil conditions"""
+        With uncertainty, each recommendation also gets an 'uncertainty' dict:
+        the per-tree spread of the confidence and the yield interval.
+        """
         # Prepare input data
+        district = location or 'Amritsar'
+        climate = self.climate_defaults(district)
         input_data = {
             'nitrogen': soil_data.get('nitrogen', 150),
             'phosphorus': soil_data.get('phosphorus', 40),
             'potassium': soil_data.get('potassium', 100),
-            'rainfall': soil_data.get('rainfall', 700),
-            'temperature': soil_data.get('temperature', 25),
+            'rainfall': soil_data.get('rainfall', climate['rainfall']),
+            'temperature': soil_data.get('temperature', climate['temperature']),
             'soil_type': soil_data.get('soil_type', 'loamy'),
-            'district': location or 'Amritsar'
+            'district': district
         }
         
-        # Create DataFrame for processing
-        df = pd.DataFrame([input_data])
-        df = self.prepare_features(df)
+        # Model outputs do not depend on the crop, so score the row once
+        batch = self.predict_batch({key: [value] for key, value in input_data.items()}, tier, uncertainty)
+        recommendation_prob = batch['recommendation_prob'][0]
+        predicted_yield = batch['predicted_yield'][0]
+        suitability = batch['suitability'][0]
+        spread = self.uncertainty_summary(batch, 0) if uncertainty else None
         
-        # Make predictions for each crop
-        crops = ['rice', 'wheat', 'potato', 'bajra']
+        # Catalog crops by suitability score
         recommendations = []
         
-        for crop in crops:
-            # Get crop-specific suitability
-            suitability_score = self.calculate_crop_suitability(input_data, crop)
-            
-            # Prepare features for model prediction
-            features = [
-                'nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature',
-                'soil_type_encoded', 'district_encoded', 'npk_ratio', 'pk_ratio',
-                'total_nutrients', 'nutrient_balance', 'rainfall_nitrogen', 'temp_phosphorus'
-            ]
-            
-            X = df[features].values
-            X_scaled = self.scaler.transform(X)
-            
-            # Get recommendation probability
-            recommendation_prob = self.crop_recommender.predict_proba(X_scaled)[0][1]
-            
-            # Predict yield (using same features as crop recommender)
-            X_yield = df[features].values
-            X_yield_scaled = self.scaler.transform(X_yield)
-            predicted_yield = self.yield_predictor.predict(X_yield_scaled)[0]
+        for i in self.crop_catalog.rank(batch['suitability'], top_k)[0]:
+            suitability_score = suitability[i]
             
             recommendations.append({
-                'crop': crop,
+                'crop': self.crop_catalog.names[i],
                 'suitability_score': float(suitability_score),
                 'recommendation_confidence': float(recommendation_prob),
-                'predicted_yield': float(max(0, predicted_yield)),
-                'recommended': suitability_score >= 0.7 and recommendation_prob >= 0.5
+                'predicted_yield': float(predicted_yield),
+                'recommended': bool(suitability_score >= 0.7 and recommendation_prob >= 0.5)
             })
-        
-        # Sort by suitability score
-        recommendations.sort(key=lambda x: x['suitability_score'], reverse=True)
+            if spread is not None:
+                recommendations[-1]['uncertainty'] = spread
         
         return recommendations
     
+    def uncertainty_summary(self, batch, row):
+        """JSON-ready uncertainty of one predict_batch row; parts a tier or model set lacks are None"""
+        def value(name):
+            number = batch[name][row]
+            return None if np.isnan(number) else float(number)
+        
+        confidence_range = [value('recommendation_low'), value('recommendation_high')]
+        yield_interval = [value('yield_low'), value('yield_high')]
+        return {
+            'confidence_std': value('recommendation_std'),
+            'confidence_range': confidence_range if confidence_range[0] is not None else None,
+            'tree_agreement': value('tree_agreement'),
+            'yield_interval': yield_interval if yield_interval[0] is not None else None,
+            'interval_level': self.yield_intervals.level if yield_interval[0] is not None else None
+        }
+    
     def calculate_crop_suitability(self, soil_data, crop):
         """Calculate crop suitability based on NPK requirements"""
-        crop_requirements = {
-            'rice': {'nitrogen': 135, 'phosphorus': 70, 'potassium': 50},
-            'wheat': {'nitrogen': 135, 'phosphorus': 70, 'potassium': 50},
-            'potato': {'nitrogen': 175, 'phosphorus': 100, 'potassium': 175},
-            'bajra': {'nitrogen': 60, 'phosphorus': 30, 'potassium': 30}
-        }
-        
-        requirements = crop_requirements.get(crop, crop_requirements['wheat'])
-        
-        # Calculate nutrient satisfaction scores
-        n_score = min(1.0, soil_data['nitrogen'] / requirements['nitrogen'])
-        p_score = min(1.0, soil_data['phosphorus'] / requirements['phosphorus'])
-        k_score = min(1.0, soil_data['potassium'] / requirements['potassium'])
-        
-        return np.mean([n_score, p_score, k_score])
+        npk = [soil_data['nitrogen'], soil_data['phosphorus'], soil_data['potassium']]
+        return self.crop_catalog.suitability(npk)[0, self.crop_catalog.index_of([crop])[0]]
     
     def get_fertilizer_recommendations(self, soil_data, target_crop):
         """Get fertilizer recommendations based on soil deficiencies"""
-        crop_requirements = {
-            'rice': {'nitrogen': 135, 'phosphorus': 70, 'potassium': 50},
-            'wheat': {'nitrogen': 135, 'phosphorus': 70, 'potassium': 50},
-            'potato': {'nitrogen': 175, 'phosphorus': 100, 'potassium': 175},
-            'bajra': {'nitrogen': 60, 'phosphorus': 30, 'potassium': 30}
-        }
-        
-        requirements = crop_requirements.get(target_crop, crop_requirements['wheat'])
+        npk = np.array([[soil_data.get(nutrient, 0) for _, nutrient, _, _ in FERTILIZERS]], dtype=float)
+        deficits, quantities = self.fertilizer_batch(npk, [target_crop])
         
         recommendations = []
         
-        # Nitrogen deficiency
-        n_deficit = max(0, requirements['nitrogen'] - soil_data.get('nitrogen', 0))
-        if n_deficit > 0:
-            urea_needed = n_deficit / 0.46  # Urea is 46% N
-            recommendations.append({
-                'nutrient': 'Nitrogen',
-                'deficit': float(n_deficit),
-                'fertilizer': 'Urea',
-                'quantity': float(urea_needed),
-                'unit': 'kg/ha'
-            })
-        
-        # Phosphorus deficiency
-        p_deficit = max(0, requirements['phosphorus'] - soil_data.get('phosphorus', 0))
-        if p_deficit > 0:
-            ssp_needed = p_deficit / 0.16  # Single Super Phosphate is 16% P2O5
-            recommendations.append({
-                'nutrient': 'Phosphorus',
-                'deficit': float(p_deficit),
-                'fertilizer': 'Single Super Phosphate',
-                'quantity': float(ssp_needed),
-                'unit': 'kg/ha'
-            })
-        
-        # Potassium deficiency
-        k_deficit = max(0, requirements['potassium'] - soil_data.get('potassium', 0))
-        if k_deficit > 0:
-            mop_needed = k_deficit / 0.6  # Muriate of Potash is 60% K2O
-            recommendations.append({
-                'nutrient': 'Potassium',
-                'deficit': float(k_deficit),
-                'fertilizer': 'Muriate of Potash',
-                'quantity': float(mop_needed),
-                'unit': 'kg/ha'
-            })
+        for j, (name, _, fertilizer, _) in enumerate(FERTILIZERS):
+            if deficits[0, j] > 0:
+                recommendations.append({
+                    'nutrient': name,
+                    'deficit': float(deficits[0, j]),
+                    'fertilizer': fertilizer,
+                    'quantity': float(quantities[0, j]),
+                    'unit': 'kg/ha'
+                })
         
         return recommendations
     
@@ -330,11 +211,8 @@ class PunjabCropPredictor:
             soil_data.get('potassium', 100)
         ]])
         
-        # Scale the data using soil scaler
-        input_scaled = self.soil_scaler.transform(input_data)
-        
-        # Predict cluster
-        cluster = self.soil_classifier.predict(input_scaled)[0]
+        # Scale and cluster
+        cluster = self.soil_clusters(input_data)[0]
         health_status = self.soil_health_labels[cluster]
         
         # Calculate overall nutrient score
@@ -351,6 +229,289 @@ class PunjabCropPredictor:
             'recommendations': self.get_health_recommendations(health_status)
         }
     
+    def predict_batch(self, data, tier=None, uncertainty=False):
+        """Vectorized predictions for a frame of soil/weather inputs.
+        
+        Missing rainfall/temperature come from the climate store when one is
+        loaded, other missing values fall back to INPUT_DEFAULTS; the district
+        is read from 'district' or 'location'. Returns arrays aligned with the rows:
+        suitability (rows x catalog crops), recommendation_prob, predicted_yield and
+        soil_cluster. The fast tier takes probability and yield from the
+        distilled student instead of the forest and MLP.
+        
+        uncertainty adds recommendation_std, recommendation_low/high (VOTE_QUANTILES
+        of the per-tree probabilities), tree_agreement and yield_low/high. The
+        forest statistics come from the same pass over the trees that gives the
+        probability; the fast tier has no trees, so they are NaN there. The
+        yield interval is NaN on the fast tier too, since it was calibrated on
+        the MLP's residuals and does not cover the student's, and when no
+        calibration was shipped.
+        """
+        X = self.input_matrix(data)
+        rows, npk = len(X), X[:, :3]
+        
+        spread = None
+        fast = self.resolve_tier(tier) == 'fast'
+        if fast:
+            recommendation_prob, predicted_yield = self.student.predict(self.scaler.transform(X))
+        elif uncertainty:
+            X_scaled = self.scaler.transform(X)
+            spread = self.vote_ensemble.vote_spread(X_scaled, VOTE_QUANTILES)
+            recommendation_prob = spread['mean'][:, 1]
+            if self.onnx_models is not None:
+                predicted_yield = self.onnx_models.predicted_yield(X)
+            else:
+                predicted_yield = self.yield_predictor.predict(X_scaled)
+        elif self.onnx_models is not None:
+            recommendation_prob = self.onnx_models.recommendation_prob(X)
+            predicted_yield = self.onnx_models.predicted_yield(X)
+        else:
+            X_scaled = self.scaler.transform(X)
+            recommendation_prob = self.crop_recommender.predict_proba(X_scaled)[:, 1]
+            predicted_yield = self.yield_predictor.predict(X_scaled)
+        
+        result = {
+            'suitability': self.suitability_matrix(npk),
+            'recommendation_prob': recommendation_prob,
+            'predicted_yield': np.maximum(0, predicted_yield),
+            'soil_cluster': self.soil_clusters(npk)
+        }
+        if uncertainty:
+            missing = np.full(rows, np.nan)
+            result.update({
+                'recommendation_std': spread['std'][:, 1] if spread else missing,
+                'recommendation_low': spread['quantiles'][0, :, 1] if spread else missing,
+                'recommendation_high': spread['quantiles'][-1, :, 1] if spread else missing,
+                'tree_agreement': spread['agreement'] if spread else missing
+            })
+            if self.yield_intervals is not None and not fast:
+                result['yield_low'], result['yield_high'] = self.yield_intervals.interval(result['predicted_yield'])
+            else:
+                result['yield_low'] = result['yield_high'] = missing
+        return result
+    
+    def input_matrix(self, data):
+        """Model feature matrix (rows x FEATURES, unscaled) with predict_batch's input defaults applied"""
+        columns = {name: np.asarray(data[name]) for name in list(INPUT_DEFAULTS) + ['district', 'location']
+                   if name in data}
+        rows = len(data.index) if hasattr(data, 'index') else len(next(iter(columns.values()), ()))
+        
+        frame, missing = {}, {}
+        for column, default in INPUT_DEFAULTS.items():
+            if column not in columns:
+                values = np.full(rows, default, dtype=object if isinstance(default, str) else float)
+                missing[column] = np.ones(rows, dtype=bool)
+            elif isinstance(default, str):
+                values = columns[column].astype(object)
+                missing[column] = np.array([value is None or value != value for value in values], dtype=bool)
+            else:
+                values = columns[column].astype(float)
+                missing[column] = np.isnan(values)
+            values[missing[column]] = default
+            frame[column] = values
+        district = columns.get('district', columns.get('location'))
+        frame['district'] = district.astype(object) if district is not None else np.full(rows, 'Amritsar', dtype=object)
+        
+        # Missing weather comes from the district's historical climate
+        if self.climate_store is not None:
+            for column in ('rainfall', 'temperature'):
+                if missing[column].any():
+                    frame[column][missing[column]] = self.climate_store.lookup_many(
+                        frame['district'][missing[column]], column
+                    )
+        
+        frame = self.prepare_features(frame)
+        return np.column_stack([np.asarray(frame[feature], dtype=float) for feature in FEATURES])
+    
+    def explain_batch(self, data):
+        """Why each row's top crop ranks first and what drives its recommendation confidence.
+        
+        The ranking is by catalog suitability, the mean of the capped N/P/K
+        satisfaction, so the top crop and the runner-up come with their
+        per-nutrient satisfaction. The confidence is the forest's probability,
+        split into tree-path contributions per model feature: bias plus a
+        row's contributions equals its full-tier recommendation_prob. The
+        contributions come from one leaf lookup for every row and tree
+        (TreeEnsemble.contributions), so a batch is explained in one call.
+        Explanations always describe the full tier, whatever the backend.
+        """
+        X = self.input_matrix(data)
+        npk = X[:, :3]
+        suitability = self.suitability_matrix(npk)
+        ranked = self.crop_catalog.rank(suitability, 2)
+        # Column 1 is the recommended class, the probability served as recommendation_prob
+        bias, contributions = self.vote_ensemble.contributions(self.scaler.transform(X), column=1)
+        return {
+            'features': X,
+            'bias': bias,
+            'contributions': contributions,
+            'recommendation_prob': bias + contributions.sum(axis=1),
+            'ranked': ranked,
+            'suitability': np.take_along_axis(suitability, ranked, axis=1),
+            'satisfaction': np.stack([self.crop_catalog.nutrient_satisfaction(npk, ranked[:, k])
+                                      for k in range(ranked.shape[1])], axis=1)
+        }
+    
+    def explanation_summaries(self, explained):
+        """JSON-ready explanation of every explain_batch row, features ordered by their absolute contribution"""
+        # Arrays become lists once per batch; the per-row work is only building dicts
+        order = np.argsort(-np.abs(explained['contributions']), axis=1, kind='stable')
+        names = np.asarray(FEATURES, dtype=object)[order].tolist()
+        values = np.take_along_axis(explained['features'], order, axis=1).tolist()
+        contributions = np.take_along_axis(explained['contributions'], order, axis=1).tolist()
+        crops = np.asarray(self.crop_catalog.names, dtype=object)[explained['ranked']].tolist()
+        suitability = explained['suitability'].tolist()
+        satisfaction = explained['satisfaction'].tolist()
+        
+        def crop(row, k):
+            return {
+                'crop': crops[row][k],
+                'suitability_score': suitability[row][k],
+                'nutrient_satisfaction': dict(zip(NUTRIENTS, satisfaction[row][k]))
+            }
+        
+        return [{
+            'top_crop': crop(row, 0),
+            'runner_up': crop(row, 1) if len(crops[row]) > 1 else None,
+            'recommendation_confidence': confidence,
+            'baseline_confidence': explained['bias'],
+            'contributions': [{'feature': name, 'value': value, 'contribution': contribution}
+                              for name, value, contribution in zip(names[row], values[row], contributions[row])]
+        } for row, confidence in enumerate(explained['recommendation_prob'].tolist())]
+    
+    def yield_forecast(self, districts=None):
+        """JSON-ready next-season yield forecasts computed at load, for all districts or the named ones.
+        
+        Names are resolved like any district input; unknown ones, and districts
+        without forecasts, come back with forecast None.
+        """
+        result = self.district_forecasts
+        if result is None:
+            return None
+        rows = {name: i for i, name in enumerate(result['districts'])}
+        if districts is None:
+            picked = [(name, rows[name]) for name in result['districts']]
+        else:
+            picked = [(name, rows.get(district_index.resolve(name), -1)) for name in districts]
+        
+        def number(array, i):
+            return None if i < 0 or np.isnan(array[i]) else float(array[i])
+        
+        forecasts = []
+        for name, i in picked:
+            forecasts.append({
+                'district': result['districts'][i] if i >= 0 else name,
+                'forecast_yield': number(result['forecast'], i),
+                'model': FORECAST_MODELS[result['model'][i]] if number(result['forecast'], i) is not None else None,
+                'three_year_mean': number(result['base'], i),
+                'last_yield': number(result['last_yield'], i),
+                'backtest_mae': number(result['backtest_mae'], i)
+            })
+        return {'crop': FORECAST_CROP, 'season': result['season'], 'forecasts': forecasts}
+    
+    @property
+    def vote_ensemble(self):
+        """The forest as a TreeEnsemble: the bundle's own, or the sklearn forest converted once"""
+        if isinstance(self.crop_recommender, TreeEnsemble):
+            return self.crop_recommender
+        if self._vote_ensemble is None or self._vote_ensemble[0] is not self.crop_recommender:
+            self._vote_ensemble = (self.crop_recommender, TreeEnsemble.from_forest(self.crop_recommender))
+        return self._vote_ensemble[1]
+    
+    def resolve_tier(self, tier=None):
+        """Tier that will serve a request: the requested one, else the deployment default.
+        
+        'fast' falls back to 'full' when no student model was loaded.
+        """
+        tier = tier or self.tier
+        if tier not in TIERS:
+            raise ValueError(f"Unknown model tier '{tier}', choose from {', '.join(TIERS)}")
+        return 'full' if tier == 'fast' and self.student is None else tier
+    
+    def soil_clusters(self, npk):
+        """Soil health cluster for each raw NPK row"""
+        if self.onnx_models is not None:
+            return self.onnx_models.soil_cluster(npk)
+        return self.soil_classifier.predict(self.soil_scaler.transform(npk))
+    
+    def use_backend(self, backend, model_dir="./", threads=None):
+        """Run the forest and MLP in-process ('numpy'/'sklearn') or on onnxruntime with the ONNX graphs in model_dir"""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', choose from {', '.join(BACKENDS)}")
+        if backend == 'onnxruntime':
+            from onnx_backend import OnnxModels
+            self.onnx_models = OnnxModels.load(model_dir, threads)
+        else:
+            self.onnx_models = None
+        self.backend = backend
+    
+    def sweep(self, soil_data, axes, location=None):
+        """Evaluate a grid over one or two input variables as a single predict_batch call.
+        
+        axes is a list of (variable, values); the other inputs come from soil_data
+        with the same defaults as get_crop_recommendations. Returns arrays shaped
+        like the grid: predicted_yield, recommendation_prob, top_crop (catalog
+        index) and suitability (grid x crops).
+        """
+        if not 1 <= len(axes) <= 2:
+            raise ValueError("A sweep needs one or two variables")
+        variables = [variable for variable, _ in axes]
+        if len(set(variables)) != len(variables):
+            raise ValueError("Sweep variables must be different")
+        for variable, values in axes:
+            if variable not in SWEEP_VARIABLES:
+                raise ValueError(f"Cannot sweep '{variable}', choose from {', '.join(SWEEP_VARIABLES)}")
+            if len(values) == 0:
+                raise ValueError(f"No values given for '{variable}'")
+        shape = tuple(len(values) for _, values in axes)
+        points = int(np.prod(shape))
+        if points > MAX_SWEEP_POINTS:
+            raise ValueError(f"Sweep grid has {points} points, the limit is {MAX_SWEEP_POINTS}")
+        
+        district = location or 'Amritsar'
+        climate = self.climate_defaults(district)
+        base = dict(INPUT_DEFAULTS, **climate)
+        base.update({key: value for key, value in soil_data.items() if key in INPUT_DEFAULTS})
+        
+        # Every grid point is one row of the same batch
+        frame = {key: np.repeat(value, points) for key, value in base.items()}
+        grids = np.meshgrid(*[np.asarray(values, dtype=float) for _, values in axes], indexing='ij')
+        for variable, grid in zip(variables, grids):
+            frame[variable] = grid.ravel()
+        frame['district'] = np.full(points, district, dtype=object)
+        
+        batch = self.predict_batch(frame)
+        return {
+            'shape': shape,
+            'base': base,
+            'predicted_yield': batch['predicted_yield'].reshape(shape),
+            'recommendation_prob': batch['recommendation_prob'].reshape(shape),
+            'top_crop': self.crop_catalog.rank(batch['suitability'], 1)[:, 0].reshape(shape),
+            'suitability': batch['suitability'].reshape(shape + (len(self.crop_catalog),))
+        }
+    
+    def climate_defaults(self, location):
+        """Rainfall and temperature to assume for a location when none were supplied"""
+        if self.climate_store is None:
+            return {'rainfall': INPUT_DEFAULTS['rainfall'], 'temperature': INPUT_DEFAULTS['temperature']}
+        climate = self.climate_store.lookup(location or '')
+        return {'rainfall': climate['rainfall'], 'temperature': climate['temperature']}
+    
+    def suitability_matrix(self, npk):
+        """Suitability of every catalog crop for each NPK row (rows x crops)"""
+        return self.crop_catalog.suitability(npk)
+    
+    def fertilizer_batch(self, npk, crops):
+        """Nutrient deficits and straight-fertilizer quantities (kg/ha) per row for each row's crop"""
+        deficits = self.crop_catalog.deficits(npk, self.crop_catalog.index_of(crops))
+        content = np.array([fraction for _, _, _, fraction in FERTILIZERS])
+        return deficits, deficits / content
+    
+    def fertilizer_plan(self, npk, crops):
+        """Deficits and least-cost multi-product fertilizer plan per row for each row's crop"""
+        deficits = self.crop_catalog.deficits(npk, self.crop_catalog.index_of(crops))
+        return deficits, self.fertilizer_planner.plan(deficits)
+    
     def get_health_recommendations(self, health_status):
         """Get recommendations based on soil health status"""
         recommendations = {
@@ -388,24 +549,79 @@ class PunjabCropPredictor:
         
         return recommendations.get(health_status, recommendations['Average'])
     
-    def save_models(self, model_dir="./"):
-        """Save trained models"""
-        print("💾 Saving models...")
-        
-        joblib.dump(self.crop_recommender, f"{model_dir}/crop_recommender.pkl")
-        joblib.dump(self.yield_predictor, f"{model_dir}/yield_predictor.pkl")
-        joblib.dump(self.soil_classifier, f"{model_dir}/soil_classifier.pkl")
-        joblib.dump(self.scaler, f"{model_dir}/scaler.pkl")
-        joblib.dump(self.soil_scaler, f"{model_dir}/soil_scaler.pkl")
-        joblib.dump(self.label_encoders, f"{model_dir}/label_encoders.pkl")
-        joblib.dump(self.soil_health_labels, f"{model_dir}/soil_health_labels.pkl")
-        
-        print("✅ All models saved successfully!")
-    
-    def load_models(self, model_dir="./"):
-        """Load trained models"""
+    def load_models(self, model_dir="./", backend=None, precision=None):
+        """Load trained models; backend defaults to ML_INFERENCE_BACKEND (numpy).
+        
+        The NumPy bundle is used unless the 'sklearn' backend is asked for or
+        the bundle is missing, in which case the pickled sklearn models are loaded.
+        precision (ML_MODEL_PRECISION, float64 by default) picks the full or
+        the compact float32 bundle; the student follows it.
+        """
         print("📂 Loading models...")
         
+        backend = backend or os.environ.get('ML_INFERENCE_BACKEND', 'numpy')
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', choose from {', '.join(BACKENDS)}")
+        precision = precision or os.environ.get('ML_MODEL_PRECISION', 'float64')
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', choose from {', '.join(PRECISIONS)}")
+        if (backend != 'sklearn' and precision == 'float32'
+                and not os.path.exists(f"{model_dir}/{BUNDLE_FILES['float32']}")):
+            print(f"⚠️ No {BUNDLE_FILES['float32']} in {model_dir}, serving float64 models")
+            precision = 'float64'
+        use_bundle = backend != 'sklearn' and os.path.exists(f"{model_dir}/{BUNDLE_FILES[precision]}")
+        if backend == 'numpy' and not use_bundle:
+            print(f"⚠️ No {BUNDLE_FILE} in {model_dir}, using the pickled sklearn models")
+            backend = 'sklearn'
+        if use_bundle:
+            for name, component in load_bundle(model_dir, precision).items():
+                setattr(self, name, component)
+        else:
+            self.load_pickles(model_dir)
+            precision = 'float64'
+        self.precision = precision
+        
+        # Catalog edits change answers, so they change the version (and cache keys) too
+        self.model_version = f"{model_fingerprint(model_dir)}-{self.crop_catalog.version}"
+        if precision != 'float64':
+            self.model_version = f"{self.model_version}-{precision}"
+        if os.path.exists(f"{model_dir}/{STORE_FILE}"):
+            self.climate_store = ClimateStore.load(model_dir)
+        
+        # Optional distilled student for the fast tier; a new student is a new version
+        if os.path.exists(f"{model_dir}/{STUDENT_FILE}"):
+            self.student = StudentModel.load(model_dir)
+            if precision == 'float32':
+                self.student = self.student.compact()
+            self.model_version = f"{self.model_version}-{self.student.version}"
+        
+        # Optional calibrated yield intervals; a new calibration is a new version
+        if os.path.exists(f"{model_dir}/{INTERVAL_FILE}"):
+            self.yield_intervals = YieldIntervals.load(model_dir)
+            self.model_version = f"{self.model_version}-{self.yield_intervals.version}"
+        # Optional district yield forecasters; every district's next season is forecast once, here
+        if os.path.exists(f"{model_dir}/{FORECAST_FILE}"):
+            self.yield_forecaster = YieldForecaster.load(model_dir)
+            self.district_forecasts = self.yield_forecaster.forecast(history_panel())
+        self.tier = os.environ.get('ML_MODEL_TIER', 'full')
+        if self.resolve_tier() != self.tier:
+            print(f"⚠️ No {STUDENT_FILE} in {model_dir}, serving the full tier")
+            self.tier = 'full'
+        
+        try:
+            self.use_backend(backend, model_dir)
+        except (ImportError, FileNotFoundError) as e:
+            fallback = 'numpy' if use_bundle else 'sklearn'
+            print(f"⚠️ {backend} backend unavailable ({e}), using {fallback}")
+            self.use_backend(fallback)
+        
+        print(f"✅ All models loaded successfully! (backend: {self.backend}, precision: {self.precision}, "
+              f"tier: {self.tier})")
+    
+    def load_pickles(self, model_dir="./"):
+        """Load the pickled sklearn models (imports sklearn through joblib)"""
+        import joblib
+        
         self.crop_recommender = joblib.load(f"{model_dir}/crop_recommender.pkl")
         self.yield_predictor = joblib.load(f"{model_dir}/yield_predictor.pkl")
         self.soil_classifier = joblib.load(f"{model_dir}/soil_classifier.pkl")
@@ -413,8 +629,6 @@ class PunjabCropPredictor:
         self.soil_scaler = joblib.load(f"{model_dir}/soil_scaler.pkl")
         self.label_encoders = joblib.load(f"{model_dir}/label_encoders.pkl")
         self.soil_health_labels = joblib.load(f"{model_dir}/soil_health_labels.pkl")
-        
-        print("✅ All models loaded successfully!")
 
 if __name__ == "__main__":
     # This will be run by model_training.py
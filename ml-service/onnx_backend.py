@@ -0,0 +1,127 @@
+"""
+ONNX export of the serving models and an onnxruntime CPU inference backend.
+
+export_onnx converts the three serving pipelines into ONNX graphs under
+<model_dir>/onnx/, each taking raw (unscaled) float64 inputs:
+
+    crop_recommender.onnx   scaler -> float32 cast -> random forest, class probabilities
+    yield_predictor.onnx    scaler -> MLP, predicted yield
+    soil_classifier.onnx    soil_scaler -> KMeans, cluster label
+
+The cast in front of the forest mirrors sklearn, whose trees compare float32
+features against the split thresholds, so probabilities agree with sklearn to
+float32 rounding instead of flipping rows that sit on a threshold.
+
+OnnxModels evaluates the graphs with onnxruntime's CPU provider and a
+configurable number of intra-op threads (ML_ORT_THREADS). skl2onnx is only
+needed to export and onnxruntime only to serve with this backend; both are
+imported when used.
+
+    python -m onnx_backend --model-dir ./model    # export already trained models
+"""
+
+import os
+import numpy as np
+
+ONNX_DIR = 'onnx'
+ONNX_FILES = {
+    'crop_recommender': 'crop_recommender.onnx',
+    'yield_predictor': 'yield_predictor.onnx',
+    'soil_classifier': 'soil_classifier.onnx'
+}
+TARGET_OPSET = {'': 15, 'ai.onnx.ml': 3}
+
+
+def export_onnx(predictor, model_dir="./"):
+    """Write ONNX graphs of the predictor's serving pipelines to <model_dir>/onnx; returns their paths"""
+    from sklearn.pipeline import Pipeline
+    from skl2onnx import convert_sklearn
+    from skl2onnx.sklapi import CastTransformer
+    from skl2onnx.common.data_types import DoubleTensorType
+
+    print("📦 Exporting ONNX models...")
+    features = predictor.scaler.n_features_in_
+    cast = CastTransformer(dtype=np.float32).fit(np.zeros((1, features)))
+    pipelines = {
+        'crop_recommender': (
+            Pipeline([('scaler', predictor.scaler), ('cast', cast), ('forest', predictor.crop_recommender)]),
+            features, {id(predictor.crop_recommender): {'zipmap': False}}
+        ),
+        'yield_predictor': (
+            Pipeline([('scaler', predictor.scaler), ('mlp', predictor.yield_predictor)]), features, None
+        ),
+        'soil_classifier': (
+            Pipeline([('scaler', predictor.soil_scaler), ('kmeans', predictor.soil_classifier)]),
+            predictor.soil_scaler.n_features_in_, None
+        )
+    }
+
+    os.makedirs(os.path.join(model_dir, ONNX_DIR), exist_ok=True)
+    paths = {}
+    for name, (pipeline, width, options) in pipelines.items():
+        graph = convert_sklearn(pipeline, initial_types=[('input', DoubleTensorType([None, width]))],
+                                options=options, target_opset=TARGET_OPSET)
+        paths[name] = os.path.join(model_dir, ONNX_DIR, ONNX_FILES[name])
+        with open(paths[name], 'wb') as f:
+            f.write(graph.SerializeToString())
+
+    print(f"✅ ONNX models saved to {os.path.join(model_dir, ONNX_DIR)}/")
+    return paths
+
+
+class OnnxModels:
+    """onnxruntime sessions for the exported serving pipelines"""
+
+    def __init__(self, sessions, threads=1):
+        self.sessions = sessions
+        self.threads = threads
+        self._inputs = {name: session.get_inputs()[0].name for name, session in sessions.items()}
+
+    @classmethod
+    def load(cls, model_dir="./", threads=None):
+        import onnxruntime as ort
+
+        threads = int(threads if threads is not None else os.environ.get('ML_ORT_THREADS', '1'))
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        sessions = {}
+        for name, filename in ONNX_FILES.items():
+            path = os.path.join(model_dir, ONNX_DIR, filename)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} not found, export with: python -m onnx_backend --model-dir {model_dir}")
+            sessions[name] = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        return cls(sessions, threads)
+
+    def _run(self, name, values, output):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        return self.sessions[name].run([output], {self._inputs[name]: values})[0]
+
+    def recommendation_prob(self, features):
+        """Probability of the 'recommended' class for raw FEATURES rows"""
+        return self._run('crop_recommender', features, 'probabilities')[:, 1].astype(np.float64)
+
+    def predicted_yield(self, features):
+        return self._run('yield_predictor', features, 'variable').ravel()
+
+    def soil_cluster(self, npk):
+        return self._run('soil_classifier', npk, 'label').ravel()
+
+
+def main(argv=None):
+    import argparse
+    from models import PunjabCropPredictor
+
+    parser = argparse.ArgumentParser(description='Export the trained Punjab models to ONNX')
+    parser.add_argument('--model-dir', default='./model')
+    args = parser.parse_args(argv)
+
+    predictor = PunjabCropPredictor()
+    predictor.load_models(args.model_dir, backend='sklearn')
+    export_onnx(predictor, args.model_dir)
+
+
+if __name__ == '__main__':
+    main()
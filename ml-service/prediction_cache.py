@@ -0,0 +1,272 @@
+"""
+Shared on-disk cache tier for PunjabCropPredictor results.
+
+Entries live in a SQLite database in WAL mode, so every worker process on a
+node reads and fills the same store and the cache survives restarts. Keys are
+built from the normalized inputs that an operation actually depends on plus
+the model version (a content hash of the model artifacts), so a deploy that
+keeps the same models keeps its cache while a retrained model never sees stale
+answers.
+
+Warm the cache from a file of common soil-card inputs with:
+
+    python -m prediction_cache --db ./cache/predictions.db --input common_inputs.csv
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Input fields each cached operation depends on
+OPERATION_FIELDS = {
+    'crop_recommendations': ('nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature', 'soil_type', 'location', 'top_k', 'tier'),
+    'soil_health': ('nitrogen', 'phosphorus', 'potassium'),
+    'fertilizer_recommendations': ('nitrogen', 'phosphorus', 'potassium', 'crop'),
+    'explanation': ('nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature', 'soil_type', 'location')
+}
+
+# Opt-in request flags that change a result; they join the key only when set, so plain keys stay unchanged
+OPERATION_FLAGS = {
+    'crop_recommendations': ('uncertainty',)
+}
+
+
+def normalize_params(operation, params, precision=2):
+    """Canonical (field, value) pairs for an operation's inputs"""
+    normalized = []
+    for field in OPERATION_FIELDS[operation]:
+        value = params.get(field)
+        if isinstance(value, str):
+            value = ' '.join(value.strip().lower().split())
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = round(float(value), precision)
+        normalized.append((field, value))
+    normalized.extend((flag, True) for flag in OPERATION_FLAGS.get(operation, ()) if params.get(flag))
+    return normalized
+
+
+def prediction_key(operation, params, model_version=None, precision=2):
+    """Stable key for an operation on normalized inputs under a model version"""
+    payload = json.dumps(
+        [model_version or 'unversioned', operation, normalize_params(operation, params, precision)],
+        separators=(',', ':')
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class PredictionCache:
+    """Bounded SQLite-backed cache shared by all worker processes on a node"""
+
+    def __init__(self, path, model_version, max_entries=100_000, precision=2, access_resolution=60):
+        self.path = path
+        self.model_version = model_version or 'unversioned'
+        self.max_entries = int(max_entries)
+        self.precision = int(precision)
+        self.access_resolution = access_resolution
+        self._local = threading.local()
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS predictions (
+                    key TEXT PRIMARY KEY,
+                    operation TEXT NOT NULL,
+                    model_version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_access ON predictions(last_access)")
+            # Entries from other model versions can never be hit again
+            conn.execute("DELETE FROM predictions WHERE model_version != ?", (self.model_version,))
+
+    @classmethod
+    def from_env(cls, model_version):
+        """Build the cache from ML_PREDICTION_CACHE* variables (None when unset)"""
+        path = os.environ.get('ML_PREDICTION_CACHE')
+        if not path:
+            return None
+        return cls(
+            path, model_version,
+            max_entries=os.environ.get('ML_PREDICTION_CACHE_MAX_ENTRIES', 100_000)
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def make_key(self, operation, params):
+        return prediction_key(operation, params, self.model_version, self.precision)
+
+    def get(self, operation, params):
+        """Cached result for the inputs, or None"""
+        key = self.make_key(operation, params)
+        conn = self._connection()
+        row = conn.execute("SELECT value, last_access FROM predictions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        if now - row[1] > self.access_resolution:
+            # Coarse LRU bookkeeping keeps hot reads from turning into writes
+            try:
+                conn.execute("UPDATE predictions SET last_access = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError:
+                pass
+        return json.loads(row[0])
+
+    def put(self, operation, params, value):
+        self.put_many([(operation, params, value)])
+
+    def put_many(self, items):
+        """Insert (operation, params, value) items in a single transaction"""
+        now = time.time()
+        rows = [
+            (self.make_key(operation, params), operation, self.model_version, json.dumps(value), now, now)
+            for operation, params, value in items
+        ]
+        if not rows:
+            return
+
+        conn = self._connection()
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Prediction cache write skipped: {e}")
+            return
+
+        with self._lock:
+            self._puts += len(rows)
+            check = self._puts >= max(1, self.max_entries // 100)
+            if check:
+                self._puts = 0
+        if check:
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries beyond max_entries (plus 10% headroom)"""
+        conn = self._connection()
+        count = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        if count <= self.max_entries:
+            return 0
+
+        excess = count - int(self.max_entries * 0.9)
+        try:
+            with conn:
+                conn.execute(
+                    "DELETE FROM predictions WHERE key IN "
+                    "(SELECT key FROM predictions ORDER BY last_access LIMIT ?)", (excess,)
+                )
+        except sqlite3.OperationalError:
+            return 0
+        return excess
+
+    def stats(self):
+        conn = self._connection()
+        count = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        return {'path': self.path, 'entries': count, 'max_entries': self.max_entries,
+                'model_version': self.model_version}
+
+    def warm(self, predictor, records, batch_size=500):
+        """Compute and store results for records not already cached.
+
+        Returns (computed, skipped) counts; records the predictor rejects are skipped.
+        """
+        pending = []
+        computed = skipped = 0
+        # Keyed like the endpoint: the deployment's default tier, no top_k, district climate defaults
+        tier = predictor.resolve_tier(None)
+
+        for record in records:
+            location = record.get('location') or record.get('district') or 'Unknown'
+            climate = predictor.climate_defaults(location)
+            soil_data = {
+                'nitrogen': float(record.get('nitrogen', 150)),
+                'phosphorus': float(record.get('phosphorus', 40)),
+                'potassium': float(record.get('potassium', 100)),
+                'rainfall': float(record.get('rainfall', climate['rainfall'])),
+                'temperature': float(record.get('temperature', climate['temperature'])),
+                'soil_type': record.get('soil_type') or 'loamy'
+            }
+            params = dict(soil_data, location=location)
+            recommendation_params = dict(params, top_k=None, tier=tier)
+
+            if self.get('crop_recommendations', recommendation_params) is None:
+                try:
+                    recommendations = predictor.get_crop_recommendations(soil_data, location, tier=tier)
+                    top_crop = recommendations[0]['crop'] if recommendations else 'wheat'
+                    fertilizer_recs = predictor.get_fertilizer_recommendations(soil_data, top_crop)
+                    soil_health = predictor.analyze_soil_health(soil_data)
+                except ValueError:
+                    # e.g. a district the encoders have never seen
+                    skipped += 1
+                    continue
+                pending.append(('crop_recommendations', recommendation_params, recommendations))
+                pending.append(('fertilizer_recommendations', dict(params, crop=top_crop), fertilizer_recs))
+                pending.append(('soil_health', params, soil_health))
+                computed += 1
+
+            if len(pending) >= batch_size:
+                self.put_many(pending)
+                pending = []
+
+        self.put_many(pending)
+        self.evict()
+        return computed, skipped
+
+
+def read_records(path):
+    """Read warm-up inputs from a CSV or NDJSON file"""
+    if path.endswith('.json') or path.endswith('.ndjson') or path.endswith('.jsonl'):
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    import csv
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def main(argv=None):
+    import argparse
+    import contextlib
+    import io
+    from models import PunjabCropPredictor
+
+    parser = argparse.ArgumentParser(description='Warm the shared prediction cache')
+    parser.add_argument('--db', default=os.environ.get('ML_PREDICTION_CACHE', './cache/predictions.db'))
+    parser.add_argument('--input', required=True, help='CSV or NDJSON of soil-card inputs')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--max-entries', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    predictor = PunjabCropPredictor()
+    predictor.load_models(args.model_dir)
+    cache = PredictionCache(args.db, predictor.model_version, max_entries=args.max_entries)
+
+    records = read_records(args.input)
+    print(f"🔥 Warming prediction cache with {len(records)} inputs...")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        computed, skipped = cache.warm(predictor, records)
+    print(f"✅ Computed {computed} new entries in {time.perf_counter() - start:.1f}s "
+          f"({skipped} skipped, {cache.stats()['entries']} cached)")
+
+
+if __name__ == '__main__':
+    main()
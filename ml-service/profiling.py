@@ -0,0 +1,117 @@
+import os
+import hmac
+import time
+import random
+import itertools
+import threading
+import cProfile
+from flask import request, g
+
+
+class RequestProfiler:
+    """Opt-in per-request cProfile capture for the Flask service.
+
+    A request is profiled when the caller sends X-Profile-Token matching
+    ML_PROFILE_TOKEN, or when it is sampled (ML_PROFILE_SAMPLE_RATE, a share
+    of requests like 0.01, or N >= 1 for 1 in N). Traces are written as .prof
+    files (pstats format, loadable by snakeviz) into ML_PROFILE_DIR and the
+    oldest are removed beyond ML_PROFILE_MAX_FILES.
+
+    With neither a token nor a sample rate no request hooks are registered,
+    so a disabled profiler costs nothing per request.
+    """
+
+    HEADER = 'X-Profile-Token'
+
+    def __init__(self, token=None, sample_rate=0, output_dir='./profiles', max_files=100):
+        self.token = token
+        self.sample_rate = self.parse_sample_rate(sample_rate)
+        self.output_dir = output_dir
+        self.max_files = int(max_files)
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls):
+        """Build a profiler from ML_PROFILE_* environment variables"""
+        return cls(
+            token=os.environ.get('ML_PROFILE_TOKEN') or None,
+            sample_rate=os.environ.get('ML_PROFILE_SAMPLE_RATE', 0),
+            output_dir=os.environ.get('ML_PROFILE_DIR', './profiles'),
+            max_files=os.environ.get('ML_PROFILE_MAX_FILES', 100)
+        )
+
+    @staticmethod
+    def parse_sample_rate(value):
+        """Share of requests to profile: a fraction as given, N >= 1 as 1 in N, anything else 0"""
+        try:
+            rate = float(value or 0)
+        except (TypeError, ValueError):
+            rate = -1.0
+        if not 0 <= rate < float('inf'):
+            print(f"⚠️ Invalid ML_PROFILE_SAMPLE_RATE {value!r}, request sampling disabled")
+            return 0.0
+        return 1 / rate if rate > 1 else rate
+
+    @property
+    def enabled(self):
+        return bool(self.token) or self.sample_rate > 0
+
+    def init_app(self, app):
+        """Register request hooks on the app if profiling is enabled"""
+        if not self.enabled:
+            return False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+        print(f"🔬 Request profiling enabled (sample rate {self.sample_rate:g}, dir {self.output_dir})")
+        return True
+
+    def _should_profile(self):
+        supplied = request.headers.get(self.HEADER)
+        # Constant-time comparison, so response timing does not leak the token
+        if self.token and supplied is not None and hmac.compare_digest(supplied.encode(), self.token.encode()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _start(self):
+        if not self._should_profile():
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this interpreter
+            return
+        g.request_profiler = profiler
+        g.request_profile_start = time.perf_counter()
+
+    def _stop(self, exc=None):
+        profiler = g.pop('request_profiler', None)
+        if profiler is None:
+            return
+
+        profiler.disable()
+        elapsed_ms = (time.perf_counter() - g.pop('request_profile_start')) * 1000
+        endpoint = (request.endpoint or 'unknown').replace('.', '_')
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint}-{elapsed_ms:.0f}ms-{os.getpid()}-{next(self._sequence)}.prof"
+
+        try:
+            profiler.dump_stats(os.path.join(self.output_dir, filename))
+            self._rotate()
+        except OSError as e:
+            print(f"⚠️ Could not write request profile: {e}")
+
+    def _rotate(self):
+        with self._lock:
+            traces = sorted(
+                (entry for entry in os.scandir(self.output_dir) if entry.name.endswith('.prof')),
+                key=lambda entry: (entry.stat().st_mtime_ns, entry.name)
+            )
+            for entry in traces[:max(0, len(traces) - self.max_files)]:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
@@ -0,0 +1,247 @@
+"""
+Shadow scoring of a candidate model on sampled live traffic.
+
+Set ML_SHADOW_MODEL_DIR to a retrained model directory (train_models.py
+--model-dir ./model-candidate) and a share of /predict/crop-recommendation
+requests (ML_SHADOW_SAMPLE_RATE) is scored again by the candidate, off the
+request path:
+
+- the request thread only samples, then puts the inputs and the primary's
+  answer on a bounded queue with put_nowait; when the queue is full the work
+  is dropped and counted, so a request never waits on the shadow;
+- background worker threads take whatever is queued (up to SHADOW_BATCH
+  items) and score it with one candidate predict_batch call per tier;
+- every comparison updates running totals: crop ranking changes, top crop
+  changes, flips of the 'recommended' flag, confidence and yield deltas,
+  and soil health changes (the cluster's health label: KMeans ids are
+  arbitrary per fit, so a retrained model's raw ids are not comparable);
+- comparisons beyond the tolerances are kept as disagreements in a bounded
+  deque (oldest dropped first).
+
+GET /shadow returns the summary and the latest disagreements; counters are
+also exported on /metrics. Workers run in the same process, so on a
+saturated single core they compete with requests for the interpreter; keep
+the sample rate low there (see benchmarks/check_shadow.py).
+"""
+
+import os
+import queue
+import random
+import threading
+from collections import deque
+from datetime import datetime
+from metrics import metrics
+
+# Queued items one worker scores together
+SHADOW_BATCH = 64
+
+
+class ShadowScorer:
+    """Bounded, sampled, asynchronous comparison of a candidate predictor with the live one"""
+
+    def __init__(self, candidate, sample_rate=0.05, workers=1, queue_size=256, store_size=1000,
+                 yield_tolerance=0.05, confidence_tolerance=0.1):
+        self.candidate = candidate
+        self.sample_rate = float(sample_rate)
+        self.workers = max(1, int(workers))
+        self.yield_tolerance = float(yield_tolerance)
+        self.confidence_tolerance = float(confidence_tolerance)
+        self.disagreements = deque(maxlen=int(store_size))
+
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._threads = []
+        self._totals = dict.fromkeys([
+            'sampled', 'dropped', 'errors', 'compared', 'disagreements', 'rank_changes', 'top_crop_changes',
+            'recommended_flips', 'soil_health_changes', 'yield_delta', 'yield_abs_delta', 'confidence_abs_delta'
+        ], 0)
+        self._totals.update(max_yield_relative_delta=0.0, max_confidence_delta=0.0)
+
+    @classmethod
+    def from_env(cls):
+        """Scorer for the candidate in ML_SHADOW_MODEL_DIR (None when unset or not loadable)"""
+        model_dir = os.environ.get('ML_SHADOW_MODEL_DIR')
+        if not model_dir:
+            return None
+        from models import PunjabCropPredictor
+
+        try:
+            candidate = PunjabCropPredictor()
+            candidate.load_models(model_dir)
+        except Exception as e:
+            print(f"⚠️ Shadow candidate in {model_dir} could not be loaded ({e}), shadow scoring disabled")
+            return None
+        return cls(
+            candidate,
+            sample_rate=os.environ.get('ML_SHADOW_SAMPLE_RATE', 0.05),
+            workers=os.environ.get('ML_SHADOW_WORKERS', 1),
+            queue_size=os.environ.get('ML_SHADOW_QUEUE_SIZE', 256),
+            store_size=os.environ.get('ML_SHADOW_STORE_SIZE', 1000),
+            yield_tolerance=os.environ.get('ML_SHADOW_YIELD_TOLERANCE', 0.05),
+            confidence_tolerance=os.environ.get('ML_SHADOW_CONFIDENCE_TOLERANCE', 0.1)
+        )
+
+    def start(self):
+        """Start the daemon worker threads"""
+        for _ in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._work, name=f'shadow-{len(self._threads)}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, inputs, tier, recommendations, soil_health):
+        """Queue a sampled request for the candidate; never blocks, returns whether it was queued.
+
+        inputs are the processed soil/weather fields plus district (a
+        predict_batch row), tier the tier that served it, and
+        recommendations/soil_health the primary's answer.
+        """
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((inputs, tier, recommendations, soil_health))
+        except queue.Full:
+            self._add({'dropped': 1})
+            metrics.inc('shadow_dropped_total')
+            return False
+        self._add({'sampled': 1})
+        metrics.inc('shadow_sampled_total')
+        return True
+
+    def _work(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < SHADOW_BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.record(self.compare(items))
+            except Exception as e:
+                self._add({'errors': len(items)})
+                metrics.inc('shadow_errors_total', len(items))
+                print(f"⚠️ Shadow scoring failed: {e}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+            metrics.set('shadow_queue_depth', self._queue.qsize())
+
+    def drain(self):
+        """Wait until everything queued so far has been compared"""
+        self._queue.join()
+
+    def compare(self, items):
+        """Candidate answers for queued items, scored per tier in one batch, compared with the primary's"""
+        comparisons = [None] * len(items)
+        catalog = self.candidate.crop_catalog
+        for tier in {tier for _, tier, _, _ in items}:
+            picked = [i for i, item in enumerate(items) if item[1] == tier]
+            columns = {name: [items[i][0][name] for i in picked] for name in items[picked[0]][0]}
+            batch = self.candidate.predict_batch(columns, tier)
+            ranked = catalog.rank(batch['suitability'])
+            for row, i in enumerate(picked):
+                inputs, _, recommendations, soil_health = items[i]
+                crops = [catalog.names[j] for j in ranked[row, :len(recommendations)]]
+                suitability = batch['suitability'][row, ranked[row, :len(recommendations)]]
+                confidence = float(batch['recommendation_prob'][row])
+                recommended = [bool(score >= 0.7 and confidence >= 0.5) for score in suitability]
+                predicted_yield = float(batch['predicted_yield'][row])
+                primary_yield = recommendations[0]['predicted_yield'] if recommendations else predicted_yield
+                primary_confidence = recommendations[0]['recommendation_confidence'] if recommendations else confidence
+                soil_status = self.candidate.soil_health_labels[int(batch['soil_cluster'][row])]
+                comparisons[i] = {
+                    'inputs': inputs,
+                    'tier': tier,
+                    'primary_ranking': [rec['crop'] for rec in recommendations],
+                    'candidate_ranking': crops,
+                    'recommended_flips': sum(rec['recommended'] != flag
+                                             for rec, flag in zip(recommendations, recommended)),
+                    'primary_yield': primary_yield,
+                    'candidate_yield': predicted_yield,
+                    'primary_confidence': primary_confidence,
+                    'candidate_confidence': confidence,
+                    'primary_soil_health': soil_health.get('health_status'),
+                    'candidate_soil_health': soil_status
+                }
+        return comparisons
+
+    def record(self, comparisons):
+        """Add comparisons to the totals and keep those beyond tolerance as disagreements"""
+        totals = dict.fromkeys(['compared', 'disagreements', 'rank_changes', 'top_crop_changes',
+                                'recommended_flips', 'soil_health_changes', 'yield_delta', 'yield_abs_delta',
+                                'confidence_abs_delta'], 0)
+        largest_yield = largest_confidence = 0.0
+        kept = []
+        for comparison in comparisons:
+            yield_delta = comparison['candidate_yield'] - comparison['primary_yield']
+            relative = abs(yield_delta) / max(abs(comparison['primary_yield']), 1.0)
+            confidence_delta = abs(comparison['candidate_confidence'] - comparison['primary_confidence'])
+            rank_changed = comparison['candidate_ranking'] != comparison['primary_ranking']
+            top_changed = comparison['candidate_ranking'][:1] != comparison['primary_ranking'][:1]
+            soil_health_changed = comparison['candidate_soil_health'] != comparison['primary_soil_health']
+            disagrees = (rank_changed or soil_health_changed or comparison['recommended_flips'] > 0
+                         or relative > self.yield_tolerance or confidence_delta > self.confidence_tolerance)
+
+            totals['compared'] += 1
+            totals['disagreements'] += disagrees
+            totals['rank_changes'] += rank_changed
+            totals['top_crop_changes'] += top_changed
+            totals['recommended_flips'] += comparison['recommended_flips']
+            totals['soil_health_changes'] += soil_health_changed
+            totals['yield_delta'] += yield_delta
+            totals['yield_abs_delta'] += abs(yield_delta)
+            totals['confidence_abs_delta'] += confidence_delta
+            largest_yield = max(largest_yield, relative)
+            largest_confidence = max(largest_confidence, confidence_delta)
+            if disagrees:
+                kept.append(dict(comparison, yield_delta=yield_delta, yield_relative_delta=relative,
+                                 confidence_delta=confidence_delta, rank_changed=rank_changed,
+                                 soil_health_changed=soil_health_changed, timestamp=datetime.now().isoformat()))
+
+        self._add(totals, largest_yield, largest_confidence)
+        with self._lock:
+            self.disagreements.extend(kept)
+        metrics.inc('shadow_compared_total', totals['compared'])
+        for kind in ('rank_changes', 'top_crop_changes', 'recommended_flips', 'soil_health_changes'):
+            metrics.inc('shadow_disagreements_total', totals[kind], kind=kind)
+        metrics.observe('shadow_batch_size', float(len(comparisons)))
+
+    def _add(self, counts, largest_yield=0.0, largest_confidence=0.0):
+        with self._lock:
+            for name, value in counts.items():
+                self._totals[name] += value
+            self._totals['max_yield_relative_delta'] = max(self._totals['max_yield_relative_delta'], largest_yield)
+            self._totals['max_confidence_delta'] = max(self._totals['max_confidence_delta'], largest_confidence)
+
+    def summary(self):
+        """Counts and rates over every comparison since start"""
+        with self._lock:
+            totals = dict(self._totals)
+            stored = len(self.disagreements)
+        compared = max(totals['compared'], 1)
+        return {
+            'sample_rate': self.sample_rate,
+            'sampled': totals['sampled'],
+            'dropped': totals['dropped'],
+            'errors': totals['errors'],
+            'queued': self._queue.qsize(),
+            'compared': totals['compared'],
+            'disagreement_rate': totals['disagreements'] / compared,
+            'rank_change_rate': totals['rank_changes'] / compared,
+            'top_crop_change_rate': totals['top_crop_changes'] / compared,
+            'recommended_flips_per_request': totals['recommended_flips'] / compared,
+            'soil_health_change_rate': totals['soil_health_changes'] / compared,
+            'mean_yield_delta': totals['yield_delta'] / compared,
+            'mean_abs_yield_delta': totals['yield_abs_delta'] / compared,
+            'max_yield_relative_delta': totals['max_yield_relative_delta'],
+            'mean_abs_confidence_delta': totals['confidence_abs_delta'] / compared,
+            'max_confidence_delta': totals['max_confidence_delta'],
+            'disagreements_stored': stored
+        }
+
+    def recent(self, limit=50):
+        """The latest stored disagreements, newest first"""
+        with self._lock:
+            latest = list(self.disagreements)[-limit:] if limit > 0 else []
+        return [dict(item, inputs=dict(item['inputs'])) for item in reversed(latest)]
@@ -0,0 +1,117 @@
+"""
+Streaming soil-health clustering for statewide soil-card volumes.
+
+The in-memory trainer fits KMeans(n_init=10) on the full NPK matrix. For
+soil cards that do not fit in memory, fit_streaming reads NPK chunks from
+disk twice and fits a MiniBatchKMeans instead:
+
+1. the first pass fits the soil scaler incrementally
+   (StandardScaler.partial_fit) and keeps a uniform random sample of rows;
+2. initialization runs n_init k-means++ starts, each a short full KMeans on
+   that sample, in parallel threads, and keeps the centres with the lowest
+   sample inertia;
+3. the second pass feeds every scaled chunk to MiniBatchKMeans.partial_fit,
+   starting from those centres.
+
+Memory is bounded by the chunk size and the sample, not the number of soil
+cards. Sources are soil-card CSVs with nitrogen, phosphorus and potassium
+columns, or .npy arrays of NPK rows (memory-mapped).
+"""
+
+import os
+import numpy as np
+
+NPK_COLUMNS = ['nitrogen', 'phosphorus', 'potassium']
+SOIL_CLUSTERS = 5
+CHUNK_ROWS = 1_000_000
+MINIBATCH_SIZE = 65_536
+INIT_SAMPLE_ROWS = 200_000
+
+
+def iter_npk_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Raw NPK rows (float64, n x 3) read from a soil-card CSV or an .npy file, chunk by chunk"""
+    if path.endswith('.npy'):
+        npk = np.load(path, mmap_mode='r')
+        for start in range(0, len(npk), chunk_rows):
+            yield np.asarray(npk[start:start + chunk_rows], dtype=np.float64)
+        return
+
+    import pandas as pd
+    for chunk in pd.read_csv(path, usecols=NPK_COLUMNS, chunksize=chunk_rows):
+        yield chunk[NPK_COLUMNS].to_numpy(dtype=np.float64)
+
+
+def iter_array_chunks(npk, chunk_rows=CHUNK_ROWS):
+    """Chunks of an in-memory NPK array, for streaming fits of data already loaded"""
+    for start in range(0, len(npk), chunk_rows):
+        yield npk[start:start + chunk_rows]
+
+
+def _sample_init(sample, n_clusters, seed):
+    from sklearn.cluster import KMeans
+
+    model = KMeans(n_clusters=n_clusters, init='k-means++', n_init=1, max_iter=100, random_state=seed).fit(sample)
+    return model.inertia_, model.cluster_centers_
+
+
+def initial_centers(sample, n_clusters=SOIL_CLUSTERS, n_init=10, workers=None, seed=42):
+    """Best of n_init k-means++ starts on a scaled sample, run in parallel threads"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    seeds = np.random.SeedSequence(seed).generate_state(n_init)
+    workers = max(1, min(n_init, workers or os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda s: _sample_init(sample, n_clusters, int(s)), seeds))
+    return min(results, key=lambda result: result[0])[1]
+
+
+def fit_streaming(chunks, n_clusters=SOIL_CLUSTERS, n_init=10, workers=None, batch_size=MINIBATCH_SIZE,
+                  sample_rows=INIT_SAMPLE_ROWS, seed=42):
+    """Fit (soil scaler, MiniBatchKMeans) from NPK chunks; chunks() must return a fresh iterator per pass"""
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+
+    # Pass 1: scaler statistics and a uniform sample (rows with the smallest random keys)
+    rng = np.random.default_rng(seed)
+    scaler = StandardScaler()
+    keys, sample = np.empty(0), np.empty((0, len(NPK_COLUMNS)))
+    for chunk in chunks():
+        scaler.partial_fit(chunk)
+        keys = np.concatenate([keys, rng.random(len(chunk))])
+        sample = np.concatenate([sample, chunk])
+        if len(keys) > sample_rows:
+            keep = np.argpartition(keys, sample_rows)[:sample_rows]
+            keys, sample = keys[keep], sample[keep]
+
+    centers = initial_centers(scaler.transform(sample), n_clusters, n_init, workers, seed)
+
+    # Pass 2: mini-batch updates over every chunk
+    model = MiniBatchKMeans(n_clusters=n_clusters, init=centers, n_init=1, batch_size=batch_size,
+                            random_state=seed)
+    for chunk in chunks():
+        scaled = scaler.transform(chunk)
+        for start in range(0, len(scaled), batch_size):
+            model.partial_fit(scaled[start:start + batch_size])
+    return scaler, model
+
+
+def assign_chunks(scaler, centers, chunks):
+    """Cluster labels and the total squared distance (inertia) of every row, chunk by chunk"""
+    labels, inertia = [], 0.0
+    for chunk in chunks:
+        scaled = scaler.transform(chunk)
+        distances = ((scaled[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        nearest = distances.argmin(axis=1)
+        inertia += distances[np.arange(len(nearest)), nearest].sum()
+        labels.append(nearest.astype(np.int8))
+    return np.concatenate(labels), float(inertia)
+
+
+def label_agreement(labels_a, labels_b, n_clusters=SOIL_CLUSTERS):
+    """Share of rows with the same cluster once b's cluster ids are matched to a's"""
+    from scipy.optimize import linear_sum_assignment
+
+    counts = np.bincount(labels_a.astype(np.int64) * n_clusters + labels_b, minlength=n_clusters ** 2)
+    counts = counts.reshape(n_clusters, n_clusters)
+    rows, cols = linear_sum_assignment(-counts)
+    return float(counts[rows, cols].sum() / max(1, len(labels_a)))
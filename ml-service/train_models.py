@@ -2,13 +2,23 @@
 import os
 import pandas as pd
 import numpy as np
-from models import PunjabCropPredictor
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import confusion_matrix
+from crop_trainer import PunjabCropTrainer
+from models import FEATURES
+from evaluation import evaluate_models
+from training_data import TrainingData
+from climate_store import ClimateStore
+from districts import PUNJAB_DISTRICTS
+from crop_catalog import default_catalog
+from onnx_backend import export_onnx
+from distillation import distill, print_report, DISTILL_SAMPLES
+from yield_forecast import YieldForecaster, YieldPanel, print_forecast_report
 import warnings
 warnings.filterwarnings('ignore')
 
+# Historical per-district yield and climate data, and per-district crop areas
+YIELD_DATA_FILE = '../Punjab_Data.csv'
+AREA_DATA_FILE = '../bajra-wheat.csv'
+
 def load_training_data(data_file='training_data.csv'):
     """Load the preprocessed training data"""
     print("📂 Loading training data...")
@@ -17,269 +27,204 @@ def load_training_data(data_file='training_data.csv'):
         print(f"⚠️ Training data file {data_file} not found!")
         # Generate synthetic data for testing
         print("🔄 Generating synthetic training data...")
-        return generate_synthetic_data()
+        return generate_synthetic_data(output_file='synthetic_training_data.csv')
     
     data = pd.read_csv(data_file)
     print(f"✅ Loaded {len(data)} training samples")
     
     return data
 
-def generate_synthetic_data(samples=1000):
-    """Generate synthetic data for model training if real data is unavailable"""
-    print("🧪 Generating synthetic training data...")
-    
-    np.random.seed(42)
-    
-    # Districts in Punjab
-    districts = [
-        'Amritsar', 'Barnala', 'Bathinda', 'Faridkot', 'Fatehgarh Sahib',
-        'Fazilka', 'Ferozepur', 'Gurdaspur', 'Hoshiarpur', 'Jalandhar',
-        'Kapurthala', 'Ludhiana', 'Mansa', 'Moga', 'Muktsar', 'Pathankot',
-        'Patiala', 'Rupnagar', 'SAS Nagar', 'Sangrur', 'Shahid Bhagat Singh Nagar',
-        'Tarn Taran'
-    ]
-    
-    # Soil types
-    soil_types = ['loamy', 'clayey', 'sandy', 'black', 'red', 'alluvial']
-    
-    # Crops
-    crops = ['rice', 'wheat', 'potato', 'bajra']
-    
-    # Define ranges for features
-    feature_ranges = {
-        'nitrogen': (50, 250),
-        'phosphorus': (20, 150),
-        'potassium': (30, 200),
-        'rainfall': (500, 1500),
-        'temperature': (20, 35),
-        'suitability_score': (0.1, 1.0),
-        'expected_yield': (1000, 5000)
-    }
-    
-    # NPK requirements for different crops
-    crop_requirements = {
-        'rice': {'nitrogen': 135, 'phosphorus': 70, 'potassium': 50},
-        'wheat': {'nitrogen': 135, 'phosphorus': 70, 'potassium': 50},
-        'potato': {'nitrogen': 175, 'phosphorus': 100, 'potassium': 175},
-        'bajra': {'nitrogen': 60, 'phosphorus': 30, 'potassium': 30}
+# Soil types
+SOIL_TYPES = ['loamy', 'clayey', 'sandy', 'black', 'red', 'alluvial']
+
+# Crops and their NPK requirements come from the crop catalog
+CROP_CATALOG = default_catalog()
+
+# Define ranges for features
+FEATURE_RANGES = {
+    'nitrogen': (50, 250),
+    'phosphorus': (20, 150),
+    'potassium': (30, 200),
+    'rainfall': (500, 1500),
+    'temperature': (20, 35),
+    'suitability_score': (0.1, 1.0),
+    'expected_yield': (1000, 5000)
+}
+
+def synthetic_chunk(rng, rows):
+    """Generate one chunk of synthetic samples, a whole column at a time"""
+    if not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+
+    # Select random crop, district, soil type
+    crop_idx = rng.integers(0, len(CROP_CATALOG), rows)
+    district_idx = rng.integers(0, len(PUNJAB_DISTRICTS), rows)
+    soil_idx = rng.integers(0, len(SOIL_TYPES), rows)
+
+    # Generate NPK and climate features
+    columns = {
+        name: rng.uniform(FEATURE_RANGES[name][0], FEATURE_RANGES[name][1], rows)
+        for name in ('nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature')
     }
-    
-    data = []
-    
-    for _ in range(samples):
-        # Select random crop, district, soil type
-        crop = np.random.choice(crops)
-        district = np.random.choice(districts)
-        soil_type = np.random.choice(soil_types)
-        
-        # Generate random NPK values
-        nitrogen = np.random.uniform(feature_ranges['nitrogen'][0], feature_ranges['nitrogen'][1])
-        phosphorus = np.random.uniform(feature_ranges['phosphorus'][0], feature_ranges['phosphorus'][1])
-        potassium = np.random.uniform(feature_ranges['potassium'][0], feature_ranges['potassium'][1])
-        
-        # Generate other features
-        rainfall = np.random.uniform(feature_ranges['rainfall'][0], feature_ranges['rainfall'][1])
-        temperature = np.random.uniform(feature_ranges['temperature'][0], feature_ranges['temperature'][1])
-        
-        # Calculate suitability based on NPK requirements
-        requirements = crop_requirements[crop]
-        n_score = min(1.0, nitrogen / requirements['nitrogen'])
-        p_score = min(1.0, phosphorus / requirements['phosphorus'])
-        k_score = min(1.0, potassium / requirements['potassium'])
-        suitability_score = np.mean([n_score, p_score, k_score])
-        
-        # Determine if crop is recommended
-        recommended = 1 if suitability_score >= 0.7 else 0
-        
-        # Generate expected yield (more suitable = higher yield)
-        base_yield = feature_ranges['expected_yield'][0]
-        yield_range = feature_ranges['expected_yield'][1] - feature_ranges['expected_yield'][0]
-        noise = np.random.normal(0, 0.1)  # Add some noise
-        expected_yield = base_yield + yield_range * (suitability_score + noise)
-        expected_yield = max(500, min(6000, expected_yield))  # Clip to realistic range
-        
-        # Build sample
-        sample = {
-            'crop': crop,
-            'district': district,
-            'soil_type': soil_type,
-            'nitrogen': nitrogen,
-            'phosphorus': phosphorus,
-            'potassium': potassium,
-            'rainfall': rainfall,
-            'temperature': temperature,
-            'suitability_score': suitability_score,
-            'recommended': recommended,
-            'expected_yield': expected_yield
-        }
-        
-        data.append(sample)
-    
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
-    
-    # Save synthetic data
-    df.to_csv('synthetic_training_data.csv', index=False)
-    print(f"✅ Generated {len(df)} synthetic training samples")
-    
-    return df
 
-def plot_feature_importance(predictor, features, save_dir='./plots'):
-    """Plot feature importance for the crop recommender model"""
-    if not os.path.exists(save_dir):
-        os.makedirs(save_dir)
-    
-    feature_importance = pd.DataFrame({
-        'feature': features,
-        'importance': predictor.crop_recommender.feature_importances_
-    }).sort_values('importance', ascending=False)
-    
-    plt.figure(figsize=(12, 6))
-    sns.barplot(x='importance', y='feature', data=feature_importance)
-    plt.title('Feature Importance for Crop Recommendation')
-    plt.tight_layout()
-    plt.savefig(f'{save_dir}/feature_importance.png')
-    print(f"📊 Feature importance plot saved to {save_dir}/feature_importance.png")
+    # Calculate suitability based on NPK requirements
+    requirements = CROP_CATALOG.optimal[crop_idx]
+    npk = np.column_stack([columns['nitrogen'], columns['phosphorus'], columns['potassium']])
+    suitability_score = np.minimum(1.0, npk / requirements).mean(axis=1)
 
-def plot_confusion_matrix(predictor, X_test, y_test, save_dir='./plots'):
-    """Plot confusion matrix for the crop recommender model"""
-    if not os.path.exists(save_dir):
-        os.makedirs(save_dir)
-    
-    y_pred = predictor.crop_recommender.predict(X_test)
-    cm = confusion_matrix(y_test, y_pred)
-    
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues')
-    plt.title('Confusion Matrix')
-    plt.ylabel('True Label')
-    plt.xlabel('Predicted Label')
-    plt.tight_layout()
-    plt.savefig(f'{save_dir}/confusion_matrix.png')
-    print(f"📊 Confusion matrix plot saved to {save_dir}/confusion_matrix.png")
+    # Determine if crop is recommended
+    recommended = (suitability_score >= 0.7).astype(np.int64)
 
-def evaluate_crop_recommender(predictor, training_data, save_dir='./plots'):
-    """Evaluate crop recommender model and save plots"""
-    # Prepare features and labels
-    features = [
-        'nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature',
-        'soil_type_encoded', 'district_encoded', 'npk_ratio', 'pk_ratio',
-        'total_nutrients', 'nutrient_balance', 'rainfall_nitrogen', 'temp_phosphorus'
-    ]
-    
-    X = training_data[features]
-    y = training_data['recommended']
-    
-    # Split data
-    from sklearn.model_selection import train_test_split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    
-    # Scale features
-    X_test_scaled = predictor.scaler.transform(X_test)
-    
-    # Plot feature importance
-    plot_feature_importance(predictor, features, save_dir)
-    
-    # Plot confusion matrix
-    plot_confusion_matrix(predictor, X_test_scaled, y_test, save_dir)
-    
-    # Print classification report
-    from sklearn.metrics import classification_report
-    y_pred = predictor.crop_recommender.predict(X_test_scaled)
-    print("\n📊 Crop Recommender Classification Report:")
-    print(classification_report(y_test, y_pred))
+    # Generate expected yield (more suitable = higher yield)
+    base_yield = FEATURE_RANGES['expected_yield'][0]
+    yield_range = FEATURE_RANGES['expected_yield'][1] - FEATURE_RANGES['expected_yield'][0]
+    noise = rng.normal(0, 0.1, rows)  # Add some noise
+    expected_yield = np.clip(base_yield + yield_range * (suitability_score + noise), 500, 6000)  # Clip to realistic range
 
-def evaluate_yield_predictor(predictor, training_data, save_dir='./plots'):
-    """Evaluate yield predictor model and save plots"""
-    if not os.path.exists(save_dir):
-        os.makedirs(save_dir)
-    
-    # Prepare features and target (use same features as crop recommender)
-    features = [
-        'nitrogen', 'phosphorus', 'potassium', 'rainfall', 'temperature',
-        'soil_type_encoded', 'district_encoded', 'npk_ratio', 'pk_ratio',
-        'total_nutrients', 'nutrient_balance', 'rainfall_nitrogen', 'temp_phosphorus'
-    ]
-    
-    X = training_data[features]
-    y = training_data['expected_yield']
-    
-    # Split data
-    from sklearn.model_selection import train_test_split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
-    
-    # Scale features
-    X_test_scaled = predictor.scaler.transform(X_test)
-    
-    # Make predictions
-    y_pred = predictor.yield_predictor.predict(X_test_scaled)
-    
-    # Plot actual vs predicted yields
-    plt.figure(figsize=(10, 8))
-    plt.scatter(y_test, y_pred, alpha=0.5)
-    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'k--', lw=2)
-    plt.xlabel('Actual Yield (kg/ha)')
-    plt.ylabel('Predicted Yield (kg/ha)')
-    plt.title('Actual vs Predicted Crop Yields')
-    plt.tight_layout()
-    plt.savefig(f'{save_dir}/yield_predictions.png')
-    print(f"📊 Yield prediction plot saved to {save_dir}/yield_predictions.png")
-    
-    # Calculate error distribution
-    errors = y_pred - y_test
-    
-    # Plot error distribution
-    plt.figure(figsize=(10, 6))
-    sns.histplot(errors, kde=True)
-    plt.xlabel('Prediction Error (kg/ha)')
-    plt.ylabel('Frequency')
-    plt.title('Yield Prediction Error Distribution')
-    plt.tight_layout()
-    plt.savefig(f'{save_dir}/yield_error_distribution.png')
-    print(f"📊 Yield error distribution plot saved to {save_dir}/yield_error_distribution.png")
+    return pd.DataFrame({
+        'crop': np.asarray(CROP_CATALOG.names, dtype=object)[crop_idx],
+        'district': np.asarray(PUNJAB_DISTRICTS, dtype=object)[district_idx],
+        'soil_type': np.asarray(SOIL_TYPES, dtype=object)[soil_idx],
+        'nitrogen': columns['nitrogen'],
+        'phosphorus': columns['phosphorus'],
+        'potassium': columns['potassium'],
+        'rainfall': columns['rainfall'],
+        'temperature': columns['temperature'],
+        'suitability_score': suitability_score,
+        'recommended': recommended,
+        'expected_yield': expected_yield
+    })
+
+def _synthetic_chunk_job(job):
+    seed_sequence, rows = job
+    return synthetic_chunk(np.random.default_rng(seed_sequence), rows)
+
+def iter_synthetic_chunks(samples=1000, chunk_size=1_000_000, seed=42, processes=1):
+    """Yield synthetic data as DataFrame chunks of at most chunk_size rows.
+
+    Every chunk draws from its own generator spawned from SeedSequence(seed),
+    so the output only depends on seed and chunk_size, not on how many
+    processes produced it.
+    """
+    chunk_size = max(1, int(chunk_size))
+    sizes = [min(chunk_size, samples - start) for start in range(0, samples, chunk_size)]
+    jobs = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+    if processes and processes > 1 and len(jobs) > 1:
+        from multiprocessing import Pool
+        with Pool(processes) as pool:
+            for chunk in pool.imap(_synthetic_chunk_job, jobs):
+                yield chunk
+    else:
+        for job in jobs:
+            yield _synthetic_chunk_job(job)
 
-def main():
+def generate_synthetic_data(samples=1000, seed=42, output_file=None, chunk_size=1_000_000,
+                            processes=1, return_frame=True):
+    """Generate synthetic data for model training if real data is unavailable.
+
+    Chunks are appended to output_file (CSV) as they are produced when a path
+    is given; pass return_frame=False to stream very large datasets to disk
+    without holding them in memory (the row count is returned instead).
+    """
+    print("🧪 Generating synthetic training data...")
+
+    chunks = []
+    written = 0
+    for chunk in iter_synthetic_chunks(samples, chunk_size, seed, processes):
+        if output_file:
+            chunk.to_csv(output_file, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += len(chunk)
+        if return_frame:
+            chunks.append(chunk)
+
+    print(f"✅ Generated {written} synthetic training samples")
+    if output_file:
+        print(f"💾 Synthetic data saved to {output_file}")
+
+    if not return_frame:
+        return written
+    if not chunks:
+        return synthetic_chunk(seed, 0)
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Train the Punjab crop models')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--plots-dir', default='./plots')
+    parser.add_argument('--skip-evaluation', action='store_true',
+                        help='only build and save the model artifacts (no reports or plots)')
+    parser.add_argument('--plot-workers', type=int, default=None,
+                        help='processes rendering plots (default: one per CPU, at most one per plot)')
+    parser.add_argument('--soil-cards', default=None,
+                        help='soil-card CSV or .npy of NPK rows; fits the soil classifier with MiniBatchKMeans '
+                             'streamed from this file instead of KMeans on the training data')
+    parser.add_argument('--soil-workers', type=int, default=None,
+                        help='threads running the soil classifier initializations (default: one per CPU)')
+    args = parser.parse_args(argv)
+    
     print("🌾 Starting Punjab Crop ML Model Training 🌾")
     
     # Create model directory if it doesn't exist
-    model_dir = './model'
+    model_dir = args.model_dir
     if not os.path.exists(model_dir):
         os.makedirs(model_dir)
-    
-    # Create plots directory if it doesn't exist
-    plots_dir = './plots'
-    if not os.path.exists(plots_dir):
-        os.makedirs(plots_dir)
+    plots_dir = args.plots_dir
     
     # Load training data
     training_data = load_training_data()
     
     # Initialize the crop predictor
-    predictor = PunjabCropPredictor()
+    predictor = PunjabCropTrainer()
+    
+    # Build the per-district climate store shipped with the models
+    if os.path.exists(YIELD_DATA_FILE):
+        predictor.climate_store = ClimateStore.load_or_build(YIELD_DATA_FILE, model_dir)
+        print(f"🌦️ Built climate store {predictor.climate_store.version} "
+              f"({len(predictor.climate_store.districts) - 1} districts)")
+        
+        # District yield forecasters over the same history
+        predictor.yield_forecaster = YieldForecaster.fit(YieldPanel.read(YIELD_DATA_FILE, AREA_DATA_FILE))
+        print_forecast_report(predictor.yield_forecaster)
     
     # Prepare features (feature engineering)
     training_data = predictor.prepare_features(training_data)
     
+    # One split, contiguous feature matrix shared by every builder and the evaluation
+    data = TrainingData.from_frame(training_data)
+    del training_data
+    
     # Build and train crop recommender model
-    predictor.build_crop_recommender(training_data)
+    predictor.build_crop_recommender(data)
     
     # Build and train yield predictor model
-    predictor.build_yield_predictor(training_data)
+    predictor.build_yield_predictor(data)
     
     # Build and train soil classifier
-    predictor.build_soil_classifier(training_data)
+    if args.soil_cards:
+        predictor.build_soil_classifier_streaming(args.soil_cards, workers=args.soil_workers)
+    else:
+        predictor.build_soil_classifier(data)
     
-    # Evaluate models
-    evaluate_crop_recommender(predictor, training_data, plots_dir)
-    evaluate_yield_predictor(predictor, training_data, plots_dir)
+    # Evaluate on the builders' held-out rows; plots render headless in parallel
+    if not args.skip_evaluation:
+        evaluate_models(predictor, data, FEATURES, plots_dir, args.plot_workers)
+    
+    # Distill the fast tier student from the trained models
+    predictor.student, distill_report = distill(predictor, synthetic_chunk(7, DISTILL_SAMPLES))
+    print_report(distill_report)
     
     # Save models
     predictor.save_models(model_dir)
-    
+
+    # Export ONNX graphs for the onnxruntime backend (needs skl2onnx)
+    try:
+        export_onnx(predictor, model_dir)
+    except ImportError:
+        print("⚠️ skl2onnx not installed, skipping ONNX export")
+
     # Test model with sample soil data
     sample_soil_data = {
         'nitrogen': 140,
@@ -329,7 +274,8 @@ def main():
     
     print("\n✅ Punjab Crop ML Model Training Complete!")
     print(f"\n📂 Models saved in: {model_dir}/")
-    print(f"📊 Evaluation plots saved in: {plots_dir}/")
+    if not args.skip_evaluation:
+        print(f"📊 Evaluation plots saved in: {plots_dir}/")
     print("\nNext steps:")
     print("1. Update the Flask microservice app.py to use the trained models")
     print("2. Test the ML service with real data")
@@ -0,0 +1,87 @@
+"""
+Training data context shared by the model builders and the evaluation stage.
+
+TrainingData materializes the FEATURES matrix once, as a C-contiguous
+float64 array with the training rows first and the held-out rows after them.
+The split is computed once, stratified on 'recommended', as a row order.
+Train and test sets are therefore plain slices: views into the one matrix,
+never copies. The matrix is standardized in place when the scaler is fitted,
+so the scaled features do not need a second copy either. Raw NPK columns are
+kept aside for the soil classifier, which has its own scaler.
+
+    data = TrainingData.from_frame(trainer.prepare_features(frame))
+    trainer.build_crop_recommender(data)    # fits the scaler, scales data.X in place
+    trainer.build_yield_predictor(data)
+    trainer.build_soil_classifier(data)
+    evaluate_models(trainer, data, FEATURES)
+"""
+
+import numpy as np
+from models import FEATURES
+
+TARGETS = ('recommended', 'expected_yield')
+NPK_COLUMNS = 3
+
+
+def split_order(rows, labels=None, test_size=0.2, seed=42):
+    """Row order with the training rows first; returns (order, number of training rows)"""
+    from sklearn.model_selection import train_test_split
+
+    train, test = train_test_split(np.arange(rows), test_size=test_size, random_state=seed, stratify=labels)
+    return np.concatenate([train, test]), len(train)
+
+
+class TrainingData:
+    """Feature matrix (train rows first), aligned targets and raw NPK for one training run"""
+
+    def __init__(self, X, targets, npk, n_train):
+        self.X = X
+        self.targets = targets
+        self.npk = npk
+        self.n_train = int(n_train)
+        self.scaler = None
+
+    @classmethod
+    def from_frame(cls, frame, test_size=0.2, stratify='recommended', seed=42):
+        """Copy the prepared frame's features and targets once, in split order"""
+        labels = frame[stratify].to_numpy() if stratify in frame else None
+        order, n_train = split_order(len(frame), labels, test_size, seed)
+
+        X = np.empty((len(frame), len(FEATURES)), dtype=np.float64)
+        for j, feature in enumerate(FEATURES):
+            X[:, j] = frame[feature].to_numpy(dtype=np.float64)[order]
+        targets = {name: frame[name].to_numpy()[order] for name in TARGETS if name in frame}
+        # NPK are the first features; keep them unscaled for the soil classifier
+        npk = X[:, :NPK_COLUMNS].copy()
+        return cls(X, targets, npk, n_train)
+
+    def __len__(self):
+        return len(self.X)
+
+    @property
+    def X_train(self):
+        return self.X[:self.n_train]
+
+    @property
+    def X_test(self):
+        return self.X[self.n_train:]
+
+    def y_train(self, target):
+        return self.targets[target][:self.n_train]
+
+    def y_test(self, target):
+        return self.targets[target][self.n_train:]
+
+    def standardize(self, scaler):
+        """Fit scaler on the training rows and scale the whole matrix in place"""
+        if self.scaler is not None:
+            raise ValueError("Training data is already standardized")
+        scaler.fit(self.X_train)
+        self.X -= scaler.mean_
+        self.X /= scaler.scale_
+        self.scaler = scaler
+        return scaler
+
+    @property
+    def nbytes(self):
+        return self.X.nbytes + self.npk.nbytes + sum(target.nbytes for target in self.targets.values())
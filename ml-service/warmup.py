@@ -0,0 +1,205 @@
+"""
+Startup warm-up and readiness gating for the ML service.
+
+After the models load, Readiness.start runs a warm-up in a background thread:
+
+1. every array reachable from the loaded models is read once, one byte per
+   page, so model memory is resident before real traffic arrives;
+2. a few rounds of synthetic requests go through every prediction endpoint
+   with Flask's test client, so each route's full code path (JSON handling,
+   feature preparation, both model tiers, fertilizer planning, sweeps,
+   explanations, yield forecasts) has run at least once. Inputs are drawn
+   fresh every boot. Warm-up requests are marked in the WSGI environ
+   (WARMUP_ENVIRON), which only the in-process test client can set, and skip
+   the singleflight, the explanation and shared prediction caches and the
+   degrade-mode response cache, so a persisted cache can neither turn
+   warm-up into lookups nor fill up with synthetic inputs.
+
+/ready answers 503 until every warm-up request has returned 200. Liveness
+(/health) is unaffected, so an orchestrator can keep the pod alive while the
+load balancer holds traffic back. Warm-up duration, per-endpoint warm-up
+latency and the latency of the first real request to each endpoint are
+exported as metrics.
+"""
+
+import os
+import time
+import threading
+import numpy as np
+from flask import request, g
+from metrics import metrics
+
+PAGE_SIZE = 4096
+# WSGI environ key set on warm-up requests; unlike a header, remote clients cannot send it
+WARMUP_ENVIRON = 'ml.warmup'
+
+
+def model_arrays(root, max_depth=6):
+    """Every NumPy array reachable from an object's attributes, lists and dicts (each once)"""
+    seen, stack = set(), [(root, 0)]
+    while stack:
+        obj, depth = stack.pop()
+        if id(obj) in seen or depth > max_depth:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            if obj.dtype != object:
+                yield obj
+        elif hasattr(obj, 'node_count') and hasattr(obj, 'threshold'):
+            # sklearn's Cython trees have no __dict__; their node arrays are properties
+            stack.extend((getattr(obj, name), depth + 1) for name in ('children_left', 'threshold', 'value'))
+        elif isinstance(obj, dict):
+            stack.extend((value, depth + 1) for value in obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend((value, depth + 1) for value in obj)
+        elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+            stack.extend((value, depth + 1) for value in vars(obj).values())
+
+
+def touch_pages(predictor):
+    """Read one byte per memory page of every model array; returns the bytes covered"""
+    total = 0
+    for array in model_arrays(predictor):
+        if array.flags.c_contiguous:
+            # A strided view over the raw bytes faults in each page without copying
+            int(array.reshape(-1).view(np.uint8)[::PAGE_SIZE].sum())
+        else:
+            float(np.sum(array))
+        total += array.nbytes
+    return total
+
+
+def is_warmup_request():
+    """Whether the current request is the service's own warm-up traffic"""
+    return bool(request.environ.get(WARMUP_ENVIRON))
+
+
+def warmup_requests(predictor, rng):
+    """Synthetic (path, body) pairs covering every prediction endpoint and model tier"""
+    location = str(rng.choice(['Amritsar', 'Ludhiana', 'Bathinda', 'Patiala', 'Jalandhar']))
+    soil = {
+        'nitrogen': float(rng.uniform(50, 250)),
+        'phosphorus': float(rng.uniform(10, 80)),
+        'potassium': float(rng.uniform(40, 200)),
+        'soil_type': 'loamy'
+    }
+    weather = {'rainfall': float(rng.uniform(300, 1200)), 'temperature': float(rng.uniform(15, 35))}
+    requests = []
+    for tier in ['full', 'fast'] if predictor.student is not None else ['full']:
+        requests.append(('/predict/crop-recommendation',
+                         {'soil_data': soil, 'weather_data': weather, 'location': location, 'tier': tier}))
+        requests.append(('/predict/yield-prediction',
+                         {'crop_type': 'wheat', 'soil_data': soil, 'weather_data': weather, 'location': location,
+                          'tier': tier, 'uncertainty': True}))
+    requests += [
+        ('/predict/soil-analysis', {'soil_data': soil}),
+        ('/predict/fertilizer-recommendation', {'soil_data': soil, 'crop_type': 'rice'}),
+        ('/predict/fertilizer-plan', {'soil_data': soil, 'crop_type': 'rice'}),
+        ('/predict/explanation', {'soil_data': soil, 'weather_data': weather, 'location': location}),
+        ('/predict/sweep', {'soil_data': soil, 'location': location,
+                            'sweep': [{'variable': 'nitrogen', 'start': 50, 'stop': 250, 'steps': 10},
+                                      {'variable': 'rainfall', 'start': 300, 'stop': 1200, 'steps': 10}]})
+    ]
+    if predictor.district_forecasts is not None:
+        requests.append(('/predict/yield-forecast', {'districts': [location]}))
+    return requests
+
+
+class Readiness:
+    """Readiness state of the service, flipped to ready by a successful warm-up"""
+
+    def __init__(self, rounds=3, background=True):
+        self.rounds = int(rounds)
+        self.background = bool(background)
+        self.state = 'starting'
+        self.error = None
+        self.warmup_seconds = None
+        self._lock = threading.Lock()
+        self._first_seen = set()
+
+    @classmethod
+    def from_env(cls):
+        """Build from ML_WARMUP_ROUNDS (0 disables warm-up) and ML_WARMUP_BACKGROUND"""
+        return cls(
+            rounds=os.environ.get('ML_WARMUP_ROUNDS', 3),
+            background=os.environ.get('ML_WARMUP_BACKGROUND', '1').lower() in ('1', 'true', 'yes')
+        )
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def init_app(self, app):
+        """Register hooks timing the first real request to each prediction endpoint"""
+        app.before_request(self._start_timer)
+        app.after_request(self._record_first)
+
+    def _start_timer(self):
+        g.readiness_start = time.perf_counter()
+
+    def _record_first(self, response):
+        if (request.path.startswith('/predict/') and 'readiness_start' in g
+                and not is_warmup_request()):
+            with self._lock:
+                first = request.path not in self._first_seen
+                self._first_seen.add(request.path)
+            if first:
+                metrics.set('first_request_seconds', time.perf_counter() - g.readiness_start, path=request.path)
+        return response
+
+    def _set_state(self, state, error=None):
+        self.state = state
+        self.error = error
+        metrics.set('ready', 1 if state == 'ready' else 0)
+
+    def start(self, app, predictor):
+        """Warm up (in a background thread unless disabled); ready immediately without models or rounds"""
+        if predictor is None or self.rounds <= 0:
+            self._set_state('ready')
+            return None
+        self._set_state('warming')
+        if not self.background:
+            self.warm_up(app, predictor)
+            return None
+        thread = threading.Thread(target=self.warm_up, args=(app, predictor), name='warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def warm_up(self, app, predictor):
+        """Touch model memory and drive synthetic requests through every endpoint"""
+        print(f"🔥 Warming up ({self.rounds} round(s) through every prediction endpoint)...")
+        start = time.perf_counter()
+        try:
+            touched = touch_pages(predictor)
+            metrics.set('warmup_touched_bytes', touched)
+
+            client = app.test_client()
+            # Fresh inputs every boot; warm-up requests also bypass the caches (see app.cached_predict)
+            rng = np.random.default_rng()
+            for _ in range(self.rounds):
+                for path, body in warmup_requests(predictor, rng):
+                    began = time.perf_counter()
+                    response = client.post(path, json=body, environ_base={WARMUP_ENVIRON: True})
+                    metrics.observe('warmup_request_seconds', time.perf_counter() - began, path=path)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{path} answered {response.status_code} during warm-up")
+        except Exception as e:
+            print(f"❌ Warm-up failed: {e}")
+            self._set_state('failed', str(e))
+            return False
+        finally:
+            self.warmup_seconds = time.perf_counter() - start
+            metrics.set('warmup_seconds', self.warmup_seconds)
+
+        self._set_state('ready')
+        print(f"✅ Warm-up finished in {self.warmup_seconds:.2f}s ({touched / 1e6:.1f} MB of model memory touched)")
+        return True
+
+    def status(self):
+        return {
+            'ready': self.ready,
+            'state': self.state,
+            'warmup_rounds': self.rounds,
+            'warmup_seconds': self.warmup_seconds,
+            'error': self.error
+        }
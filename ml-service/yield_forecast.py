@@ -0,0 +1,403 @@
+"""
+Next-season district yield forecasts from the historical series.
+
+Punjab_Data.csv holds per-district yearly rice area, yield and IMD Jun-Nov
+rainfall/temperature from 1990; bajra-wheat.csv holds wide per-year wheat,
+potato and bajra areas back to 1968. Both are read into one dense
+(district x year) panel, so every lag, rolling mean and trend feature is an
+array shift or a sliding window along the year axis, computed for all
+districts and years at once.
+
+The target is the change of yield from its last 3-year mean. Two ridge
+models are fitted on the same features:
+
+- pooled: shared coefficients plus a per-district intercept;
+- district: each district's own coefficients, all districts solved as one
+  stacked set of normal equations.
+
+A rolling-origin backtest over the last BACKTEST_YEARS seasons measures
+each model's error per district. The 3-year mean itself ('naive') is also a
+candidate, and a district leaves it only for a model whose backtest MAE is
+lower by more than CHOICE_MARGIN. The choice is itself backtested: from the
+SELECTION_YEARS-th season on, each season is forecast by the model chosen on
+the seasons before it, so the reported error is out of sample. The served
+choice is then made on every backtest season.
+
+yield_forecast.npz keeps the coefficients and the panel. Loading it
+computes every district's forecast in one batch; with ML_YIELD_HISTORY_DIR
+set, the panel is re-read from the CSVs there first, so seasons appended
+since training are used without refitting. Only NumPy and the csv module
+are needed.
+
+    python -m yield_forecast --model-dir ./model --data-dir ..   # fit and save
+"""
+
+import os
+import csv
+import hashlib
+import numpy as np
+from districts import district_index
+
+FORECAST_FILE = 'yield_forecast.npz'
+YIELD_FILE = 'Punjab_Data.csv'
+AREA_FILE = 'bajra-wheat.csv'
+FORECAST_CROP = 'rice'
+
+# Punjab_Data.csv columns read into the panel
+SOURCE_COLUMNS = {
+    'yield': 'RICE.YIELD..Kg.per.ha.',
+    'rice_area': 'RICE.AREA..1000.ha.',
+    'rainfall': 'IMD_RF',
+    'temperature': 'IMD_Tmax'
+}
+AREA_CROPS = ('wheat', 'potato', 'bajra')
+
+# Features of a season, from the seasons before it only
+FEATURES = [
+    'change_1', 'change_2', 'trend_5', 'mean_gap', 'rainfall_anomaly',
+    'temperature_anomaly', 'rice_area_change', 'wheat_area_change'
+]
+# Yield history every training and forecast row needs; the other features default to 0 (their mean)
+HISTORY_YEARS = 5
+FORECAST_MODELS = ('naive', 'pooled', 'district')
+RIDGE_ALPHA = 30.0
+BACKTEST_YEARS = 8
+# Backtest seasons the first out-of-sample choice is made on
+SELECTION_YEARS = 4
+# Share of naive's MAE a model has to beat it by to be chosen
+CHOICE_MARGIN = 0.1
+
+
+class YieldPanel:
+    """Yearly series per district as (districts x years) arrays; missing seasons are NaN"""
+
+    def __init__(self, districts, years, series):
+        self.districts = list(districts)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.series = {name: np.asarray(values, dtype=np.float64) for name, values in series.items()}
+
+    @classmethod
+    def read(cls, yield_file, area_file=None):
+        """Panel of the districts in the yield file; area series are matched by canonical district name"""
+        with open(yield_file, newline='') as f:
+            rows = list(csv.DictReader(f))
+        names = [district_index.resolve(row['District']) or row['District'] for row in rows]
+        districts = sorted(set(names))
+        years = np.array([int(row['Year']) for row in rows])
+        first, last = int(years.min()), int(years.max())
+        district_row = {name: i for i, name in enumerate(districts)}
+        d = np.array([district_row[name] for name in names])
+
+        series = {}
+        for name, column in SOURCE_COLUMNS.items():
+            values = np.full((len(districts), last - first + 1), np.nan)
+            values[d, years - first] = [_number(row[column]) for row in rows]
+            series[name] = values
+
+        if area_file is not None and os.path.exists(area_file):
+            with open(area_file, newline='') as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                area_years = np.array([int(year) for year in header[2:]])
+                inside = (area_years >= first) & (area_years <= last)
+                for crop in AREA_CROPS:
+                    series[f'{crop}_area'] = np.full((len(districts), last - first + 1), np.nan)
+                for row in reader:
+                    crop, district = row[0].lower(), district_index.resolve(row[1])
+                    if crop in AREA_CROPS and district in district_row:
+                        values = np.array([_number(value) for value in row[2:]])
+                        series[f'{crop}_area'][district_row[district], area_years[inside] - first] = values[inside]
+        return cls(districts, np.arange(first, last + 1), series)
+
+    def features(self):
+        """Feature cube, target and 3-year base for every district and season plus the next one.
+
+        Returns (X, target, base, history): X is districts x (years + 1) x
+        FEATURES, target is yield minus base, and history marks the cells with
+        HISTORY_YEARS seasons of yield before them. The last column is the
+        season to forecast, with no target.
+        """
+        series = {name: np.pad(values, ((0, 0), (0, 1)), constant_values=np.nan)
+                  for name, values in self.series.items()}
+        yields = series['yield']
+        lags = [_lag(yields, k) for k in range(1, HISTORY_YEARS + 1)]
+        base = _rolling(yields, 3).mean(axis=-1)
+        mean_5 = _rolling(yields, HISTORY_YEARS).mean(axis=-1)
+
+        # Least-squares slope over the last HISTORY_YEARS seasons, as one weighted sum per window
+        offsets = np.arange(HISTORY_YEARS) - (HISTORY_YEARS - 1) / 2
+        trend = _rolling(yields, HISTORY_YEARS) @ (offsets / (offsets ** 2).sum())
+
+        columns = {
+            'change_1': lags[0] - lags[1],
+            'change_2': lags[1] - lags[2],
+            'trend_5': trend,
+            'mean_gap': base - mean_5,
+            'rainfall_anomaly': _lag(series['rainfall'], 1) - _rolling(series['rainfall'], HISTORY_YEARS).mean(axis=-1),
+            'temperature_anomaly': (_lag(series['temperature'], 1)
+                                    - _rolling(series['temperature'], HISTORY_YEARS).mean(axis=-1)),
+            'rice_area_change': _log_change(series['rice_area']),
+            'wheat_area_change': _log_change(series['wheat_area']) if 'wheat_area' in series else np.nan
+        }
+        X = np.stack([np.broadcast_to(columns[name], yields.shape) for name in FEATURES], axis=-1)
+        history = ~np.isnan(np.stack(lags, axis=-1)).any(axis=-1)
+        return X, yields - base, base, history
+
+    def save_arrays(self):
+        arrays = {'panel_districts': np.asarray(self.districts), 'panel_years': self.years,
+                  'panel_series': np.asarray(list(self.series))}
+        arrays.update({f'panel_{name}': values for name, values in self.series.items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, data):
+        return cls(data['panel_districts'].tolist(), data['panel_years'],
+                   {name: data[f'panel_{name}'] for name in data['panel_series'].tolist()})
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _lag(values, k):
+    """values shifted k seasons later (NaN where there is no earlier season)"""
+    shifted = np.full(values.shape, np.nan)
+    shifted[:, k:] = values[:, :-k]
+    return shifted
+
+
+def _rolling(values, window):
+    """Windows of the `window` seasons before each season (districts x seasons x window); NaN-padded at the start"""
+    padded = np.pad(values, ((0, 0), (window, 0)), constant_values=np.nan)[:, :-1]
+    return np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)
+
+
+def _log_change(values):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.log(_lag(values, 1) / _lag(values, 2))
+
+
+def _ridge(X, y, weight, penalty):
+    """Ridge solutions of stacked problems: X (..., rows, p), y and weight (..., rows), penalty (p,)"""
+    weighted = X * weight[..., None]
+    gram = np.einsum('...rp,...rq->...pq', weighted, X) + np.diag(penalty)
+    return np.linalg.solve(gram, np.einsum('...rp,...r->...p', weighted, y)[..., None])[..., 0]
+
+
+def fit_models(X, target, rows, alpha=RIDGE_ALPHA):
+    """Pooled (intercepts, coefficients) and district coefficients fitted on the rows mask (districts x seasons)"""
+    districts, seasons, width = X.shape
+    y = np.where(rows, target, 0.0)
+    weight = rows.astype(np.float64)
+
+    # Pooled: shared coefficients on the within-district deviations, then each district's intercept
+    # (the same solution as unpenalized one-hot intercepts, without a districts-wide system)
+    counts = np.maximum(weight.sum(axis=1), 1)
+    X_mean = np.einsum('dsp,ds->dp', X, weight) / counts[:, None]
+    y_mean = (y * weight).sum(axis=1) / counts
+    coefficients = _ridge((X - X_mean[:, None]).reshape(-1, width), (y - y_mean[:, None]).ravel(), weight.ravel(),
+                          np.full(width, alpha))
+    pooled = (y_mean - X_mean @ coefficients, coefficients)
+
+    # District: every district's [intercept, features] system solved in one stacked call
+    design = np.concatenate([np.ones((districts, seasons, 1)), X], axis=-1)
+    penalty = np.concatenate([[1e-6], np.full(width, alpha)])
+    return pooled, _ridge(design, y, weight, penalty)
+
+
+def predict_models(X, pooled, district):
+    """Predicted change from the 3-year mean per model (FORECAST_MODELS x districts x seasons)"""
+    intercepts, coefficients = pooled
+    return np.stack([
+        np.zeros(X.shape[:2]),
+        intercepts[:, None] + X @ coefficients,
+        district[:, None, 0] + np.einsum('dsp,dp->ds', X, district[:, 1:])
+    ])
+
+
+def _backtest_season(X, target, valid, season, alpha):
+    """Predictions for one held-out season from models fitted on the seasons before it"""
+    rows = valid & (np.arange(X.shape[1]) < season)
+    pooled, district = fit_models(X, target, rows, alpha)
+    return predict_models(X[:, season:season + 1], pooled, district)[:, :, 0]
+
+
+def _mae(errors, held_out):
+    """MAE over the held-out seasons (last axis); NaN where there are none"""
+    counts = held_out.sum(axis=-1)
+    mae = np.where(held_out, errors, 0).sum(axis=-1) / np.maximum(counts, 1)
+    return np.where(counts > 0, mae, np.nan)
+
+
+def choose_models(errors, held_out, margin=CHOICE_MARGIN):
+    """Model per district: the lowest-MAE one if it beats naive by margin, otherwise naive"""
+    mae = np.nan_to_num(_mae(errors, held_out), nan=np.inf)
+    best = np.argmin(mae, axis=0)
+    return np.where(mae[best, np.arange(mae.shape[1])] < (1 - margin) * mae[0], best, 0)
+
+
+class YieldForecaster:
+    """Ridge forecasters of next-season yield with a per-district model choice.
+
+    backtest_mae holds every model's error per district and selection_mae
+    the error of the choice, both over the seasons the choice was scored on.
+    """
+
+    def __init__(self, districts, mean, scale, pooled, district, choice, backtest_mae, selection_mae,
+                 alpha=RIDGE_ALPHA, panel=None, version=''):
+        self.districts = list(districts)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.pooled = tuple(np.asarray(values, dtype=np.float64) for values in pooled)
+        self.district = np.asarray(district, dtype=np.float64)
+        self.choice = np.asarray(choice, dtype=np.int64)
+        self.backtest_mae = np.asarray(backtest_mae, dtype=np.float64)
+        self.selection_mae = np.asarray(selection_mae, dtype=np.float64)
+        self.alpha = float(alpha)
+        self.panel = panel
+        self.version = version
+
+    @staticmethod
+    def standardize(X, mean, scale):
+        # Missing optional features become 0, their training mean
+        return np.nan_to_num((X - mean) / scale, nan=0.0)
+
+    @classmethod
+    def fit(cls, panel, alpha=RIDGE_ALPHA, backtest_years=BACKTEST_YEARS, selection_years=SELECTION_YEARS,
+            margin=CHOICE_MARGIN):
+        """Backtest both models and the per-district choice over the last seasons, then fit on every season"""
+        X, target, _, history = panel.features()
+        valid = history & ~np.isnan(target)
+        observed = X[valid]
+        mean = np.nanmean(observed, axis=0)
+        scale = np.nanstd(observed, axis=0)
+        mean, scale = np.nan_to_num(mean), np.where(np.nan_to_num(scale) > 0, np.nan_to_num(scale), 1.0)
+        X = cls.standardize(X, mean, scale)
+
+        seasons = np.flatnonzero(valid.any(axis=0))[-backtest_years:]
+        predictions = [_backtest_season(X, target, valid, season, alpha) for season in seasons]
+        errors = np.abs(np.stack(predictions, axis=-1) - target[:, seasons])  # models x districts x seasons
+        held_out = valid[:, seasons]
+
+        # Nested backtest: each later season is scored with the choice made on the seasons before it
+        columns = np.arange(len(panel.districts))
+        scored = np.zeros(held_out.shape, dtype=bool)
+        chosen_errors = np.zeros(held_out.shape)
+        for k in range(min(selection_years, len(seasons) - 1), len(seasons)):
+            picked = choose_models(errors[..., :k], held_out[:, :k], margin)
+            chosen_errors[:, k] = errors[picked, columns, k]
+            scored[:, k] = held_out[:, k]
+        backtest_mae = _mae(errors, scored)
+        selection_mae = _mae(chosen_errors, scored)
+
+        # Served choice: made on every backtest season (naive where there are none)
+        choice = choose_models(errors, held_out, margin)
+        pooled, district = fit_models(X, target, valid, alpha)
+        return cls(panel.districts, mean, scale, pooled, district, choice, backtest_mae, selection_mae, alpha,
+                   panel)
+
+    def forecast(self, panel=None):
+        """Next-season forecast for every district in one batch.
+
+        Returns the season and, per district, the forecast, the model used,
+        every model's forecast (FORECAST_MODELS x districts), the 3-year mean and the
+        last observed yield. Districts without enough history are NaN.
+        """
+        panel = panel or self.panel
+        X, _, base, history = panel.features()
+        X = self.standardize(X[:, -1:], self.mean, self.scale)
+        # A refreshed panel may list districts the models never saw; those stay NaN
+        fitted = {name: i for i, name in enumerate(self.districts)}
+        rows = np.array([fitted.get(name, -1) for name in panel.districts])
+        known = rows >= 0
+        
+        changes = np.full((len(FORECAST_MODELS), len(rows)), np.nan)
+        pooled = (self.pooled[0][rows[known]], self.pooled[1])
+        changes[:, known] = predict_models(X[known], pooled, self.district[rows[known]])[:, :, 0]
+        forecasts = np.where(history[:, -1], base[:, -1] + changes, np.nan)
+        choice = np.where(known, self.choice[np.maximum(rows, 0)], 0)
+        columns = np.arange(len(rows))
+        return {
+            'season': int(panel.years[-1]) + 1,
+            'districts': panel.districts,
+            'forecast': forecasts[choice, columns],
+            'model': choice,
+            'models': forecasts,
+            'base': base[:, -1],
+            'last_yield': panel.series['yield'][:, -1],
+            'backtest_mae': np.where(known, self.selection_mae[np.maximum(rows, 0)], np.nan)
+        }
+
+    def save(self, model_dir="./"):
+        arrays = {
+            'districts': np.asarray(self.districts), 'features': np.asarray(FEATURES),
+            'mean': self.mean, 'scale': self.scale, 'pooled_intercepts': self.pooled[0],
+            'pooled_coefficients': self.pooled[1], 'district': self.district,
+            'choice': self.choice, 'backtest_mae': self.backtest_mae, 'selection_mae': self.selection_mae,
+            'alpha': np.asarray(self.alpha)
+        }
+        arrays.update(self.panel.save_arrays())
+        np.savez(f"{model_dir}/{FORECAST_FILE}", **arrays)
+
+    @classmethod
+    def load(cls, model_dir="./"):
+        path = f"{model_dir}/{FORECAST_FILE}"
+        with open(path, 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:12]
+        with np.load(path, allow_pickle=False) as data:
+            if data['features'].tolist() != FEATURES:
+                raise ValueError(f"Yield forecast features mismatch in {path}")
+            pooled = (data['pooled_intercepts'], data['pooled_coefficients'])
+            # Files fitted before the nested backtest have no out-of-sample choice error
+            selection_mae = (data['selection_mae'] if 'selection_mae' in data.files
+                             else np.full(len(data['districts']), np.nan))
+            return cls(data['districts'].tolist(), data['mean'], data['scale'], pooled, data['district'],
+                       data['choice'], data['backtest_mae'], selection_mae, float(data['alpha']), YieldPanel.from_arrays(data),
+                       version)
+
+
+def history_panel(data_dir=None):
+    """Panel re-read from data_dir (ML_YIELD_HISTORY_DIR), or None when unset or missing"""
+    data_dir = data_dir or os.environ.get('ML_YIELD_HISTORY_DIR')
+    if not data_dir or not os.path.exists(os.path.join(data_dir, YIELD_FILE)):
+        return None
+    return YieldPanel.read(os.path.join(data_dir, YIELD_FILE), os.path.join(data_dir, AREA_FILE))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fit the district yield forecasters')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--data-dir', default='..', help=f'directory holding {YIELD_FILE} and {AREA_FILE}')
+    parser.add_argument('--alpha', type=float, default=RIDGE_ALPHA)
+    parser.add_argument('--backtest-years', type=int, default=BACKTEST_YEARS)
+    parser.add_argument('--selection-years', type=int, default=SELECTION_YEARS)
+    parser.add_argument('--margin', type=float, default=CHOICE_MARGIN)
+    args = parser.parse_args(argv)
+
+    panel = history_panel(args.data_dir)
+    if panel is None:
+        raise SystemExit(f"❌ No {YIELD_FILE} in {args.data_dir}")
+    forecaster = YieldForecaster.fit(panel, args.alpha, args.backtest_years, args.selection_years, args.margin)
+    forecaster.save(args.model_dir)
+    print_forecast_report(forecaster)
+
+
+def print_forecast_report(forecaster):
+    """Out-of-sample backtest error per model and of the choice, and the next-season forecasts"""
+    result = forecaster.forecast()
+    mae = np.nanmean(forecaster.backtest_mae, axis=1)
+    print("📈 Yield forecast backtest MAE (kg/ha): "
+          + ', '.join(f"{name} {value:.0f}" for name, value in zip(FORECAST_MODELS, mae))
+          + f", per-district choice {np.nanmean(forecaster.selection_mae):.0f}")
+    print(f"📈 Forecasts for {result['season']}:")
+    for i, name in enumerate(result['districts']):
+        print(f"   {name:<18}{result['forecast'][i]:>8.0f} kg/ha  ({FORECAST_MODELS[result['model'][i]]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Calibrated yield intervals around the yield network's point predictions.
+
+The MLP gives a single yield per row. At training time the held-out rows of
+the TrainingData are used for split-conformal calibration: rows are binned by
+predicted yield (quantile bins, so each bin has the same number of rows) and
+each bin keeps the residual (actual - predicted) quantiles at both tails of
+the interval. Serving an interval for a whole batch is then one
+searchsorted and two additions, and its width follows the predicted yield.
+
+The intervals are saved as yield_intervals.npz next to the models and are
+used for every backend on the full tier. They are calibrated on the MLP's
+errors, so conformal coverage does not carry over to the distilled student:
+the fast tier serves no yield interval.
+
+    python -m yield_intervals --model-dir ./model --data holdout.csv   # calibrate models trained earlier
+"""
+
+import hashlib
+import numpy as np
+
+INTERVAL_FILE = 'yield_intervals.npz'
+INTERVAL_LEVEL = 0.8
+INTERVAL_BINS = 10
+MIN_BIN_ROWS = 50
+
+
+class YieldIntervals:
+    """Residual quantiles per predicted-yield bin: predicted + low .. predicted + high covers `level` of yields"""
+
+    def __init__(self, edges, low, high, level=INTERVAL_LEVEL, version=''):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.level = float(level)
+        self.version = version
+
+    @classmethod
+    def calibrate(cls, y_true, y_pred, level=INTERVAL_LEVEL, bins=INTERVAL_BINS):
+        """Fit on held-out rows the model was not trained on"""
+        y_true, y_pred = np.asarray(y_true, dtype=np.float64), np.asarray(y_pred, dtype=np.float64)
+        bins = max(1, min(bins, len(y_pred) // MIN_BIN_ROWS))
+        edges = np.quantile(y_pred, np.linspace(0, 1, bins + 1)[1:-1])
+        bin_index = np.searchsorted(edges, y_pred, side='right')
+        residual = y_true - y_pred
+        counts = np.bincount(bin_index, minlength=bins)
+        ranked = residual[np.lexsort([residual, bin_index])]  # by bin, then by residual
+
+        # Conformal ranks within each bin, with the finite-sample (n + 1) correction
+        tail = (1 - level) / 2
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        last = np.maximum(counts - 1, 0)
+        low_rank = np.clip(np.floor(tail * (counts + 1)).astype(int) - 1, 0, last)
+        high_rank = np.clip(np.ceil((1 - tail) * (counts + 1)).astype(int) - 1, 0, last)
+        low = ranked[np.minimum(starts + low_rank, len(ranked) - 1)]
+        high = ranked[np.minimum(starts + high_rank, len(ranked) - 1)]
+
+        # Tied predictions can leave a bin empty; it gets the overall quantiles
+        empty = counts == 0
+        low[empty], high[empty] = np.quantile(residual, [tail, 1 - tail])
+        return cls(edges, low, high, level)
+
+    def interval(self, predicted):
+        """(low, high) yield bounds for each predicted yield; yields are never negative"""
+        predicted = np.asarray(predicted, dtype=np.float64)
+        bin_index = np.searchsorted(self.edges, predicted, side='right')
+        return np.maximum(0, predicted + self.low[bin_index]), np.maximum(0, predicted + self.high[bin_index])
+
+    def coverage(self, y_true, y_pred):
+        """Share of actual yields inside their interval"""
+        low, high = self.interval(y_pred)
+        return float(np.mean((y_true >= low) & (y_true <= high)))
+
+    def save(self, model_dir="./"):
+        np.savez(f"{model_dir}/{INTERVAL_FILE}", edges=self.edges, low=self.low, high=self.high, level=self.level)
+
+    @classmethod
+    def load(cls, model_dir="./"):
+        path = f"{model_dir}/{INTERVAL_FILE}"
+        with open(path, 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:12]
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['edges'], data['low'], data['high'], float(data['level']), version)
+
+
+def main(argv=None):
+    import argparse
+    import pandas as pd
+    from models import PunjabCropPredictor
+
+    parser = argparse.ArgumentParser(description='Calibrate yield intervals for saved models')
+    parser.add_argument('--model-dir', default='./model')
+    parser.add_argument('--data', required=True, help='CSV of labelled rows (with expected_yield) not used in training')
+    parser.add_argument('--level', type=float, default=INTERVAL_LEVEL)
+    args = parser.parse_args(argv)
+
+    predictor = PunjabCropPredictor()
+    predictor.load_models(args.model_dir)
+    frame = pd.read_csv(args.data)
+    predicted = predictor.predict_batch(frame, tier='full')['predicted_yield']
+    intervals = YieldIntervals.calibrate(frame['expected_yield'].to_numpy(), predicted, args.level)
+    intervals.save(args.model_dir)
+    low, high = intervals.interval(predicted)
+    print(f"💾 Yield intervals ({intervals.level:.0%}, {len(intervals.low)} bins, median width "
+          f"{np.median(high - low):.0f} kg/ha) saved to {args.model_dir}/{INTERVAL_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -23,8 +23,10 @@ const mlClient = {
       console.error('ML Service Error (Crop Recommendation):', error.message);
       
       // If ML service is unavailable, return mock response
+      // 503 means the ML service is shedding load; fall back instead of failing
       if (error.code === 'ECONNREFUSED' || error.code === 'ETIMEDOUT' || 
-          error.message.includes('timeout') || error.message.includes('ECONNREFUSED')) {
+          error.message.includes('timeout') || error.message.includes('ECONNREFUSED') ||
+          (error.response && error.response.status === 503)) {
         console.log('ML Service unavailable, returning mock recommendation');
         return mlClient.getMockCropRecommendation(data);
       }
@@ -55,8 +57,10 @@ const mlClient = {
       console.error('ML Service Error (Yield Prediction):', error.message);
       
       // If ML service is unavailable, return mock response
+      // 503 means the ML service is shedding load; fall back instead of failing
       if (error.code === 'ECONNREFUSED' || error.code === 'ETIMEDOUT' || 
-          error.message.includes('timeout') || error.message.includes('ECONNREFUSED')) {
+          error.message.includes('timeout') || error.message.includes('ECONNREFUSED') ||
+          (error.response && error.response.status === 503)) {
         console.log('ML Service unavailable, returning mock prediction');
         return mlClient.getMockYieldPrediction(data);
       }